@@ -0,0 +1,50 @@
+"""
+add drafts and draft_picks tables
+
+Revision ID: add_drafts_20261018
+Revises: add_league_standings_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_drafts_20261018'
+down_revision = 'add_league_standings_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'drafts',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('league_id', sa.Integer(), sa.ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False, index=True),
+        sa.Column('version', sa.String(), nullable=False, server_default='US'),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('order_type', sa.Enum('snake', 'linear', name='draftordertype'), nullable=False, server_default='snake'),
+        sa.Column('rounds', sa.Integer(), nullable=False),
+        sa.Column('pick_seconds', sa.Integer(), nullable=False, server_default='90'),
+        sa.Column('pick_order', sa.JSON(), nullable=False),
+        sa.Column('contestants', sa.JSON(), nullable=False),
+        sa.Column('status', sa.Enum('pending', 'active', 'complete', name='draftstatus'), nullable=False, server_default='pending'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_table(
+        'draft_picks',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('draft_id', sa.Integer(), sa.ForeignKey('drafts.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('pick_number', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('castaway_id', sa.String(), nullable=False),
+        sa.Column('auto', sa.Boolean(), nullable=False, server_default=sa.sql.expression.false()),
+        sa.Column('made_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('draft_id', 'pick_number', name='uq_draft_picks_slot'),
+        sa.UniqueConstraint('draft_id', 'castaway_id', name='uq_draft_picks_castaway'),
+    )
+
+def downgrade():
+    op.drop_table('draft_picks')
+    op.drop_table('drafts')
+    sa.Enum(name='draftstatus').drop(op.get_bind(), checkfirst=False)
+    sa.Enum(name='draftordertype').drop(op.get_bind(), checkfirst=False)
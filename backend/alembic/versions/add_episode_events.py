@@ -0,0 +1,55 @@
+"""
+add episode_events log, league_snapshots and team_players.from_event_id
+
+Revision ID: add_episode_events_20261018
+Revises: add_fantasy_teams_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_episode_events_20261018'
+down_revision = 'add_fantasy_teams_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('scored_episodes', sa.Column('revision', sa.Integer(), nullable=False, server_default='1'))
+    op.create_table(
+        'episode_events',
+        sa.Column('id', sa.BigInteger(), primary_key=True),
+        sa.Column('scored_episode_id', sa.Integer(), sa.ForeignKey('scored_episodes.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('revision', sa.Integer(), nullable=False),
+        sa.Column('version', sa.String(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('episode', sa.Integer(), nullable=False),
+        sa.Column('castaway_id', sa.String(), nullable=False),
+        sa.Column('event', sa.String(), nullable=False),
+        sa.Column('flags', sa.JSON(), nullable=False),
+        sa.Column('count', sa.Float(), nullable=False, server_default='1'),
+        sa.Column('sign', sa.SmallInteger(), nullable=False, server_default='1'),
+        sa.Column('recorded_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_episode_events_castaway_id', 'episode_events', ['castaway_id', 'id'])
+    op.create_index('ix_episode_events_episode_revision', 'episode_events', ['scored_episode_id', 'revision'])
+    op.create_table(
+        'league_snapshots',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('league_id', sa.Integer(), sa.ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('last_event_id', sa.BigInteger(), nullable=False),
+        sa.Column('rules_hash', sa.String(), nullable=False),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_league_snapshots_league_event', 'league_snapshots', ['league_id', 'last_event_id'])
+    op.add_column('team_players', sa.Column('from_event_id', sa.BigInteger(), nullable=False, server_default='0'))
+
+def downgrade():
+    op.drop_column('team_players', 'from_event_id')
+    op.drop_index('ix_league_snapshots_league_event', table_name='league_snapshots')
+    op.drop_table('league_snapshots')
+    op.drop_index('ix_episode_events_episode_revision', table_name='episode_events')
+    op.drop_index('ix_episode_events_castaway_id', table_name='episode_events')
+    op.drop_table('episode_events')
+    op.drop_column('scored_episodes', 'revision')
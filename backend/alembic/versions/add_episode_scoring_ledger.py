@@ -0,0 +1,37 @@
+"""
+add episode scoring ledger
+
+Revision ID: add_scoring_ledger_20261018
+Revises: add_updated_at_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_scoring_ledger_20261018'
+down_revision = 'add_updated_at_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'scored_episodes',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('version', sa.String(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('episode', sa.Integer(), nullable=False),
+        sa.Column('results_hash', sa.String(), nullable=False),
+        sa.Column('scored_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.UniqueConstraint('version', 'season', 'episode', name='uq_scored_episodes_episode'),
+    )
+    op.create_table(
+        'episode_player_scores',
+        sa.Column('scored_episode_id', sa.Integer(), sa.ForeignKey('scored_episodes.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('castaway_id', sa.String(), primary_key=True),
+        sa.Column('points', sa.Float(), nullable=False),
+    )
+
+def downgrade():
+    op.drop_table('episode_player_scores')
+    op.drop_table('scored_episodes')
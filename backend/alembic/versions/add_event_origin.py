@@ -0,0 +1,28 @@
+"""
+add episode_events.origin_event_id, the log position of each episode's first row
+
+Revision ID: add_event_origin_20261018
+Revises: add_user_fk_indexes_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_event_origin_20261018'
+down_revision = 'add_user_fk_indexes_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('episode_events', sa.Column('origin_event_id', sa.BigInteger(), nullable=True))
+    # Corrections inherit the position of the episode's first logged row
+    op.execute(
+        "UPDATE episode_events SET origin_event_id = first.id "
+        "FROM (SELECT scored_episode_id, min(id) AS id FROM episode_events GROUP BY scored_episode_id) AS first "
+        "WHERE episode_events.scored_episode_id = first.scored_episode_id"
+    )
+    op.alter_column('episode_events', 'origin_event_id', nullable=False)
+
+def downgrade():
+    op.drop_column('episode_events', 'origin_event_id')
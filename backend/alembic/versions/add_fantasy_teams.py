@@ -0,0 +1,43 @@
+"""
+add fantasy_teams and team_players tables
+
+Revision ID: add_fantasy_teams_20261018
+Revises: add_scoring_rules_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_fantasy_teams_20261018'
+down_revision = 'add_scoring_rules_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'fantasy_teams',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('league_id', sa.Integer(), sa.ForeignKey('leagues.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('membership_id', sa.Integer(), sa.ForeignKey('league_memberships.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True),
+        sa.Column('name', sa.String(), nullable=True),
+        sa.Column('score', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.UniqueConstraint('membership_id', name='uq_fantasy_teams_membership'),
+    )
+    op.create_index('ix_fantasy_teams_league_score', 'fantasy_teams', ['league_id', 'score'])
+    op.create_table(
+        'team_players',
+        sa.Column('team_id', sa.Integer(), sa.ForeignKey('fantasy_teams.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('player_id', sa.Integer(), sa.ForeignKey('survivor_players.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('added_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_team_players_player_team', 'team_players', ['player_id', 'team_id'])
+
+def downgrade():
+    op.drop_index('ix_team_players_player_team', table_name='team_players')
+    op.drop_table('team_players')
+    op.drop_index('ix_fantasy_teams_league_score', table_name='fantasy_teams')
+    op.drop_table('fantasy_teams')
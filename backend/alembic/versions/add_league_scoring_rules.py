@@ -0,0 +1,21 @@
+"""
+add scoring_rules to league_settings
+
+Revision ID: add_scoring_rules_20261018
+Revises: add_drafts_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_scoring_rules_20261018'
+down_revision = 'add_drafts_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('league_settings', sa.Column('scoring_rules', sa.JSON(), nullable=True))
+
+def downgrade():
+    op.drop_column('league_settings', 'scoring_rules')
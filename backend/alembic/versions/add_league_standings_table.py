@@ -0,0 +1,38 @@
+"""
+add league_standings table
+
+Revision ID: add_league_standings_20261018
+Revises: add_scoring_ledger_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_league_standings_20261018'
+down_revision = 'add_scoring_ledger_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'league_standings',
+        sa.Column('league_id', sa.Integer(), sa.ForeignKey('leagues.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('points', sa.Float(), nullable=False, server_default='0'),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now()),
+    )
+    op.create_index('ix_league_standings_league_position', 'league_standings', ['league_id', 'position'])
+    # Existing members start level on zero points
+    op.execute("""
+        INSERT INTO league_standings (league_id, user_id, points, rank, position)
+        SELECT league_id, user_id, 0, 1, ROW_NUMBER() OVER (PARTITION BY league_id ORDER BY user_id)
+        FROM (SELECT DISTINCT league_id, user_id FROM league_memberships
+              WHERE league_id IS NOT NULL AND user_id IS NOT NULL) AS members
+    """)
+
+def downgrade():
+    op.drop_index('ix_league_standings_league_position', table_name='league_standings')
+    op.drop_table('league_standings')
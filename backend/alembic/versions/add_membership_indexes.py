@@ -0,0 +1,34 @@
+"""
+add unique (league_id, user_id) and covering (user_id, league_id) indexes to league_memberships
+
+Revision ID: add_membership_indexes_20261018
+Revises: add_episode_events_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_membership_indexes_20261018'
+down_revision = 'add_episode_events_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # The old read-then-insert in join_league could race into duplicates; keep the oldest
+    op.execute(
+        """
+        DELETE FROM league_memberships m
+        USING league_memberships older
+        WHERE older.league_id = m.league_id AND older.user_id = m.user_id AND older.id < m.id
+        """
+    )
+    op.create_unique_constraint('uq_league_memberships_league_user', 'league_memberships', ['league_id', 'user_id'])
+    op.create_index(
+        'ix_league_memberships_user_league', 'league_memberships', ['user_id', 'league_id'],
+        postgresql_include=['role'],
+    )
+
+def downgrade():
+    op.drop_index('ix_league_memberships_user_league', table_name='league_memberships')
+    op.drop_constraint('uq_league_memberships_league_user', 'league_memberships', type_='unique')
@@ -0,0 +1,25 @@
+"""
+index users for keyset pagination by (created_at, id)
+
+Revision ID: add_pagination_indexes_20261018
+Revises: add_membership_indexes_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_pagination_indexes_20261018'
+down_revision = 'add_membership_indexes_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # A NULL created_at would fall out of the keyset order
+    op.execute("UPDATE users SET created_at = updated_at WHERE created_at IS NULL")
+    op.alter_column('users', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=False)
+    op.create_index('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+def downgrade():
+    op.drop_index('ix_users_created_at_id', table_name='users')
+    op.alter_column('users', 'created_at', existing_type=sa.DateTime(timezone=True), nullable=True)
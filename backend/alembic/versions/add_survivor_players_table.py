@@ -0,0 +1,36 @@
+"""
+add survivor_players table
+
+Revision ID: add_survivor_players_20261018
+Revises: add_bio_20250706
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_survivor_players_20261018'
+down_revision = 'add_bio_20250706'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'survivor_players',
+        sa.Column('id', sa.Integer(), primary_key=True, index=True),
+        sa.Column('castaway_id', sa.String(), unique=True, index=True),
+        sa.Column('name', sa.String(), index=True),
+        sa.Column('season', sa.Integer()),
+        sa.Column('age', sa.Integer()),
+        sa.Column('occupation', sa.String()),
+        sa.Column('tribe', sa.String()),
+        sa.Column('status', sa.String()),
+        sa.Column('total_score', sa.Float(), server_default='0'),
+        sa.Column('immunity_wins', sa.Integer(), server_default='0'),
+        sa.Column('reward_wins', sa.Integer(), server_default='0'),
+        sa.Column('confessional_count', sa.Integer(), server_default='0'),
+        sa.Column('days_survived', sa.Integer(), server_default='0'),
+    )
+
+def downgrade():
+    op.drop_table('survivor_players')
@@ -0,0 +1,25 @@
+"""
+add updated_at to users and leagues
+
+Revision ID: add_updated_at_20261018
+Revises: add_survivor_players_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_updated_at_20261018'
+down_revision = 'add_survivor_players_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    for table in ('users', 'leagues'):
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False))
+        # Existing rows were last changed no later than now; start them at their creation time
+        op.execute(f"UPDATE {table} SET updated_at = created_at WHERE created_at IS NOT NULL")
+
+def downgrade():
+    op.drop_column('leagues', 'updated_at')
+    op.drop_column('users', 'updated_at')
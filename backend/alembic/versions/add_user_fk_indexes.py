@@ -0,0 +1,26 @@
+"""
+index the foreign keys to users that had none, for bulk user deletes
+
+Revision ID: add_user_fk_indexes_20261018
+Revises: add_pagination_indexes_20261018
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_fk_indexes_20261018'
+down_revision = 'add_pagination_indexes_20261018'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Without these every deleted user costs a scan of each table for its FK check
+    op.create_index('ix_league_standings_user_id', 'league_standings', ['user_id'])
+    op.create_index('ix_draft_picks_user_id', 'draft_picks', ['user_id'])
+    op.create_index('ix_leagues_owner_id', 'leagues', ['owner_id'])
+
+def downgrade():
+    op.drop_index('ix_leagues_owner_id', table_name='leagues')
+    op.drop_index('ix_draft_picks_user_id', table_name='draft_picks')
+    op.drop_index('ix_league_standings_user_id', table_name='league_standings')
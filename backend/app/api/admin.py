@@ -0,0 +1,69 @@
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.auth import get_current_admin_user
+from app.core.database import engine, engine_settings, get_async_session
+from app.core.db_engine import pool_metrics, pool_status
+from app.core.principals import Principal
+from app.models.league import MemberRole
+from app.schemas.admin import (
+    BulkAdminFlag, BulkAdminFlagsChanged, BulkMembershipsChanged, BulkUserDelete, BulkUsersDeleted,
+    DbPoolReport, MembershipImport, MembershipRemoval,
+)
+from app.services.bulk import delete_users, import_memberships, remove_memberships, set_admin_flags
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def _report() -> DbPoolReport:
+    return DbPoolReport(
+        profile=asdict(engine_settings),
+        pool=pool_status(engine),
+        metrics=pool_metrics.snapshot(),
+    )
+
+@router.get("/db/pool", response_model=DbPoolReport)
+async def get_db_pool(current_user: Principal = Depends(get_current_admin_user)):
+    """Database engine profile, pool occupancy and checkout/wait/overflow counters (admin only)"""
+    return _report()
+
+@router.post("/db/pool/reset", response_model=DbPoolReport)
+async def reset_db_pool_metrics(current_user: Principal = Depends(get_current_admin_user)):
+    """Report the pool counters, then start counting from zero (admin only)"""
+    report = _report()
+    pool_metrics.reset()
+    return report
+
+# Bulk operations run in chunks, each committed on its own (see services/bulk.py)
+
+@router.post("/users/bulk-delete", response_model=BulkUsersDeleted)
+async def bulk_delete_users(body: BulkUserDelete, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_admin_user)):
+    """Delete users with their memberships and draft picks; their leagues pass to another member or are deleted (admin only)
+
+    Users in an active draft are skipped (users_skipped) until it completes.
+    """
+    if not body.confirm:
+        raise HTTPException(status_code=400, detail="Must set confirm=true to delete users")
+    if body.all == (body.user_ids is not None):
+        raise HTTPException(status_code=400, detail="Give either user_ids or all=true")
+    # The caller is never deleted
+    return await delete_users(db, body.user_ids, keep=[current_user.id])
+
+@router.post("/users/bulk-admin", response_model=BulkAdminFlagsChanged)
+async def bulk_set_admin(body: BulkAdminFlag, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_admin_user)):
+    """Grant or revoke the admin flag of many users (admin only)"""
+    user_ids = body.user_ids
+    if not body.is_admin:
+        # Revoking your own flag would lock you out of this endpoint
+        user_ids = [user_id for user_id in user_ids if user_id != current_user.id]
+    return await set_admin_flags(db, user_ids, body.is_admin)
+
+@router.post("/memberships/bulk-import", response_model=BulkMembershipsChanged)
+async def bulk_import_memberships(body: MembershipImport, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_admin_user)):
+    """Add league memberships; existing ones and unknown leagues or users are skipped (admin only)"""
+    rows = [(row.league_id, row.user_id, MemberRole(row.role.value)) for row in body.memberships]
+    return await import_memberships(db, rows)
+
+@router.post("/memberships/bulk-remove", response_model=BulkMembershipsChanged)
+async def bulk_remove_memberships(body: MembershipRemoval, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_admin_user)):
+    """Remove league memberships; league owners are skipped (admin only)"""
+    return await remove_memberships(db, [(row.league_id, row.user_id) for row in body.memberships])
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 from passlib.context import CryptContext
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Union
+from dataclasses import fields
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 import logging
@@ -12,7 +13,10 @@ import logging
 from app.models.user import User
 from app.core.database import get_async_session
 from app.core.config import settings
-from sqlalchemy import select
+from app.core.principals import Principal, principal_cache
+from app.services.bulk import delete_users
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_keyset, encode_cursor, estimate_count
+from sqlalchemy import select, tuple_, update
 
 router = APIRouter()
 
@@ -56,8 +60,9 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 class UsersListResponse(BaseModel):
-    total_users: int
     users: List[UserResponse]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    total_users: Optional[int] = None  # with ?with_total=true; the planner's estimate
 
 # JWT Utility Functions
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
@@ -98,38 +103,57 @@ async def authenticate_user(session: AsyncSession, email: str, password: str) ->
         return False
     return user
 
+# The users columns a Principal is loaded from
+PRINCIPAL_COLUMNS = [getattr(User, field.name) for field in fields(Principal)]
+
+async def get_principal(session: AsyncSession, username: str) -> Optional[Principal]:
+    """Principal for a token subject, from principal_cache or else one slim select"""
+    principal = principal_cache.get(username)
+    if principal is not None:
+        return principal
+    generation = principal_cache.generation
+    row = (await session.execute(select(*PRINCIPAL_COLUMNS).where(User.username == username))).first()
+    if row is None:
+        return None
+    principal = Principal(**row._mapping)
+    principal_cache.put(username, principal, generation)
+    return principal
+
+async def get_principal_from_token(session: AsyncSession, token: str) -> Optional[Principal]:
+    """Resolve a JWT access token to its principal, or None if the token is invalid"""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        username: str = payload.get("sub")
+        if username is None:
+            return None
+        token_data = TokenData(username=username)
+    except JWTError:
+        return None
+    return await get_principal(session, token_data.username)
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     session: AsyncSession = Depends(get_async_session)
-) -> User:
-    """Get current user from JWT token"""
+) -> Principal:
+    """Get current user's principal from JWT token (no query while it is cached)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        token_data = TokenData(username=username)
-    except JWTError:
-        raise credentials_exception
-    
-    user = await get_user_by_username(session, username=token_data.username)
+    user = await get_principal_from_token(session, credentials.credentials)
     if user is None:
         raise credentials_exception
     return user
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Get current active user"""
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
-async def get_current_admin_user(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_admin_user(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     """Get current admin user"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -138,8 +162,8 @@ async def get_current_admin_user(current_user: User = Depends(get_current_active
         )
     return current_user
 
-# Helper function to convert user to response
-def user_to_response(user: User) -> UserResponse:
+# Helper function to convert user (or principal) to response
+def user_to_response(user: Union[User, Principal]) -> UserResponse:
     return UserResponse(
         id=user.id,
         email=user.email,
@@ -252,7 +276,7 @@ async def login(
     }
 
 @router.post("/refresh")
-async def refresh_token(current_user: User = Depends(get_current_active_user)):
+async def refresh_token(current_user: Principal = Depends(get_current_active_user)):
     """Refresh JWT token"""
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -271,7 +295,7 @@ async def logout():
 
 # Protected User Endpoints
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: Principal = Depends(get_current_active_user)):
     """Get current user information"""
     return user_to_response(current_user)
 
@@ -279,20 +303,22 @@ async def get_current_user_info(current_user: User = Depends(get_current_active_
 async def update_current_user(
     first_name: Optional[str] = None,
     last_name: Optional[str] = None,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     session: AsyncSession = Depends(get_async_session)
 ):
     """Update current user information"""
+    changes = {"first_name": first_name, "last_name": last_name}
+    changes = {key: value for key, value in changes.items() if value is not None}
+    if not changes:
+        return user_to_response(current_user)
     try:
-        if first_name is not None:
-            current_user.first_name = first_name
-        if last_name is not None:
-            current_user.last_name = last_name
-        
+        user = (await session.execute(
+            update(User).where(User.id == current_user.id).values(**changes).returning(User)
+        )).scalar_one()
         await session.commit()
-        await session.refresh(current_user)
+        principal_cache.invalidate(current_user.username)
         
-        return user_to_response(current_user)
+        return user_to_response(user)
     except Exception as e:
         await session.rollback()
         raise HTTPException(status_code=500, detail=f"Failed to update user: {str(e)}")
@@ -300,17 +326,29 @@ async def update_current_user(
 # Admin-only User Management Endpoints
 @router.get("/users", response_model=UsersListResponse)
 async def list_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False,
     session: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_active_user)  # Any authenticated user can view
+    current_user: Principal = Depends(get_current_active_user)  # Any authenticated user can view
 ):
-    """List all users"""
+    """List users, newest first; follow next_cursor for further pages"""
+    after = decode_keyset(cursor, created_at=datetime.fromisoformat, id=int)
     try:
-        result = await session.execute(select(User).order_by(User.created_at.desc()))
-        users = result.scalars().all()
+        # (created_at, id) is unique, so the order is stable across pages
+        stmt = select(User).order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1)
+        if after is not None:
+            stmt = stmt.where(tuple_(User.created_at, User.id) < after)
+        users = (await session.execute(stmt)).scalars().all()
+        next_cursor = None
+        if len(users) > limit:
+            last = users[limit - 1]
+            next_cursor = encode_cursor({"created_at": last.created_at.isoformat(), "id": last.id})
         
         return UsersListResponse(
-            total_users=len(users),
-            users=[user_to_response(user) for user in users]
+            users=[user_to_response(user) for user in users[:limit]],
+            next_cursor=next_cursor,
+            total_users=await estimate_count(session, select(User.id)) if with_total else None
         )
     except Exception as e:
         logging.error(f"Failed to list users: {str(e)}")
@@ -323,10 +361,21 @@ async def list_users(
 async def get_user_by_username_endpoint(
     username: str,
     session: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user)
 ):
     """Get a specific user by username"""
     try:
+        # Users can only view their own profile unless admin
+        if current_user.username != username and not current_user.is_admin:
+            raise HTTPException(
+                status_code=403,
+                detail="Not authorized to view this user"
+            )
+        
+        # Their own profile is all in the principal already
+        if current_user.username == username:
+            return user_to_response(current_user)
+        
         user = await get_user_by_username(session, username)
         
         if not user:
@@ -335,13 +384,6 @@ async def get_user_by_username_endpoint(
                 detail=f"User '{username}' not found"
             )
         
-        # Users can only view their own profile unless admin
-        if current_user.username != username and not current_user.is_admin:
-            raise HTTPException(
-                status_code=403,
-                detail="Not authorized to view this user"
-            )
-        
         return user_to_response(user)
         
     except HTTPException:
@@ -353,11 +395,45 @@ async def get_user_by_username_endpoint(
             detail="Failed to retrieve user"
         )
 
+# Declared before /users/{username}, which would otherwise match "all"
+@router.delete("/users/all")
+async def delete_all_users(
+    confirm: bool = False,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_admin_user)  # Admin only
+):
+    """Delete all users except current admin (admin only)"""
+    if not confirm:
+        raise HTTPException(
+            status_code=400,
+            detail="Must set confirm=true to delete all users"
+        )
+    
+    try:
+        # Set-based and chunked, with memberships and owned leagues cleaned up
+        deleted = await delete_users(session, None, keep=[current_user.id])
+        
+        logging.warning(f"All users deleted by admin {current_user.username}: {deleted.users_deleted} users removed")
+        
+        return {
+            "message": f"All {deleted.users_deleted} users deleted successfully (excluding current admin)",
+            "deleted_count": deleted.users_deleted,
+            "skipped_count": deleted.users_skipped  # in an active draft
+        }
+        
+    except Exception as e:
+        await session.rollback()
+        logging.error(f"Failed to delete all users: {str(e)}")
+        raise HTTPException(
+            status_code=500, 
+            detail=f"Failed to delete users: {str(e)}"
+        )
+
 @router.delete("/users/{username}")
 async def delete_user_by_username(
     username: str,
     session: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_admin_user)  # Admin only
+    current_user: Principal = Depends(get_current_admin_user)  # Admin only
 ):
     """Delete a user by username (admin only)"""
     try:
@@ -382,8 +458,12 @@ async def delete_user_by_username(
             "email": user.email
         }
         
-        await session.delete(user)
-        await session.commit()
+        deleted = await delete_users(session, [user.id])
+        if deleted.users_skipped:
+            raise HTTPException(
+                status_code=409,
+                detail=f"User '{username}' is in an active draft; delete them once it completes"
+            )
         
         logging.info(f"User deleted by admin {current_user.username}: {username}")
         
@@ -402,52 +482,11 @@ async def delete_user_by_username(
             detail=f"Failed to delete user: {str(e)}"
         )
 
-@router.delete("/users/all")
-async def delete_all_users(
-    confirm: bool = False,
-    session: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_admin_user)  # Admin only
-):
-    """Delete all users except current admin (admin only)"""
-    if not confirm:
-        raise HTTPException(
-            status_code=400,
-            detail="Must set confirm=true to delete all users"
-        )
-    
-    try:
-        # Get all users except current admin
-        result = await session.execute(
-            select(User).where(User.id != current_user.id)
-        )
-        users = result.scalars().all()
-        user_count = len(users)
-        
-        for user in users:
-            await session.delete(user)
-        
-        await session.commit()
-        
-        logging.warning(f"All users deleted by admin {current_user.username}: {user_count} users removed")
-        
-        return {
-            "message": f"All {user_count} users deleted successfully (excluding current admin)",
-            "deleted_count": user_count
-        }
-        
-    except Exception as e:
-        await session.rollback()
-        logging.error(f"Failed to delete all users: {str(e)}")
-        raise HTTPException(
-            status_code=500, 
-            detail=f"Failed to delete users: {str(e)}"
-        )
-
 @router.post("/users/{username}/make-admin")
 async def make_user_admin(
     username: str,
     session: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_admin_user)  # Admin only
+    current_user: Principal = Depends(get_current_admin_user)  # Admin only
 ):
     """Make a user an admin (admin only)"""
     try:
@@ -467,6 +506,7 @@ async def make_user_admin(
         
         user.is_admin = True
         await session.commit()
+        principal_cache.invalidate(username)
         
         logging.info(f"User {username} made admin by {current_user.username}")
         
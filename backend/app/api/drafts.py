@@ -0,0 +1,99 @@
+import random
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.auth import get_current_user
+from app.core.database import get_async_session
+from app.core.principals import Principal
+from app.models.draft import Draft, DraftOrderType, DraftStatus
+from app.models.league import League, LeagueMembership, MemberRole
+from app.schemas.draft import DraftCreate, DraftPickIn, DraftPickOut, DraftState
+from app.services.draft import DraftError, DraftRoom, draft_rooms
+from app.services.survivor_index import season_castaways_index
+
+router = APIRouter(tags=["drafts"])
+
+async def _membership(db: AsyncSession, league_id: int, user: Principal) -> LeagueMembership:
+    membership = await db.scalar(
+        select(LeagueMembership).where(LeagueMembership.league_id == league_id, LeagueMembership.user_id == user.id)
+    )
+    if not membership:
+        raise HTTPException(status_code=403, detail="Not a member of this league")
+    return membership
+
+async def _room(draft_id: int) -> DraftRoom:
+    room = await draft_rooms.get(draft_id)
+    if room is None:
+        raise HTTPException(status_code=404, detail="Draft not found")
+    return room
+
+@router.post("/leagues/{league_id}/draft", response_model=DraftState)
+async def create_draft(league_id: int, draft: DraftCreate, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Set up a draft for a league (owner/admin); it starts when started explicitly"""
+    if not await db.get(League, league_id):
+        raise HTTPException(status_code=404, detail="League not found")
+    membership = await _membership(db, league_id, current_user)
+    if membership.role not in [MemberRole.owner, MemberRole.admin]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    running = await db.scalar(
+        select(Draft.id).where(Draft.league_id == league_id, Draft.status != DraftStatus.complete).limit(1)
+    )
+    if running is not None:
+        raise HTTPException(status_code=400, detail="League already has a draft in progress")
+    members = (await db.execute(
+        select(LeagueMembership.user_id).where(LeagueMembership.league_id == league_id, LeagueMembership.user_id.is_not(None))
+    )).scalars().all()
+    if draft.pick_order is None:
+        pick_order = random.sample(members, len(members))
+    elif len(set(draft.pick_order)) != len(draft.pick_order) or set(draft.pick_order) != set(members):
+        raise HTTPException(status_code=400, detail="pick_order must list every member exactly once")
+    else:
+        pick_order = draft.pick_order
+    roster = (await season_castaways_index.get()).castaways(draft.version, draft.season)
+    contestants = list(dict.fromkeys(c["castaway_id"] for c in roster if c.get("castaway_id")))
+    if not contestants:
+        raise HTTPException(status_code=404, detail="No castaways found for this season")
+    new_draft = Draft(
+        league_id=league_id,
+        version=draft.version,
+        season=draft.season,
+        order_type=DraftOrderType(draft.order_type.value),
+        rounds=draft.rounds,
+        pick_seconds=draft.pick_seconds,
+        pick_order=pick_order,
+        contestants=contestants,
+        status=DraftStatus.pending,
+    )
+    db.add(new_draft)
+    await db.commit()
+    return (await _room(new_draft.id)).state()
+
+@router.post("/drafts/{draft_id}/start", response_model=DraftState)
+async def start_draft(draft_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Start the pick clock (owner/admin)"""
+    room = await _room(draft_id)
+    membership = await _membership(db, room.league_id, current_user)
+    if membership.role not in [MemberRole.owner, MemberRole.admin]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    try:
+        await room.start()
+    except DraftError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    return room.state()
+
+@router.get("/drafts/{draft_id}", response_model=DraftState)
+async def get_draft(draft_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Current state of a draft room; live updates come over /ws/drafts/{draft_id}"""
+    room = await _room(draft_id)
+    await _membership(db, room.league_id, current_user)
+    return room.state()
+
+@router.post("/drafts/{draft_id}/picks", response_model=DraftPickOut)
+async def make_pick(draft_id: int, pick: DraftPickIn, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Draft a contestant when you are on the clock"""
+    room = await _room(draft_id)
+    await _membership(db, room.league_id, current_user)
+    try:
+        return await room.pick(current_user.id, pick.castaway_id)
+    except DraftError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
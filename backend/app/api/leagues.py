@@ -1,17 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List, Optional
+from sqlalchemy import func, select
+from typing import Optional
 from app.core.database import get_async_session
-from app.models.league import League, LeagueMembership, LeagueSettings, GameType, MemberRole
+from app.core.http_cache import is_fresh, make_etag, not_modified, set_cache_headers
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_keyset, encode_cursor, estimate_count
+from app.core.principals import Principal
+from app.models.league import League, LeagueMembership, LeagueSettings, LeagueStanding, GameType, MemberRole
 from app.models.user import User
-from app.schemas.league import LeagueCreate, LeagueOut, LeagueMembershipOut
+from app.schemas.league import LeagueCreate, LeagueOut, LeagueMembershipOut, LeagueMembersPage, LeaguePage, LeagueStandingsPage, MyLeagueStanding
+from app.schemas.scoring import LeagueScoringRules, ScoringRuleset
+from app.services.scoring_rules import DEFAULT_RULES, InvalidRules, compile_rules, rules_hash
+from app.services.event_log import rebuild_league
+from app.services.leagues import add_member, get_league as load_league, get_membership, select_leagues, touch_league
+from app.services.standings import publish_standing_changes, sync_league_members
 from app.api.auth import get_current_user  # fixed import
 
 router = APIRouter(prefix="/leagues", tags=["leagues"])
 
 @router.post("/", response_model=LeagueOut)
-async def create_league(league: LeagueCreate, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user)):
+async def create_league(league: LeagueCreate, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
     settings = None
     if league.settings:
         settings = LeagueSettings(**league.settings.dict())
@@ -31,64 +39,79 @@ async def create_league(league: LeagueCreate, db: AsyncSession = Depends(get_asy
         role=MemberRole.owner
     )
     db.add(membership)
+    await db.flush()
+    changes = await sync_league_members(db, new_league.id)
     await db.commit()
-    await db.refresh(new_league)
-    return new_league
+    await publish_standing_changes(changes)
+    return await load_league(db, new_league.id)
 
-@router.get("/", response_model=List[LeagueOut])
-async def list_leagues(game_type: Optional[GameType] = None, db: AsyncSession = Depends(get_async_session)):
-    stmt = select(League)
+@router.get("/", response_model=LeaguePage)
+async def list_leagues(
+    request: Request,
+    response: Response,
+    game_type: Optional[GameType] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Leagues in id order; follow next_cursor for further pages"""
+    after = decode_keyset(cursor, id=int)
+    # Validate against (count, max id, max updated_at) before loading any rows:
+    # inserts, deletes and updates all change at least one of them
+    stamp = select(func.count(League.id), func.max(League.id), func.max(League.updated_at))
+    if game_type:
+        stamp = stamp.where(League.game_type == game_type)
+    count, max_id, last_modified = (await db.execute(stamp)).one()
+    etag = make_etag("leagues", game_type.value if game_type else None, count, max_id, last_modified, cursor, limit, with_total)
+    if is_fresh(request, etag, last_modified):
+        return not_modified(etag, last_modified)
+    set_cache_headers(response, etag, last_modified)
+    stmt = select_leagues().order_by(League.id).limit(limit + 1)
     if game_type:
         stmt = stmt.where(League.game_type == game_type)
-    result = await db.execute(stmt)
-    leagues = result.scalars().all()
-    return leagues
+    if after is not None:
+        stmt = stmt.where(League.id > after[0])
+    leagues = (await db.execute(stmt)).scalars().all()
+    next_cursor = encode_cursor({"id": leagues[limit - 1].id}) if len(leagues) > limit else None
+    # The validation stamp has counted them already, so this total is exact
+    return {"items": leagues[:limit], "next_cursor": next_cursor, "total_estimate": count if with_total else None}
 
 @router.get("/{league_id}", response_model=LeagueOut)
-async def get_league(league_id: int, db: AsyncSession = Depends(get_async_session)):
-    league = await db.get(League, league_id)
+async def get_league(league_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_session)):
+    league = await load_league(db, league_id)
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
+    etag = make_etag("league", league.id, league.updated_at)
+    if is_fresh(request, etag, league.updated_at):
+        return not_modified(etag, league.updated_at)
+    set_cache_headers(response, etag, league.updated_at)
     return league
 
 @router.post("/{league_id}/join", response_model=LeagueMembershipOut)
-async def join_league(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user)):
-    existing = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == current_user.id
-        )
-    )
-    if existing.scalars().first():
+async def join_league(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    # No read-before-write: the unique (league_id, user_id) constraint decides
+    membership = await add_member(db, league_id, current_user.id)
+    if membership is None:
+        if not await db.get(League, league_id):
+            raise HTTPException(status_code=404, detail="League not found")
         raise HTTPException(status_code=400, detail="Already a member")
-    membership = LeagueMembership(league_id=league_id, user_id=current_user.id, role=MemberRole.member)
-    db.add(membership)
+    await touch_league(db, league_id)
+    changes = await sync_league_members(db, league_id)
     await db.commit()
-    await db.refresh(membership)
+    await publish_standing_changes(changes)
     return membership
 
 @router.post("/{league_id}/transfer_owner")
-async def transfer_owner(league_id: int, new_owner_id: int, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user)):
+async def transfer_owner(league_id: int, new_owner_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
     league = await db.get(League, league_id)
     if not league or league.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only the owner can transfer ownership")
-    new_owner = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == new_owner_id
-        )
-    )
-    if not new_owner.scalars().first():
+    new_owner = await get_membership(db, league_id, new_owner_id)
+    if not new_owner:
         raise HTTPException(status_code=404, detail="New owner must be a member")
     # Update roles
-    old_owner = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == current_user.id
-        )
-    )
-    old_owner = old_owner.scalars().first()
-    new_owner = new_owner.scalars().first()
+    old_owner = await get_membership(db, league_id, current_user.id)
     old_owner.role = MemberRole.admin
     new_owner.role = MemberRole.owner
     league.owner_id = new_owner_id
@@ -96,27 +119,15 @@ async def transfer_owner(league_id: int, new_owner_id: int, db: AsyncSession = D
     return {"detail": "Ownership transferred"}
 
 @router.patch("/{league_id}/members/{user_id}")
-async def change_member_role(league_id: int, user_id: int, new_role: MemberRole, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user)):
+async def change_member_role(league_id: int, user_id: int, new_role: MemberRole, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
     league = await db.get(League, league_id)
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     # Only owner or admin can change roles
-    requester = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == current_user.id
-        )
-    )
-    requester = requester.scalars().first()
+    requester = await get_membership(db, league_id, current_user.id)
     if not requester or requester.role not in [MemberRole.owner, MemberRole.admin]:
         raise HTTPException(status_code=403, detail="Not authorized")
-    member = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == user_id
-        )
-    )
-    member = member.scalars().first()
+    member = await get_membership(db, league_id, user_id)
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
     member.role = new_role
@@ -124,39 +135,161 @@ async def change_member_role(league_id: int, user_id: int, new_role: MemberRole,
     return {"detail": "Role updated"}
 
 @router.delete("/{league_id}/members/{user_id}")
-async def remove_member(league_id: int, user_id: int, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user)):
-    membership = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == user_id
-        )
-    )
-    membership = membership.scalars().first()
+async def remove_member(league_id: int, user_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    league = await db.get(League, league_id)
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+    # Members can leave; only owner or admin can remove someone else
+    if user_id != current_user.id:
+        requester = await get_membership(db, league_id, current_user.id)
+        if not requester or requester.role not in [MemberRole.owner, MemberRole.admin]:
+            raise HTTPException(status_code=403, detail="Not authorized")
+    membership = await get_membership(db, league_id, user_id)
     if not membership:
         raise HTTPException(status_code=404, detail="Member not found")
+    if user_id == league.owner_id:
+        raise HTTPException(status_code=400, detail=f"The owner can't be removed. Transfer ownership first (POST /api/leagues/{league_id}/transfer_owner)")
     await db.delete(membership)
+    await db.flush()
+    await touch_league(db, league_id)
+    changes = await sync_league_members(db, league_id)
     await db.commit()
+    await publish_standing_changes(changes)
     return {"detail": "Member removed"}
 
-@router.get("/{league_id}/members", response_model=List[LeagueMembershipOut])
-async def list_members(league_id: int, db: AsyncSession = Depends(get_async_session)):
-    stmt = select(LeagueMembership).where(LeagueMembership.league_id == league_id)
-    result = await db.execute(stmt)
-    return result.scalars().all()
+@router.get("/{league_id}/members", response_model=LeagueMembersPage)
+async def list_members(
+    league_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """Members in user id order, read off the (league_id, user_id) index; follow next_cursor for further pages"""
+    after = decode_keyset(cursor, user_id=int)
+    members = select(LeagueMembership).where(LeagueMembership.league_id == league_id)
+    stmt = members.order_by(LeagueMembership.user_id).limit(limit + 1)
+    if after is not None:
+        stmt = stmt.where(LeagueMembership.user_id > after[0])
+    rows = (await db.execute(stmt)).scalars().all()
+    next_cursor = encode_cursor({"user_id": rows[limit - 1].user_id}) if len(rows) > limit else None
+    total = await estimate_count(db, members) if with_total else None
+    return {"items": rows[:limit], "next_cursor": next_cursor, "total_estimate": total}
+
+@router.get("/{league_id}/standings", response_model=LeagueStandingsPage)
+async def get_standings(
+    league_id: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_session)
+):
+    """League leaderboard, best first; follow next_cursor for further pages"""
+    after = decode_keyset(cursor, position=int)
+    stmt = (
+        select(LeagueStanding.user_id, User.username, LeagueStanding.points, LeagueStanding.rank, LeagueStanding.position)
+        .join(User, User.id == LeagueStanding.user_id)
+        .where(LeagueStanding.league_id == league_id)
+        .order_by(LeagueStanding.position)
+        .limit(limit + 1)
+    )
+    if after is not None:
+        stmt = stmt.where(LeagueStanding.position > after[0])
+    rows = (await db.execute(stmt)).mappings().all()
+    if not rows and after is None and not await db.get(League, league_id):
+        raise HTTPException(status_code=404, detail="League not found")
+    next_cursor = encode_cursor({"position": rows[limit - 1]["position"]}) if len(rows) > limit else None
+    return {"items": rows[:limit], "next_cursor": next_cursor}
+
+@router.get("/{league_id}/standings/me", response_model=MyLeagueStanding)
+async def get_my_standing(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """The current user's rank in a league"""
+    standing = await db.get(LeagueStanding, (league_id, current_user.id))
+    if not standing:
+        raise HTTPException(status_code=404, detail="Not ranked in this league")
+    out_of = await db.scalar(select(func.max(LeagueStanding.position)).where(LeagueStanding.league_id == league_id))
+    return MyLeagueStanding(
+        user_id=standing.user_id,
+        username=current_user.username,
+        points=standing.points,
+        rank=standing.rank,
+        position=standing.position,
+        out_of=out_of,
+    )
+
+def _scoring_rules_out(game_type: GameType, rules: Optional[dict]) -> LeagueScoringRules:
+    effective = rules if rules is not None else DEFAULT_RULES[game_type]
+    return LeagueScoringRules(
+        game_type=game_type.value,
+        is_default=rules is None,
+        hash=rules_hash(game_type, effective),
+        **effective,
+    )
+
+async def _league_for_rules(db: AsyncSession, league_id: int, current_user: Optional[Principal] = None) -> League:
+    league = await db.get(League, league_id)
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+    if current_user is not None:
+        # Only owner or admin can change the rules
+        requester = await get_membership(db, league_id, current_user.id)
+        if not requester or requester.role not in [MemberRole.owner, MemberRole.admin]:
+            raise HTTPException(status_code=403, detail="Not authorized")
+    return league
+
+@router.get("/scoring-rules/defaults/{game_type}", response_model=LeagueScoringRules)
+async def get_default_scoring_rules(game_type: GameType):
+    """Scoring rules leagues of a game type use until they set their own"""
+    return _scoring_rules_out(game_type, None)
+
+@router.get("/{league_id}/scoring-rules", response_model=LeagueScoringRules)
+async def get_scoring_rules(league_id: int, db: AsyncSession = Depends(get_async_session)):
+    league = await _league_for_rules(db, league_id)
+    settings = await db.get(LeagueSettings, league.settings_id) if league.settings_id else None
+    return _scoring_rules_out(league.game_type, settings.scoring_rules if settings else None)
+
+@router.put("/{league_id}/scoring-rules", response_model=LeagueScoringRules)
+async def set_scoring_rules(league_id: int, ruleset: ScoringRuleset, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Replace a league's scoring rules (owner/admin); they are validated by compiling them"""
+    league = await _league_for_rules(db, league_id, current_user)
+    rules = ruleset.model_dump()
+    try:
+        compile_rules(league.game_type, rules)
+    except InvalidRules as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    settings = await db.get(LeagueSettings, league.settings_id) if league.settings_id else None
+    if settings is None:
+        settings = LeagueSettings()
+        db.add(settings)
+        await db.flush()
+        league.settings_id = settings.id
+    settings.scoring_rules = rules
+    await db.flush()
+    # Rescore the league's teams under the new rules from the event log
+    rebuild = await rebuild_league(db, league_id)
+    await db.commit()
+    await publish_standing_changes(rebuild.changes)
+    return _scoring_rules_out(league.game_type, rules)
+
+@router.delete("/{league_id}/scoring-rules", response_model=LeagueScoringRules)
+async def reset_scoring_rules(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Go back to the game type's default rules (owner/admin)"""
+    league = await _league_for_rules(db, league_id, current_user)
+    settings = await db.get(LeagueSettings, league.settings_id) if league.settings_id else None
+    if settings is not None and settings.scoring_rules is not None:
+        settings.scoring_rules = None
+        await db.flush()
+        rebuild = await rebuild_league(db, league_id)
+        await db.commit()
+        await publish_standing_changes(rebuild.changes)
+    return _scoring_rules_out(league.game_type, None)
 
 @router.delete("/{league_id}", status_code=204)
-async def delete_league(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: User = Depends(get_current_user)):
+async def delete_league(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
     league = await db.get(League, league_id)
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
     # Only owner or admin can delete
-    membership = await db.execute(
-        LeagueMembership.__table__.select().where(
-            LeagueMembership.league_id == league_id,
-            LeagueMembership.user_id == current_user.id
-        )
-    )
-    membership = membership.scalars().first()
+    membership = await get_membership(db, league_id, current_user.id)
     if not membership or membership.role not in [MemberRole.owner, MemberRole.admin]:
         raise HTTPException(status_code=403, detail="Not authorized")
     await db.delete(league)
@@ -1,23 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from typing import Optional
 from app.models.player import SurvivorPlayer
-from app.schemas.player import PlayerResponse
-from app.core.database import get_db
+from app.schemas.player import SurvivorPlayer as PlayerResponse
+from app.core.database import get_async_session
 
 router = APIRouter()
 
 @router.get("/players/", response_model=list[PlayerResponse])
-async def get_players(db: AsyncSession = Depends(get_db)):
-    async with db.begin():
-        result = await db.execute(select(SurvivorPlayer))
-        players = result.scalars().all()
-        return players
+async def get_players(
+    season: Optional[int] = Query(None, description="Only players whose latest season is this one"),
+    db: AsyncSession = Depends(get_async_session)
+):
+    """List ingested survivoR players (see ingest_survivor.py)"""
+    stmt = select(SurvivorPlayer).order_by(SurvivorPlayer.id)
+    if season is not None:
+        stmt = stmt.where(SurvivorPlayer.season == season)
+    result = await db.execute(stmt)
+    return result.scalars().all()
 
 @router.get("/players/{player_id}", response_model=PlayerResponse)
-async def get_player(player_id: int, db: AsyncSession = Depends(get_db)):
-    async with db.begin():
-        player = await db.get(SurvivorPlayer, player_id)
-        if player is None:
-            raise HTTPException(status_code=404, detail="Player not found")
-        return player
\ No newline at end of file
+async def get_player(player_id: int, db: AsyncSession = Depends(get_async_session)):
+    player = await db.get(SurvivorPlayer, player_id)
+    if player is None:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return player
\ No newline at end of file
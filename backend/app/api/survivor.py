@@ -1,45 +1,207 @@
-from fastapi import APIRouter, Query
-import aiohttp
-import json
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from app.api.auth import get_current_admin_user, get_current_user
+from app.core.config import settings
+from app.core.database import get_async_session
+from app.core.http_cache import SURVIVOR_DATA, cache_headers, is_fresh, make_etag, not_modified, set_cache_headers
+from app.core.principals import Principal
+from app.core.survivor_data import survivor_store
+from app.models.scoring import EpisodeEvent
+from app.schemas.projection import SeasonProjection
+from app.schemas.scoring import BacktestResult, EpisodeEventOut, EpisodeResults, EpisodeScoreResult, ScoringRuleset
+from app.services.backtest import backtests
+from app.services.projections import projection_index, projections, team_projections
+from app.services.scoring import apply_episode, episode_results_from_store
+from app.services.scoring_rules import InvalidRules
+from app.services.survivor_ingest import ingest_survivor_players
+from app.services.survivor_index import castaway_stats_index, dump_json, season_castaways_index
+from app.services.survivor_stats import season_stats_index
 
 router = APIRouter()
 
-BASE_URL = "https://github.com/doehm/survivoR/raw/master/dev/json/"
+# Most castaways one batch player-stats request may ask for
+MAX_BATCH_CASTAWAYS = 100
+
+def parse_csv(value: Optional[str]) -> Optional[tuple]:
+    """Parse a comma-separated query value (``fields=a,b``) into a de-duplicated tuple"""
+    if not value:
+        return None
+    return tuple(dict.fromkeys(v.strip() for v in value.split(",") if v.strip())) or None
 
 @router.get("/survivor/seasons")
-async def get_survivor_seasons():
+async def get_survivor_seasons(request: Request):
     """Get all Survivor seasons (summary info)"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{BASE_URL}season_summary.json") as resp:
-            text = await resp.text()
-            return json.loads(text)
+    entry = await survivor_store.entry("season_summary")
+    etag = make_etag("seasons", entry.version)
+    if is_fresh(request, etag):
+        return not_modified(etag, cache_control=SURVIVOR_DATA)
+    seasons = await survivor_store.data(entry)
+    return Response(content=dump_json(seasons), media_type="application/json", headers=cache_headers(etag, cache_control=SURVIVOR_DATA))
 
 @router.get("/survivor/players")
 async def get_survivor_players(
+    request: Request,
     season: int = Query(..., description="Season number"),
-    version: str = Query("US", description="Survivor version, e.g. 'US', 'AU'")
+    version: str = Query("US", description="Survivor version, e.g. 'US', 'AU'"),
+    fields: Optional[str] = Query(None, description="Comma-separated columns to return, e.g. 'castaway_id,castaway'")
 ):
     """Get all players for a given season and version (e.g., US, AU)"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(f"{BASE_URL}castaways.json") as resp:
-            text = await resp.text()
-            data = json.loads(text)
-            # Filter by both season and version
-            return [c for c in data if c.get("season") == season and c.get("version", "US") == version]
+    index = await season_castaways_index.get()
+    fields = parse_csv(fields)
+    etag = make_etag("players", index.versions, version, season, fields)
+    if is_fresh(request, etag):
+        return not_modified(etag, cache_control=SURVIVOR_DATA)
+    return Response(content=index.body(version, season, fields), media_type="application/json", headers=cache_headers(etag, cache_control=SURVIVOR_DATA))
 
 @router.get("/survivor/player-stats")
-async def get_survivor_player_stats(player_id: str = Query(..., description="Castaway ID")):
+async def get_survivor_player_stats(
+    request: Request,
+    response: Response,
+    player_id: str = Query(..., description="Castaway ID"),
+    season: Optional[int] = Query(None, description="Only include this season")
+):
     """Get stats for a specific player (votes, challenges, confessionals)"""
-    async with aiohttp.ClientSession() as session:
-        votes_task = session.get(f"{BASE_URL}vote_history.json")
-        challenges_task = session.get(f"{BASE_URL}challenge_results.json")
-        confessionals_task = session.get(f"{BASE_URL}confessionals.json")
-        votes_resp, challenges_resp, confessionals_resp = await aiohttp.gather(votes_task, challenges_task, confessionals_task)
-        votes = json.loads(await votes_resp.text())
-        challenges = json.loads(await challenges_resp.text())
-        confessionals = json.loads(await confessionals_resp.text())
-        return {
-            "votes": [v for v in votes if v.get("castaway_id") == player_id],
-            "challenges": [c for c in challenges if c.get("castaway_id") == player_id],
-            "confessionals": [c for c in confessionals if c.get("castaway_id") == player_id]
-        }
+    index = await castaway_stats_index.get()
+    etag = make_etag("player-stats", index.versions, player_id, season)
+    if is_fresh(request, etag):
+        return not_modified(etag, cache_control=SURVIVOR_DATA)
+    set_cache_headers(response, etag, cache_control=SURVIVOR_DATA)
+    return index.lookup(player_id, season)
+
+@router.get("/survivor/player-stats/batch")
+async def get_survivor_player_stats_batch(
+    request: Request,
+    castaway_ids: Optional[str] = Query(None, description="Comma-separated castaway IDs"),
+    season: Optional[int] = Query(None, description="Only include this season; without castaway_ids, the whole season's cast"),
+    version: str = Query("US", description="Survivor version, used with season when castaway_ids is omitted")
+):
+    """Get stats for many players at once, keyed by castaway_id"""
+    ids = parse_csv(castaway_ids)
+    if ids is None and season is None:
+        raise HTTPException(status_code=400, detail="Pass castaway_ids or season")
+    if ids is not None and len(ids) > MAX_BATCH_CASTAWAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_CASTAWAYS} castaway_ids per request")
+    if ids is None:
+        roster, index = await asyncio.gather(season_castaways_index.get(), castaway_stats_index.get())
+        versions = (roster.versions, index.versions)
+    else:
+        index = await castaway_stats_index.get()
+        versions = index.versions
+    etag = make_etag("player-stats-batch", versions, ids, season, version if ids is None else None)
+    if is_fresh(request, etag):
+        return not_modified(etag, cache_control=SURVIVOR_DATA)
+    if ids is None:
+        ids = dict.fromkeys(c["castaway_id"] for c in roster.castaways(version, season) if c.get("castaway_id"))
+    body = dump_json(index.lookup_many(ids, season))
+    return Response(content=body, media_type="application/json", headers=cache_headers(etag, cache_control=SURVIVOR_DATA))
+
+@router.get("/survivor/season-stats")
+async def get_survivor_season_stats(
+    request: Request,
+    response: Response,
+    season: int = Query(..., description="Season number"),
+    version: str = Query("US", description="Survivor version, e.g. 'US', 'AU'")
+):
+    """Get per-castaway and season-wide totals (immunity/reward wins, confessionals, days)"""
+    stats = await season_stats_index.get()
+    etag = make_etag("season-stats", stats.versions, version, season)
+    if is_fresh(request, etag):
+        return not_modified(etag, cache_control=SURVIVOR_DATA)
+    result = stats.season(version, season)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    set_cache_headers(response, etag, cache_control=SURVIVOR_DATA)
+    return result
+
+@router.get("/survivor/projections", response_model=SeasonProjection)
+async def get_survivor_projections(
+    request: Request,
+    response: Response,
+    season: int = Query(..., description="Season number"),
+    version: str = Query("US", description="Survivor version, e.g. 'US', 'AU'"),
+    episode: Optional[int] = Query(None, ge=0, description="Project from the end of this episode (default: latest)"),
+    league_id: Optional[int] = Query(None, description="Also project the league's drafted rosters"),
+    session: AsyncSession = Depends(get_async_session)
+):
+    """Simulated win/elimination probabilities and projected points for the rest of a season"""
+    index = await projection_index.get()
+    if episode is None:
+        episode = index.latest_episode(version, season)
+        if episode is None:
+            raise HTTPException(status_code=404, detail="Season not found")
+    # Rosters change with every pick, so only castaway-level projections are cacheable
+    etag = make_etag("projections", index.versions, version, season, episode, settings.PROJECTION_SIMULATIONS) if league_id is None else None
+    if etag and is_fresh(request, etag):
+        return not_modified(etag, cache_control=SURVIVOR_DATA)
+    projection = await projections.get(version, season, episode)
+    if projection is None:
+        raise HTTPException(status_code=404, detail="Season not found")
+    if league_id is not None:
+        return {**projection, "teams": await team_projections(session, league_id, projection)}
+    set_cache_headers(response, etag, cache_control=SURVIVOR_DATA)
+    return projection
+
+@router.post("/survivor/backtest", response_model=BacktestResult)
+async def backtest_scoring_rules(
+    ruleset: Optional[ScoringRuleset] = None,
+    limit: int = Query(100, ge=1, le=5000, description="Castaways to return, best career totals first"),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Replay every season under a scoring ruleset (the survivor default if no body is sent)"""
+    try:
+        result = await backtests.run(ruleset.model_dump() if ruleset is not None else None)
+    except InvalidRules as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {**result, "castaways": result["castaways"][:limit]}
+
+@router.post("/survivor/ingest")
+async def ingest_survivor_data(
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_admin_user)  # Admin only
+):
+    """Load castaways and derived counts into survivor_players (admin only)"""
+    return await ingest_survivor_players(session)
+
+@router.post("/survivor/episodes/score", response_model=EpisodeScoreResult)
+async def score_episode(
+    results: EpisodeResults,
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_admin_user)  # Admin only
+):
+    """Apply one episode's results to player scores; replaying the same results is a no-op (admin only)"""
+    return await apply_episode(session, results)
+
+@router.post("/survivor/episodes/{season}/{episode}/score", response_model=EpisodeScoreResult)
+async def score_episode_from_data(
+    season: int,
+    episode: int,
+    version: str = Query("US", description="Survivor version, e.g. 'US', 'AU'"),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: Principal = Depends(get_current_admin_user)  # Admin only
+):
+    """Score an episode from the survivoR datasets (admin only)"""
+    results = await episode_results_from_store(version, season, episode)
+    if not (results.challenges or results.votes or results.confessionals):
+        raise HTTPException(status_code=404, detail="Episode not found")
+    return await apply_episode(session, results)
+
+@router.get("/survivor/episodes/{season}/{episode}/events", response_model=List[EpisodeEventOut])
+async def get_episode_events(
+    season: int,
+    episode: int,
+    version: str = Query("US", description="Survivor version, e.g. 'US', 'AU'"),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """An episode's scoring events as logged, corrections and retractions included"""
+    rows = (await session.execute(
+        select(EpisodeEvent)
+        .where(EpisodeEvent.version == version, EpisodeEvent.season == season, EpisodeEvent.episode == episode)
+        .order_by(EpisodeEvent.id)
+    )).scalars().all()
+    if not rows:
+        raise HTTPException(status_code=404, detail="Episode has not been scored")
+    return rows
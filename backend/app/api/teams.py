@@ -0,0 +1,83 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.auth import get_current_user
+from app.core.database import get_async_session
+from app.core.principals import Principal
+from app.models.league import League, LeagueMembership, MemberRole
+from app.models.player import SurvivorPlayer
+from app.models.team import FantasyTeam, TeamPlayer
+from app.models.user import User
+from app.schemas.scoring import LeagueRebuildOut
+from app.schemas.team import FantasyTeamDetail, FantasyTeamOut
+from app.services.event_log import rebuild_league
+from app.services.standings import publish_standing_changes
+
+router = APIRouter(tags=["teams"])
+
+def _teams():
+    # One row per team: scores are denormalized, so nothing is summed here
+    return (
+        select(
+            FantasyTeam.id, FantasyTeam.league_id, League.name.label("league_name"), FantasyTeam.user_id,
+            User.username, FantasyTeam.name, FantasyTeam.score, FantasyTeam.updated_at,
+        )
+        .join(League, League.id == FantasyTeam.league_id)
+        .join(User, User.id == FantasyTeam.user_id)
+    )
+
+@router.get("/leagues/{league_id}/teams", response_model=List[FantasyTeamOut])
+async def list_league_teams(league_id: int, db: AsyncSession = Depends(get_async_session)):
+    """A league's fantasy teams, highest score first"""
+    stmt = _teams().where(FantasyTeam.league_id == league_id).order_by(FantasyTeam.score.desc(), FantasyTeam.id)
+    rows = (await db.execute(stmt)).mappings().all()
+    if not rows and not await db.get(League, league_id):
+        raise HTTPException(status_code=404, detail="League not found")
+    return rows
+
+@router.post("/leagues/{league_id}/teams/rebuild", response_model=LeagueRebuildOut)
+async def rebuild_league_teams(league_id: int, db: AsyncSession = Depends(get_async_session), current_user: Principal = Depends(get_current_user)):
+    """Recompute team scores from the event log since the league's last snapshot (owner/admin)"""
+    if not await db.get(League, league_id):
+        raise HTTPException(status_code=404, detail="League not found")
+    role = await db.scalar(
+        select(LeagueMembership.role).where(LeagueMembership.league_id == league_id, LeagueMembership.user_id == current_user.id)
+    )
+    if role not in [MemberRole.owner, MemberRole.admin]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    result = await rebuild_league(db, league_id)
+    await db.commit()
+    await publish_standing_changes(result.changes)
+    return LeagueRebuildOut(
+        league_id=league_id,
+        events_replayed=result.events_replayed,
+        teams_updated=result.teams_updated,
+        snapshot_event_id=result.snapshot_event_id,
+    )
+
+@router.get("/users/{user_id}/teams", response_model=List[FantasyTeamOut])
+async def list_user_teams(user_id: int, db: AsyncSession = Depends(get_async_session)):
+    """A user's fantasy teams across their leagues, for profile pages"""
+    stmt = _teams().where(FantasyTeam.user_id == user_id).order_by(FantasyTeam.league_id)
+    rows = (await db.execute(stmt)).mappings().all()
+    if not rows and not await db.get(User, user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    return rows
+
+@router.get("/teams/{team_id}", response_model=FantasyTeamDetail)
+async def get_team(team_id: int, db: AsyncSession = Depends(get_async_session)):
+    """One fantasy team with its roster"""
+    team = (await db.execute(_teams().where(FantasyTeam.id == team_id))).mappings().first()
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    players = (await db.execute(
+        select(
+            SurvivorPlayer.id.label("player_id"), SurvivorPlayer.castaway_id, SurvivorPlayer.name,
+            SurvivorPlayer.status, SurvivorPlayer.total_score, TeamPlayer.added_at,
+        )
+        .join(TeamPlayer, TeamPlayer.player_id == SurvivorPlayer.id)
+        .where(TeamPlayer.team_id == team_id)
+        .order_by(SurvivorPlayer.total_score.desc(), SurvivorPlayer.id)
+    )).mappings().all()
+    return FantasyTeamDetail(**team, players=players)
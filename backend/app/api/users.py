@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, status
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, UploadFile, File, status
 from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.core.database import get_async_session
+from app.core.http_cache import is_fresh, make_etag, not_modified, set_cache_headers
+from app.core.principals import Principal, principal_cache
 from app.models.user import User
-from app.models.league import League, LeagueMembership
+from app.models.league import LeagueMembership
 from app.schemas.user import UserProfile
 from app.schemas.league import LeagueOut
 from app.api.auth import get_current_user
+from app.services.leagues import select_leagues
 from pydantic import BaseModel
 import os
 from uuid import uuid4
@@ -22,7 +24,7 @@ class BioUpdate(BaseModel):
     bio: str
 
 @router.get("/users/{user_id}/public", response_model=UserProfile)
-async def get_public_user_profile(user_id: int, db: AsyncSession = Depends(get_async_session)):
+async def get_public_user_profile(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_session)):
     result = await db.execute(
         User.__table__.select().where(User.id == user_id)
     )
@@ -30,6 +32,10 @@ async def get_public_user_profile(user_id: int, db: AsyncSession = Depends(get_a
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     user = user._mapping  # SQLAlchemy Row to dict
+    etag = make_etag("user", user['id'], user['updated_at'])
+    if is_fresh(request, etag, user['updated_at']):
+        return not_modified(etag, user['updated_at'])
+    set_cache_headers(response, etag, user['updated_at'])
     profile_picture_url = None
     if user['profile_picture']:
         profile_picture_url = PROFILE_PIC_URL_PREFIX + user['profile_picture']
@@ -54,30 +60,23 @@ async def update_user_bio(
     user_id: int, 
     bio_update: BioUpdate, 
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Update a user's bio - only the user themselves can update their bio"""
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Can only update your own bio")
     
+    # Update the bio; RETURNING hands back the updated profile, so the user
+    # isn't selected before or after
     result = await db.execute(
-        User.__table__.select().where(User.id == user_id)
+        User.__table__.update().where(User.id == user_id).values(bio=bio_update.bio).returning(*User.__table__.c)
     )
-    user = result.fetchone()
-    if not user:
+    updated_user = result.fetchone()
+    if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
-    
-    # Update the bio
-    await db.execute(
-        User.__table__.update().where(User.id == user_id).values(bio=bio_update.bio)
-    )
     await db.commit()
-    
-    # Return updated user profile
-    updated_result = await db.execute(
-        User.__table__.select().where(User.id == user_id)
-    )
-    updated_user = updated_result.fetchone()._mapping
+    principal_cache.invalidate(current_user.username)
+    updated_user = updated_user._mapping
     
     profile_picture_url = None
     if updated_user['profile_picture']:
@@ -108,7 +107,7 @@ async def get_user_leagues(user_id: int, db: AsyncSession = Depends(get_async_se
         raise HTTPException(status_code=404, detail="User not found")
     
     # Get user's league memberships with league details
-    stmt = select(League).join(LeagueMembership).where(LeagueMembership.user_id == user_id)
+    stmt = select_leagues().join(LeagueMembership).where(LeagueMembership.user_id == user_id)
     result = await db.execute(stmt)
     leagues = result.scalars().all()
     
@@ -119,19 +118,12 @@ async def upload_profile_picture(
     user_id: int, 
     file: UploadFile = File(...), 
     db: AsyncSession = Depends(get_async_session),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Upload a profile picture - only the user themselves can upload"""
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="Can only upload your own profile picture")
     
-    result = await db.execute(
-        User.__table__.select().where(User.id == user_id)
-    )
-    user = result.fetchone()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Validate file type
     ext = os.path.splitext(file.filename)[1].lower()
     if ext not in [".jpg", ".jpeg", ".png", ".webp"]:
@@ -152,9 +144,13 @@ async def upload_profile_picture(
         f.write(file_content)
     
     # Update user record
-    await db.execute(
-        User.__table__.update().where(User.id == user_id).values(profile_picture=filename)
+    updated = await db.scalar(
+        User.__table__.update().where(User.id == user_id).values(profile_picture=filename).returning(User.id)
     )
+    if updated is None:
+        os.remove(file_path)
+        raise HTTPException(status_code=404, detail="User not found")
     await db.commit()
+    principal_cache.invalidate(current_user.username)
     
     return {"profile_picture_url": PROFILE_PIC_URL_PREFIX + filename}
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketException, status
+from sqlalchemy import select
+from app.api.auth import get_principal_from_token
+from app.core.database import async_session_maker
+from app.core.principals import Principal
+from app.core.pubsub import Subscription, draft_channel, league_channel, pubsub
+from app.models.draft import Draft
+from app.models.league import LeagueMembership
+
+router = APIRouter()
+
+def _socket_token(websocket: WebSocket, token: Optional[str]) -> str:
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Missing token")
+    return token
+
+async def _authorize_member(session, token: str, league_id: Optional[int]) -> Principal:
+    user = await get_principal_from_token(session, token)
+    if user is None or not user.is_active:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials")
+    member = None
+    if league_id is not None:
+        member = await session.scalar(
+            select(LeagueMembership.id)
+            .where(LeagueMembership.league_id == league_id, LeagueMembership.user_id == user.id)
+            .limit(1)
+        )
+    if member is None:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason="Not a member of this league")
+    return user
+
+async def authorize_league_socket(websocket: WebSocket, league_id: int, token: Optional[str] = Query(None)) -> Principal:
+    """Resolve the JWT (?token= or Authorization header) to an active member of the league"""
+    token = _socket_token(websocket, token)
+    # A short-lived session rather than get_async_session: that one would hold a
+    # pooled connection for as long as the socket stays open
+    async with async_session_maker() as session:
+        return await _authorize_member(session, token, league_id)
+
+async def authorize_draft_socket(websocket: WebSocket, draft_id: int, token: Optional[str] = Query(None)) -> Principal:
+    """Resolve the JWT to an active member of the draft's league"""
+    token = _socket_token(websocket, token)
+    async with async_session_maker() as session:
+        league_id = await session.scalar(select(Draft.league_id).where(Draft.id == draft_id))
+        return await _authorize_member(session, token, league_id)
+
+async def _send_loop(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        payload = await subscription.get()
+        if payload is None:
+            return
+        await websocket.send_text(payload)
+
+async def _receive_loop(websocket: WebSocket) -> None:
+    # Clients don't send anything meaningful; reading just notices disconnects
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+async def _serve_channel(websocket: WebSocket, channel: str) -> None:
+    await websocket.accept()
+    subscription = pubsub.subscribe(channel)
+    sender = asyncio.create_task(_send_loop(websocket, subscription))
+    receiver = asyncio.create_task(_receive_loop(websocket))
+    try:
+        done, _ = await asyncio.wait((sender, receiver), return_when=asyncio.FIRST_COMPLETED)
+        # The send loop only ends cleanly when the server closes the subscription (shutdown)
+        shutting_down = sender in done and sender.exception() is None
+    finally:
+        pubsub.unsubscribe(subscription)
+        for task in (sender, receiver):
+            task.cancel()
+        await asyncio.gather(sender, receiver, return_exceptions=True)
+    if shutting_down:
+        await websocket.close(code=status.WS_1001_GOING_AWAY)
+
+@router.websocket("/ws/leagues/{league_id}")
+async def league_updates(websocket: WebSocket, league_id: int, user: Principal = Depends(authorize_league_socket)):
+    """Live score and standings changes for one league"""
+    await _serve_channel(websocket, league_channel(league_id))
+
+@router.websocket("/ws/drafts/{draft_id}")
+async def draft_updates(websocket: WebSocket, draft_id: int, user: Principal = Depends(authorize_draft_socket)):
+    """Live picks, clock and status of one draft room"""
+    await _serve_channel(websocket, draft_channel(draft_id))
@@ -0,0 +1,157 @@
+"""Response compression with Accept-Encoding negotiation (brotli or gzip).
+
+A pure ASGI middleware in the spirit of Starlette's GZipMiddleware that also
+speaks brotli when the brotli package is installed. Only compressible content
+types of at least minimum_size bytes are compressed; streamed responses are
+compressed chunk by chunk.
+
+Single-message bodies that carry a strong ETag (e.g. the pre-serialized
+survivoR season lists) are compressed once per encoding and kept in a small
+LRU, so a hot response is not recompressed on every request. Compressed
+responses get a weak ETag, as the bytes differ from the identity encoding.
+"""
+import zlib
+from collections import OrderedDict
+from typing import Callable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional: without it responses are gzip-only
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Pick "br" or "gzip" from an Accept-Encoding header, preferring br on ties"""
+    qualities = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            qualities[coding.strip()] = q
+    wildcard = qualities.get("*", 0.0)
+    candidates = (["br"] if brotli is not None else []) + ["gzip"]
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = qualities.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_size: int = 256,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _Responder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def compressor(self, encoding: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+        """(compress, finish) functions for one response body"""
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            return compressor.process, compressor.finish
+        # wbits=31: zlib stream with a gzip header and trailer
+        compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+        return compressor.compress, compressor.flush
+
+    def compress(self, encoding: str, body: bytes, etag: Optional[str]) -> bytes:
+        key = (etag, encoding) if etag and not etag.startswith("W/") else None
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        compress, finish = self.compressor(encoding)
+        compressed = compress(body) + finish()
+        if key is not None:
+            self._cache[key] = compressed
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+
+class _Responder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start: Optional[Message] = None
+        self.active = None  # None until the first body message decides
+        self.compress = self.finish = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows what we're sending
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.start is None:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.active is None:
+            headers = MutableHeaders(raw=self.start["headers"])
+            content_type = headers.get("content-type", "")
+            compressible = self.start["status"] not in (204, 304) and content_type.startswith(COMPRESSIBLE_TYPES)
+            if compressible:
+                headers.add_vary_header("Accept-Encoding")
+            self.active = (
+                compressible
+                and "content-encoding" not in headers
+                and (more_body or len(body) >= self.middleware.minimum_size)
+            )
+            if not self.active:
+                await self._send(self.start)
+                await self._send(message)
+                return
+            headers["Content-Encoding"] = self.encoding
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            if not more_body:
+                body = self.middleware.compress(self.encoding, body, etag)
+                headers["Content-Length"] = str(len(body))
+                await self._send(self.start)
+                await self._send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            self.compress, self.finish = self.middleware.compressor(self.encoding)
+            await self._send(self.start)
+        elif not self.active:
+            await self._send(message)
+            return
+
+        chunk = self.compress(body)
+        if not more_body:
+            chunk += self.finish()
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -21,6 +21,19 @@ class Settings(BaseSettings):
         description="Database connection URL"
     )
     
+    # Database engine profile (see app/core/db_engine.py): dev, prod or test; defaults from ENVIRONMENT
+    DB_PROFILE: Optional[str] = Field(default=None, env="DB_PROFILE")
+    # Each of these overrides one value of the profile when set
+    DB_POOL_SIZE: Optional[int] = Field(default=None, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: Optional[int] = Field(default=None, env="DB_MAX_OVERFLOW")  # connections allowed beyond the pool size
+    DB_POOL_TIMEOUT_SECONDS: Optional[float] = Field(default=None, env="DB_POOL_TIMEOUT_SECONDS")  # wait for a free connection
+    DB_POOL_RECYCLE_SECONDS: Optional[int] = Field(default=None, env="DB_POOL_RECYCLE_SECONDS")
+    DB_POOL_PRE_PING: Optional[bool] = Field(default=None, env="DB_POOL_PRE_PING")
+    DB_STATEMENT_CACHE_SIZE: Optional[int] = Field(default=None, env="DB_STATEMENT_CACHE_SIZE")  # 0 behind pgbouncer
+    DB_STATEMENT_TIMEOUT_MS: Optional[int] = Field(default=None, env="DB_STATEMENT_TIMEOUT_MS")  # 0 disables
+    DB_SLOW_QUERY_MS: Optional[int] = Field(default=None, env="DB_SLOW_QUERY_MS")  # 0 disables the slow-query log
+    DB_ECHO: Optional[bool] = Field(default=None, env="DB_ECHO")  # log every statement
+    
     # Security
     SECRET_KEY: str = Field(
         env="SECRET_KEY",
@@ -41,6 +54,54 @@ class Settings(BaseSettings):
     # External APIs
     SURVIVOR_API_BASE_URL: str = "https://github.com/doehm/survivoR/raw/master/dev/json/"
     
+    # survivoR dataset cache (SURVIVOR_API_BASE_URL may also be a local fixture directory)
+    SURVIVOR_CACHE_DIR: str = Field(
+        default=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".survivor_cache"),
+        env="SURVIVOR_CACHE_DIR",
+        description="Directory where downloaded survivoR datasets are kept"
+    )
+    SURVIVOR_CACHE_TTL_SECONDS: int = Field(default=60 * 60 * 6, env="SURVIVOR_CACHE_TTL_SECONDS")  # 6 hours
+    SURVIVOR_SNAPSHOT_PATH: str = Field(
+        default=os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), ".survivor_cache", "survivor.snapshot"),
+        env="SURVIVOR_SNAPSHOT_PATH",
+        description="Binary snapshot written by build_survivor_snapshot.py and mmapped at startup"
+    )
+    SURVIVOR_INGEST_BATCH_SIZE: int = Field(default=1000, env="SURVIVOR_INGEST_BATCH_SIZE")  # rows per upsert statement
+    
+    # Outbound HTTP client pool
+    HTTP_POOL_LIMIT: int = Field(default=100, env="HTTP_POOL_LIMIT")
+    HTTP_POOL_LIMIT_PER_HOST: int = Field(default=10, env="HTTP_POOL_LIMIT_PER_HOST")
+    HTTP_DNS_CACHE_SECONDS: int = Field(default=300, env="HTTP_DNS_CACHE_SECONDS")
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = Field(default=10.0, env="HTTP_CONNECT_TIMEOUT_SECONDS")
+    HTTP_TIMEOUT_SECONDS: float = Field(default=120.0, env="HTTP_TIMEOUT_SECONDS")
+    HTTP_MAX_RETRIES: int = Field(default=3, env="HTTP_MAX_RETRIES")
+    HTTP_RETRY_BACKOFF_SECONDS: float = Field(default=0.5, env="HTTP_RETRY_BACKOFF_SECONDS")
+    
+    # HTTP response caching and compression
+    HTTP_CACHE_MAX_AGE_SECONDS: int = Field(default=300, env="HTTP_CACHE_MAX_AGE_SECONDS")  # Cache-Control max-age for survivoR data
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")  # smaller bodies are sent as-is
+    GZIP_LEVEL: int = Field(default=6, env="GZIP_LEVEL")
+    BROTLI_QUALITY: int = Field(default=5, env="BROTLI_QUALITY")
+    
+    # Live updates over WebSocket
+    WS_SEND_QUEUE_SIZE: int = Field(default=64, env="WS_SEND_QUEUE_SIZE")  # messages buffered per connection before dropping
+    
+    # CPU-bound work (simulations) runs in a process pool off the event loop
+    PROCESS_POOL_WORKERS: int = Field(default=2, env="PROCESS_POOL_WORKERS")
+    PROJECTION_SIMULATIONS: int = Field(default=20000, env="PROJECTION_SIMULATIONS")  # simulated season endings per projection
+    PROJECTION_CACHE_SIZE: int = Field(default=32, env="PROJECTION_CACHE_SIZE")  # (season, episode) projections kept in memory
+    BACKTEST_CACHE_SIZE: int = Field(default=32, env="BACKTEST_CACHE_SIZE")  # rulesets whose backtest is kept in memory
+    
+    # Event log replays (services/event_log.py)
+    LEAGUE_SNAPSHOT_EVENTS: int = Field(default=1000, env="LEAGUE_SNAPSHOT_EVENTS")  # events a league rebuild replays before it stores a new snapshot
+    
+    # Bulk admin operations (services/bulk.py)
+    BULK_CHUNK_SIZE: int = Field(default=5000, env="BULK_CHUNK_SIZE")  # rows per statement and transaction
+    
+    # Authenticated principals (core/principals.py)
+    PRINCIPAL_CACHE_SIZE: int = Field(default=10000, env="PRINCIPAL_CACHE_SIZE")  # token subjects kept in memory
+    PRINCIPAL_CACHE_TTL_SECONDS: int = Field(default=60, env="PRINCIPAL_CACHE_TTL_SECONDS")  # 0 disables; how long other workers can miss a change
+    
     # Environment
     ENVIRONMENT: str = Field(default="development", env="ENVIRONMENT")
     
@@ -1,14 +1,12 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from typing import AsyncGenerator
 from .config import settings  # Import settings, not DATABASE_URL directly
+from .db_engine import build_engine, engine_profile
 
-# Create async engine using the settings
-engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    future=True
-)
+# Create async engine using the settings' engine profile
+engine_settings = engine_profile(settings)
+engine = build_engine(settings.DATABASE_URL, engine_settings)
 
 # Create async session maker
 async_session_maker = async_sessionmaker(
@@ -0,0 +1,239 @@
+"""Database engine profiles, pool metrics and the slow-query log.
+
+A profile (dev, prod or test) bundles the engine's pooling and connection
+settings; DB_PROFILE picks one (by default it follows ENVIRONMENT) and the
+individual DB_* settings override single values of it:
+
+    dev   small pool, SQL echo follows DEBUG
+    prod  larger pool, short pool timeout, never echoes unless DB_ECHO is set
+    test  no pooling (NullPool), so every test's event loop gets fresh connections
+
+Statement timeouts are set per connection (server_settings), so a runaway
+query is cancelled by Postgres itself. Statements slower than DB_SLOW_QUERY_MS
+are logged as one JSON object per line on the "app.db.slow_query" logger.
+
+The pool is instrumented: pool_metrics counts checkouts, time spent waiting
+for a connection, timeouts and the overflow high-water mark;
+/api/admin/db/pool reports them together with the pool's current status.
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import asdict, dataclass, replace
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
+
+slow_query_log = logging.getLogger("app.db.slow_query")
+
+# Longest statement text written to the slow-query log
+SLOW_QUERY_STATEMENT_CHARS = 2000
+
+
+@dataclass(frozen=True)
+class EngineProfile:
+    name: str
+    pooled: bool = True
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_timeout: float = 30.0  # seconds to wait for a connection before failing
+    pool_recycle: int = 1800  # seconds before a connection is replaced
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100  # asyncpg prepared statements per connection; 0 behind pgbouncer
+    statement_timeout_ms: int = 30000  # 0 disables
+    slow_query_ms: int = 200  # 0 disables the slow-query log
+    echo: bool = False
+
+
+PROFILES: Dict[str, EngineProfile] = {
+    "dev": EngineProfile(name="dev"),
+    "prod": EngineProfile(
+        name="prod", pool_size=10, max_overflow=20, pool_timeout=10.0,
+        statement_timeout_ms=10000, slow_query_ms=500,
+    ),
+    "test": EngineProfile(name="test", pooled=False, pool_pre_ping=False, statement_timeout_ms=10000, slow_query_ms=0),
+}
+
+_ENVIRONMENT_PROFILES = {"production": "prod", "prod": "prod", "test": "test", "testing": "test"}
+
+
+def engine_profile(settings) -> EngineProfile:
+    """The profile selected by settings, with any DB_* overrides applied"""
+    name = settings.DB_PROFILE or _ENVIRONMENT_PROFILES.get(settings.ENVIRONMENT.lower(), "dev")
+    if name not in PROFILES:
+        raise ValueError(f"Unknown DB_PROFILE '{name}' (expected one of {', '.join(PROFILES)})")
+    profile = PROFILES[name]
+    if name == "dev":
+        profile = replace(profile, echo=settings.DEBUG)
+    overrides = {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE,
+        "statement_timeout_ms": settings.DB_STATEMENT_TIMEOUT_MS,
+        "slow_query_ms": settings.DB_SLOW_QUERY_MS,
+        "echo": settings.DB_ECHO,
+    }
+    return replace(profile, **{key: value for key, value in overrides.items() if value is not None})
+
+
+class PoolMetrics:
+    """Counters for connection checkouts, shared by every pool this process creates"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.connections_opened = 0
+        self.connections_invalidated = 0
+        self.overflow_max = 0
+        self.slow_queries = 0
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.checkout_timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "wait_ms_total": round(self.wait_seconds_total * 1000, 3),
+                "wait_ms_avg": round(self.wait_seconds_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+                "connections_opened": self.connections_opened,
+                "connections_invalidated": self.connections_invalidated,
+                "overflow_max": self.overflow_max,
+                "slow_queries": self.slow_queries,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedCheckout:
+    """Pool mixin timing how long each checkout waits for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        if hasattr(self, "overflow"):
+            pool_metrics.overflow_max = max(pool_metrics.overflow_max, self.overflow())
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_TimedCheckout, NullPool):
+    pass
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    """Current pool occupancy (pooled profiles only)"""
+    pool = engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {"pool_class": type(pool).__name__}
+    return {
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def _install_listeners(engine: AsyncEngine, profile: EngineProfile) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        pool_metrics.connections_opened += 1
+
+    @event.listens_for(sync_engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        pool_metrics.connections_invalidated += 1
+
+    if profile.slow_query_ms <= 0:
+        return
+    threshold = profile.slow_query_ms / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        if elapsed < threshold:
+            return
+        pool_metrics.slow_queries += 1
+        # Parameters are left out: they can hold credentials and personal data
+        slow_query_log.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(elapsed * 1000, 1),
+            "threshold_ms": profile.slow_query_ms,
+            "statement": " ".join(statement.split())[:SLOW_QUERY_STATEMENT_CHARS],
+            "executemany": executemany,
+            "rowcount": cursor.rowcount,
+        }))
+
+    @event.listens_for(sync_engine, "handle_error")
+    def on_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+
+def build_engine(url: str, profile: EngineProfile) -> AsyncEngine:
+    """Create the async engine for a profile"""
+    connect_args: dict = {
+        # SQLAlchemy's prepared statement cache and asyncpg's own one
+        "prepared_statement_cache_size": profile.statement_cache_size,
+        "statement_cache_size": profile.statement_cache_size,
+    }
+    if profile.statement_timeout_ms > 0:
+        connect_args["server_settings"] = {"statement_timeout": str(profile.statement_timeout_ms)}
+    kwargs = {}
+    if profile.pooled:
+        kwargs.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=profile.pool_size,
+            max_overflow=profile.max_overflow,
+            pool_timeout=profile.pool_timeout,
+            pool_recycle=profile.pool_recycle,
+        )
+    else:
+        kwargs["poolclass"] = InstrumentedNullPool
+    engine = create_async_engine(
+        url,
+        echo=profile.echo,
+        pool_pre_ping=profile.pool_pre_ping,
+        connect_args=connect_args,
+        **kwargs,
+    )
+    _install_listeners(engine, profile)
+    logging.info(f"Database engine profile '{profile.name}': {json.dumps(asdict(profile))}")
+    return engine
@@ -0,0 +1,98 @@
+"""Conditional GET support: strong ETags, Last-Modified and Cache-Control.
+
+Routes work out a validator before doing the expensive part of a request --
+survivoR routes from the dataset versions their index was built from, DB
+routes from the rows' updated_at stamps -- and answer 304 Not Modified when
+the client's copy is still current.
+
+CompressionMiddleware (app/core/compression.py) weakens the ETag of responses
+it compresses, so If-None-Match is checked with weak comparison (RFC 9110).
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+from app.core.config import settings
+
+# Cache-Control policies
+# survivoR data only changes when a dataset refresh lands, so shared caches may keep it briefly
+SURVIVOR_DATA = f"public, max-age={settings.HTTP_CACHE_MAX_AGE_SECONDS}, stale-while-revalidate=60"
+# App data can change at any time: clients may store it but must revalidate (a cheap 304)
+REVALIDATE = "no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag for a representation identified by parts (versions, stamps, params)"""
+    return '"' + hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()[:16] + '"'
+
+
+def http_date(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for tag in header.split(","):
+        tag = tag.strip()
+        if (tag[2:] if tag.startswith("W/") else tag) == opaque:
+            return True
+    return False
+
+
+def is_fresh(request: Request, etag: Optional[str] = None, last_modified: Optional[datetime] = None) -> bool:
+    """Whether the client's cached copy is current (If-None-Match, else If-Modified-Since)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def cache_headers(
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = REVALIDATE,
+) -> Dict[str, str]:
+    headers = {"Cache-Control": cache_control}
+    if etag is not None:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+
+def set_cache_headers(
+    response: Response,
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = REVALIDATE,
+) -> None:
+    """Attach validators and a cache policy to the response a route will return"""
+    response.headers.update(cache_headers(etag, last_modified, cache_control))
+
+
+def not_modified(
+    etag: Optional[str] = None,
+    last_modified: Optional[datetime] = None,
+    cache_control: str = REVALIDATE,
+) -> Response:
+    """Empty 304 response carrying the same validators as a full one"""
+    return Response(status_code=304, headers=cache_headers(etag, last_modified, cache_control))
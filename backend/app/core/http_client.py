@@ -0,0 +1,81 @@
+"""Shared HTTP client for upstream requests.
+
+A single pooled aiohttp session is opened in the FastAPI lifespan (see
+app/main.py) and reused by every request, so TCP/TLS connections and DNS
+lookups are kept between calls instead of being torn down after each one.
+"""
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from app.core.config import settings
+
+# Responses worth retrying; anything else is returned to the caller as-is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class HTTPClient:
+    """Pooled aiohttp session with timeouts and retry/backoff"""
+
+    def __init__(self):
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=settings.HTTP_TIMEOUT_SECONDS,
+            connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("HTTP client is not started")
+        return self._session
+
+    @asynccontextmanager
+    async def get(self, url: str, **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """GET a URL, retrying connection errors and 429/5xx responses with backoff"""
+        # Scripts and jobs running outside the app lifespan get a session on first use
+        await self.start()
+        attempt = 0
+        while True:
+            try:
+                resp = await self.session.get(url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt >= settings.HTTP_MAX_RETRIES:
+                    raise
+                logging.warning(f"GET {url} failed ({e!r}), retrying")
+            else:
+                if resp.status not in RETRY_STATUSES or attempt >= settings.HTTP_MAX_RETRIES:
+                    break
+                resp.release()
+                logging.warning(f"GET {url} returned {resp.status}, retrying")
+            # Exponential backoff with jitter
+            delay = settings.HTTP_RETRY_BACKOFF_SECONDS * (2 ** attempt)
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            attempt += 1
+        try:
+            yield resp
+        finally:
+            resp.release()
+
+
+# Global client instance, started and closed by the app lifespan
+http_client = HTTPClient()
@@ -0,0 +1,118 @@
+"""Incremental parsing of large top-level JSON arrays.
+
+The survivoR files are arrays of flat records. Rather than holding a whole
+file as text and then as one big list, JSONArrayParser is fed the body chunk
+by chunk and hands back each record as soon as it is complete, so only a
+chunk plus one partial record is ever buffered.
+
+The array's own grammar is checked as it goes: a missing, doubled, leading
+or trailing comma raises ValueError, and so does an item that can't be
+valid whatever comes next, as soon as it is seen rather than at the end of
+the body.
+"""
+import codecs
+import json
+import re
+from typing import Any, BinaryIO, Iterable, Iterator, List
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+# What the parser expects next
+_OPEN = "open"  # the opening [
+_FIRST = "first"  # the first item, or ] for an empty array
+_ITEM = "item"  # an item, after a comma
+_SEPARATOR = "separator"  # a comma or the closing ]
+_DONE = "done"
+
+# The tail of a value cut short by the end of a chunk: part of a number or
+# literal ("12" of "123", "1" of "1e5", "tru")
+_PARTIAL_TOKEN = re.compile(r"[-+.\w]*\Z")
+
+
+def _incomplete(buffer: str, error: json.JSONDecodeError) -> bool:
+    """Whether a failed decode may just be missing the rest of the item"""
+    return (
+        error.pos >= len(buffer)
+        or error.msg.startswith("Unterminated string")
+        or _PARTIAL_TOKEN.match(buffer, error.pos) is not None
+    )
+
+
+class JSONArrayParser:
+    """Push parser for a JSON array: feed() bytes, get back completed items"""
+
+    def __init__(self):
+        self._decoder = json.JSONDecoder()
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._offset = 0  # characters consumed before the buffer, for error messages
+        self._expect = _OPEN
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[Any]:
+        self._buffer += self._utf8.decode(chunk, final)
+        buffer = self._buffer
+        items = []
+        raw_decode = self._decoder.raw_decode
+        expect = self._expect
+        pos = 0
+        size = len(buffer)
+        while expect != _DONE:
+            while pos < size and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos >= size:
+                break
+            char = buffer[pos]
+            if expect == _SEPARATOR:
+                if char == ",":
+                    expect = _ITEM
+                elif char == "]":
+                    expect = _DONE
+                else:
+                    raise ValueError(f"Expected ',' or ']' at offset {self._offset + pos}")
+                pos += 1
+            elif expect == _OPEN:
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                expect = _FIRST
+                pos += 1
+            elif char == "]" and expect == _FIRST:
+                expect = _DONE
+                pos += 1
+            else:
+                try:
+                    item, end = raw_decode(buffer, pos)
+                except json.JSONDecodeError as e:
+                    if final or not _incomplete(buffer, e):
+                        raise ValueError(f"Invalid JSON array item at offset {self._offset + e.pos}: {e.msg}") from e
+                    # Incomplete item: wait for the next chunk
+                    break
+                if not final and not isinstance(item, (dict, list)) and _PARTIAL_TOKEN.match(buffer, end):
+                    # A scalar running up to the end may still be cut short
+                    break
+                items.append(item)
+                pos = end
+                expect = _SEPARATOR
+        self._expect = expect
+        self._offset += pos
+        self._buffer = buffer[pos:]
+        return items
+
+    def close(self) -> None:
+        self.feed(b"", final=True)
+        if self._expect != _DONE or self._buffer.strip():
+            raise ValueError("Truncated or malformed JSON array")
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the items of a JSON array from an iterable of byte chunks"""
+    parser = JSONArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    parser.close()
+
+
+def iter_json_file(f: BinaryIO, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of a JSON array stored in a binary file"""
+    return iter_json_array(iter(lambda: f.read(chunk_size), b""))
@@ -0,0 +1,59 @@
+"""Opaque cursor tokens for keyset pagination.
+
+A cursor carries the sort key of the last row a client has seen, as urlsafe
+base64 JSON. Clients pass it back untouched; the server continues with
+WHERE key > cursor, so a page costs O(page) no matter how deep it is.
+
+Pages don't count their results: a listing that offers a total takes it from
+estimate_count() (the planner's estimate) when the client asks for it.
+"""
+import base64
+import binascii
+import json
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(key: dict) -> str:
+    raw = json.dumps(key, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: Optional[str]) -> Optional[dict]:
+    """Decode a cursor from a query parameter (None for the first page)"""
+    if not token:
+        return None
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token + "=" * (-len(token) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(key, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return key
+
+
+def decode_keyset(token: Optional[str], **fields: Callable) -> Optional[Tuple]:
+    """Decode a cursor into its key values, e.g. ``decode_keyset(cursor, id=int)``"""
+    key = decode_cursor(token)
+    if key is None:
+        return None
+    try:
+        return tuple(parse(key[name]) for name, parse in fields.items())
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def estimate_count(session: AsyncSession, stmt: Select) -> int:
+    """Rows the planner expects a query to return, read from EXPLAIN without running it"""
+    connection = await session.connection()
+    sql = stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
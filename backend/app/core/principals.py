@@ -0,0 +1,98 @@
+"""Authenticated principals, cached by token subject.
+
+Resolving a JWT used to load the user row on every authenticated request.
+A Principal is a slim, immutable snapshot of that row (no password hash, bio
+or picture) and principal_cache keeps one per subject (the username in the
+token's "sub"), bounded in number (LRU) and in age (TTL), so a request whose
+principal is cached runs no query to authenticate.
+
+Whatever changes a cached field drops the entry: profile edits, admin-flag
+changes and deletions, single and bulk, call invalidate() or
+invalidate_ids() after they commit. A load that overlapped an invalidation
+is not stored, so a stale row read just before the change can't be cached
+after it.
+
+The cache is per process. Other workers notice a change when their entry
+expires, so PRINCIPAL_CACHE_TTL_SECONDS bounds how long a revoked admin flag
+or a deleted account keeps authenticating there.
+"""
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    email: str
+    first_name: Optional[str]
+    last_name: Optional[str]
+    is_active: bool
+    is_admin: bool
+    created_at: Optional[datetime]
+
+
+class PrincipalCache:
+    """TTL + LRU of principals by subject; a ttl of 0 disables caching"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Principal]]" = OrderedDict()
+        self._subjects: Dict[int, str] = {}  # user id -> subject, for invalidate_ids()
+        # Bumped by every invalidation; put() drops loads that started before one
+        self.generation = 0
+
+    def get(self, subject: str) -> Optional[Principal]:
+        entry = self._entries.get(subject)
+        if entry is None:
+            return None
+        expires, principal = entry
+        if expires <= self._clock():
+            self._drop(subject)
+            return None
+        self._entries.move_to_end(subject)
+        return principal
+
+    def put(self, subject: str, principal: Principal, generation: int) -> None:
+        """Cache a principal loaded when self.generation was `generation`"""
+        if generation != self.generation or self.ttl_seconds <= 0 or self.maxsize <= 0:
+            return
+        self._entries[subject] = (self._clock() + self.ttl_seconds, principal)
+        self._entries.move_to_end(subject)
+        self._subjects[principal.id] = subject
+        while len(self._entries) > self.maxsize:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate(self, subject: str) -> None:
+        self.generation += 1
+        self._drop(subject)
+
+    def invalidate_ids(self, user_ids: Iterable[int]) -> None:
+        self.generation += 1
+        for user_id in user_ids:
+            subject = self._subjects.get(user_id)
+            if subject is not None:
+                self._drop(subject)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+        self._subjects.clear()
+
+    def _drop(self, subject: str) -> None:
+        entry = self._entries.pop(subject, None)
+        if entry is not None:
+            self._subjects.pop(entry[1].id, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+principal_cache = PrincipalCache(settings.PRINCIPAL_CACHE_SIZE, settings.PRINCIPAL_CACHE_TTL_SECONDS)
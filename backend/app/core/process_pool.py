@@ -0,0 +1,47 @@
+"""Shared process pool for CPU-bound work (simulations, backtests).
+
+NumPy releases the GIL for some operations but not for the Python loops
+around them, so heavy jobs run in worker processes instead of threads. The
+pool is created on first use and shut down with the app. Workers are started
+with "spawn", so they never inherit the parent's event loop, sockets or
+database connections; submitted functions must be importable module-level
+functions and their arguments picklable.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=max(settings.PROCESS_POOL_WORKERS, 1),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def pool_size() -> int:
+    """How many jobs can run at once, for splitting work into chunks"""
+    return max(settings.PROCESS_POOL_WORKERS, 1)
+
+
+async def run_in_process(fn: Callable[..., Any], *args: Any) -> Any:
+    """Run fn(*args) in a worker process without blocking the event loop"""
+    if settings.PROCESS_POOL_WORKERS <= 0:
+        # Pool disabled (e.g. constrained containers): fall back to a thread
+        return await asyncio.to_thread(fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(_pool(), fn, *args)
+
+
+def shutdown() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
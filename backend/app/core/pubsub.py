@@ -0,0 +1,160 @@
+"""Publish/subscribe fan-out for live league updates.
+
+Every WebSocket connection owns a Subscription: a bounded queue of messages
+that were serialized once, at publish time. publish() never waits for a
+client, so one slow consumer cannot hold up a broadcast:
+
+- messages with a coalesce key ("standings") are merged into a queued message
+  with the same key: rows are keyed by their "id" and later rows win, so a
+  backed-up client still ends up with the latest state of every row;
+- when a queue is full its oldest message is dropped, and the client is told
+  how many it missed ({"type": "lagged"}) so it can refetch over REST.
+
+LocalPubSub only reaches sockets connected to this worker. Running several
+workers means swapping `pubsub` for a broker-backed implementation (e.g. Redis
+pub/sub) of the same PubSub interface; the WebSocket layer only uses that.
+"""
+import asyncio
+import itertools
+import json
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from app.core.config import settings
+
+
+def league_channel(league_id: int) -> str:
+    return f"league:{league_id}"
+
+
+def draft_channel(draft_id: int) -> str:
+    return f"draft:{draft_id}"
+
+
+def _dumps(message: dict) -> str:
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+def _merge_rows(old: dict, new: dict) -> dict:
+    rows = {row["id"]: row for row in old.get("rows", [])}
+    for row in new.get("rows", []):
+        rows[row["id"]] = {**rows.get(row["id"], {}), **row}
+    return {**new, "rows": list(rows.values())}
+
+
+class Subscription:
+    """Bounded, coalescing send queue for one connection"""
+
+    _ids = itertools.count()
+
+    def __init__(self, channel: str, maxsize: int):
+        self.channel = channel
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.closed = False
+        # key -> (serialized, message); non-coalescing messages get a unique key
+        self._queue: "OrderedDict[object, Tuple[str, dict]]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._lagged = 0
+
+    def offer(self, message: dict, payload: str) -> None:
+        """Queue a message without blocking (called by publish)"""
+        if self.closed:
+            return
+        key = message.get("coalesce")
+        if key is not None and key in self._queue:
+            merged = _merge_rows(self._queue[key][1], message)
+            self._queue[key] = (_dumps(merged), merged)
+            return
+        if len(self._queue) >= self.maxsize:
+            self._queue.popitem(last=False)
+            self.dropped += 1
+            self._lagged += 1
+        self._queue[key if key is not None else next(self._ids)] = (payload, message)
+        self._ready.set()
+
+    async def get(self) -> Optional[str]:
+        """Next serialized message, or None once the subscription is closed"""
+        while not self._queue and not self.closed:
+            self._ready.clear()
+            await self._ready.wait()
+        if self.closed:
+            return None
+        if self._lagged:
+            lagged, self._lagged = self._lagged, 0
+            return _dumps({"type": "lagged", "channel": self.channel, "dropped": lagged})
+        return self._queue.popitem(last=False)[1][0]
+
+    def close(self) -> None:
+        self.closed = True
+        self._queue.clear()
+        self._ready.set()
+
+
+class PubSub(ABC):
+    """Interface used by the WebSocket layer"""
+
+    @abstractmethod
+    def subscribe(self, channel: str, maxsize: Optional[int] = None) -> Subscription:
+        ...
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription) -> None:
+        ...
+
+    @abstractmethod
+    async def publish(self, channel: str, message: dict) -> int:
+        """Deliver a message to every subscriber of a channel; returns how many"""
+
+    @abstractmethod
+    async def close(self) -> None:
+        ...
+
+
+class LocalPubSub(PubSub):
+    """In-process PubSub: reaches subscribers in this worker only"""
+
+    def __init__(self, default_maxsize: int = 64):
+        self.default_maxsize = default_maxsize
+        self._channels: Dict[str, Set[Subscription]] = {}
+
+    def subscribe(self, channel: str, maxsize: Optional[int] = None) -> Subscription:
+        subscription = Subscription(channel, maxsize or self.default_maxsize)
+        self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        subscribers = self._channels.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[subscription.channel]
+
+    async def publish(self, channel: str, message: dict) -> int:
+        subscribers = self._channels.get(channel)
+        if not subscribers:
+            return 0
+        payload = _dumps(message)  # serialized once for every subscriber
+        for subscription in tuple(subscribers):
+            subscription.offer(message, payload)
+        return len(subscribers)
+
+    async def close(self) -> None:
+        for subscribers in list(self._channels.values()):
+            for subscription in tuple(subscribers):
+                self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        subscriptions = [s for subscribers in self._channels.values() for s in subscribers]
+        return {
+            "channels": len(self._channels),
+            "subscriptions": len(subscriptions),
+            "queued": sum(len(s._queue) for s in subscriptions),
+            "dropped": sum(s.dropped for s in subscriptions),
+        }
+
+
+# Global pub/sub instance
+pubsub: PubSub = LocalPubSub(default_maxsize=settings.WS_SEND_QUEUE_SIZE)
@@ -0,0 +1,48 @@
+"""In-memory LRU for expensive computed results (projections, backtests).
+
+Concurrent misses for the same key share one computation instead of each
+starting their own. A computation keeps running if the request that started
+it goes away, so the next request for that key still finds the result.
+"""
+import asyncio
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class ResultCache(Generic[T]):
+    """LRU of results by key; None results are not cached"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._results: "OrderedDict[Hashable, T]" = OrderedDict()
+        self._running: Dict[Hashable, asyncio.Task] = {}
+
+    def peek(self, key: Hashable) -> Optional[T]:
+        result = self._results.get(key)
+        if result is not None:
+            self._results.move_to_end(key)
+        return result
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        result = self.peek(key)
+        if result is not None:
+            return result
+        task = self._running.get(key)
+        if task is None:
+            task = asyncio.create_task(self._compute(key, compute))
+            self._running[key] = task
+            task.add_done_callback(lambda _: self._running.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, compute: Callable[[], Awaitable[Optional[T]]]) -> Optional[T]:
+        result = await compute()
+        if result is not None:
+            self._results[key] = result
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+        return result
+
+    def __len__(self) -> int:
+        return len(self._results)
@@ -0,0 +1,303 @@
+"""Local cache for the survivoR JSON datasets.
+
+Each file under SURVIVOR_API_BASE_URL is downloaded once, written to
+SURVIVOR_CACHE_DIR and kept in memory. When a cached copy is older than
+SURVIVOR_CACHE_TTL_SECONDS it keeps being served while a background task
+revalidates it with If-None-Match / If-Modified-Since.
+
+Downloads are streamed to disk in chunks. Large datasets are then consumed
+record by record with ``records()`` (see app/core/json_stream.py) instead of
+being materialized; ``get()`` loads a whole file into memory and is meant for
+the small ones.
+
+SURVIVOR_API_BASE_URL may also be a local directory (or a file:// URL), which
+is how the store is pointed at fixture data instead of GitHub.
+
+At startup the store can be seeded from a memory-mapped binary snapshot (see
+app/core/survivor_snapshot.py); datasets are then read from the snapshot until
+a refresh brings in a newer version.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Set
+
+from app.core.config import settings
+from app.core.http_client import HTTPClient, http_client
+from app.core.json_stream import CHUNK_SIZE, iter_json_file
+from app.core.survivor_snapshot import SnapshotTable, SurvivorSnapshot
+
+# How long to wait before retrying a background refresh that failed
+REFRESH_RETRY_SECONDS = 60
+
+# Every dataset the API reads, e.g. for building snapshots
+DATASETS = ("season_summary", "castaways", "vote_history", "challenge_results", "confessionals")
+
+
+@dataclass
+class CachedDataset:
+    name: str
+    path: Optional[str]
+    version: str  # content hash, stable across workers and restarts
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    checked_at: float = 0.0
+    data: Any = None  # parsed contents, only loaded by SurvivorDataStore.get()
+    snapshot: Optional[SnapshotTable] = None  # set when served from a snapshot instead of path
+
+
+class SurvivorDataStore:
+    """Fetch-once, refresh-in-background store for survivoR datasets"""
+
+    def __init__(self, base_url: str, cache_dir: str, ttl_seconds: int, client: HTTPClient = http_client):
+        self.base_url = base_url
+        self.client = client
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, CachedDataset] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    @property
+    def is_local(self) -> bool:
+        return not self.base_url.startswith(("http://", "https://"))
+
+    async def get(self, name: str) -> Any:
+        """Get the parsed contents of a dataset, e.g. ``get("castaways")``"""
+        return await self.data(await self.entry(name))
+
+    async def data(self, entry: CachedDataset) -> Any:
+        """Get the parsed contents of one specific version of a dataset"""
+        if entry.data is None:
+            entry.data = await asyncio.to_thread(lambda: list(self.records(entry)))
+        return entry.data
+
+    @staticmethod
+    def records(entry: CachedDataset) -> Iterable[dict]:
+        """Stream the records of a cached dataset (blocking; run in a thread)
+
+        Snapshot-backed entries return their SnapshotTable, which iterates as
+        records and also offers columnar access.
+        """
+        if entry.snapshot is not None:
+            return entry.snapshot
+        return _read_records(entry.path)
+
+    def attach_snapshot(self, snapshot: SurvivorSnapshot) -> None:
+        """Seed datasets from a snapshot, unless the disk cache has a newer check"""
+        for name, table in snapshot.tables.items():
+            meta = table.meta
+            if name in self._entries:
+                continue
+            cached = self._load_from_disk(name)
+            if cached is not None and cached.version != meta["version"] and cached.checked_at > meta["checked_at"]:
+                continue
+            self._entries[name] = CachedDataset(
+                name=name,
+                path=None,
+                version=meta["version"],
+                etag=meta.get("etag"),
+                last_modified=meta.get("last_modified"),
+                checked_at=meta["checked_at"],
+                snapshot=table,
+            )
+
+    async def entry(self, name: str) -> CachedDataset:
+        """Get the cached dataset, loading it from disk or upstream on first use"""
+        entry = self._entries.get(name)
+        if entry is None:
+            async with self._lock(name):
+                entry = self._entries.get(name)
+                if entry is None:
+                    entry = await asyncio.to_thread(self._load_from_disk, name)
+                    if entry is None:
+                        entry = await self._fetch(name, None)
+                    self._entries[name] = entry
+        if time.time() - entry.checked_at > self.ttl_seconds:
+            self._schedule_refresh(name)
+        return entry
+
+    async def get_many(self, *names: str) -> list:
+        """Get several datasets, fetching any missing ones concurrently"""
+        return await asyncio.gather(*(self.get(name) for name in names))
+
+    def version(self, name: str) -> Optional[str]:
+        """Content version of a dataset that is already loaded, else None"""
+        entry = self._entries.get(name)
+        return entry.version if entry else None
+
+    async def refresh(self, name: str) -> CachedDataset:
+        """Revalidate a dataset against upstream now"""
+        async with self._lock(name):
+            current = self._entries.get(name) or await asyncio.to_thread(self._load_from_disk, name)
+            entry = await self._fetch(name, current)
+            # Swap the whole entry so readers never see a half-updated one
+            self._entries[name] = entry
+            return entry
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        if name not in self._locks:
+            self._locks[name] = asyncio.Lock()
+        return self._locks[name]
+
+    def _schedule_refresh(self, name: str) -> None:
+        task = self._refreshing.get(name)
+        if task is not None and not task.done():
+            return
+        task = asyncio.create_task(self._background_refresh(name))
+        self._refreshing[name] = task
+        # Keep a strong reference so the task isn't garbage collected mid-flight
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _background_refresh(self, name: str) -> None:
+        try:
+            await self.refresh(name)
+        except Exception as e:
+            logging.warning(f"Background refresh of survivoR dataset '{name}' failed: {str(e)}")
+            entry = self._entries.get(name)
+            if entry is not None:
+                # Keep serving the stale copy and try again shortly
+                entry.checked_at = time.time() - self.ttl_seconds + REFRESH_RETRY_SECONDS
+
+    # Upstream
+
+    async def _fetch(self, name: str, current: Optional[CachedDataset]) -> CachedDataset:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        data_path, _ = self._paths(name)
+        tmp_path = f"{data_path}.{os.getpid()}.tmp"
+        try:
+            if self.is_local:
+                result = await asyncio.to_thread(self._copy_local, name, current, tmp_path)
+            else:
+                result = await self._download(name, current, tmp_path)
+            if result is None:
+                # 304 Not Modified: keep the data, just restart the TTL
+                current.checked_at = time.time()
+                await asyncio.to_thread(self._write_meta, current)
+                return current
+            version, size, etag, last_modified = result
+            if current is not None and current.version == version:
+                current.etag, current.last_modified = etag, last_modified
+                current.checked_at = time.time()
+                await asyncio.to_thread(self._write_meta, current)
+                return current
+            os.replace(tmp_path, data_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        entry = CachedDataset(
+            name=name,
+            path=data_path,
+            version=version,
+            etag=etag,
+            last_modified=last_modified,
+            checked_at=time.time(),
+        )
+        await asyncio.to_thread(self._write_meta, entry)
+        logging.info(f"Loaded survivoR dataset '{name}' (version {version}, {size} bytes)")
+        return entry
+
+    async def _download(self, name: str, current: Optional[CachedDataset], dest: str):
+        headers = {}
+        if current is not None:
+            if current.etag:
+                headers["If-None-Match"] = current.etag
+            if current.last_modified:
+                headers["If-Modified-Since"] = current.last_modified
+        async with self.client.get(f"{self.base_url}{name}.json", headers=headers) as resp:
+            if resp.status == 304 and current is not None:
+                return None
+            resp.raise_for_status()
+            digest = hashlib.sha1()
+            size = 0
+            with open(dest, "wb") as f:
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    digest.update(chunk)
+                    size += len(chunk)
+                    f.write(chunk)
+            return digest.hexdigest()[:16], size, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+
+    def _copy_local(self, name: str, current: Optional[CachedDataset], dest: str):
+        base = self.base_url[len("file://"):] if self.base_url.startswith("file://") else self.base_url
+        path = os.path.join(base, f"{name}.json")
+        # The file's mtime plays the role of Last-Modified
+        last_modified = str(os.stat(path).st_mtime_ns)
+        if current is not None and current.last_modified == last_modified:
+            return None
+        digest = hashlib.sha1()
+        size = 0
+        with open(path, "rb") as src, open(dest, "wb") as f:
+            for chunk in iter(lambda: src.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+                size += len(chunk)
+                f.write(chunk)
+        return digest.hexdigest()[:16], size, None, last_modified
+
+    # Disk cache
+
+    def _paths(self, name: str):
+        data_path = os.path.join(self.cache_dir, f"{name}.json")
+        return data_path, data_path + ".meta"
+
+    def _load_from_disk(self, name: str) -> Optional[CachedDataset]:
+        data_path, meta_path = self._paths(name)
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(data_path):
+            return None
+        return CachedDataset(name=name, path=data_path, **meta)
+
+    def _write_meta(self, entry: CachedDataset) -> None:
+        if entry.path is None:
+            # Snapshot-backed: there is no cache file for this meta to describe
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        _, meta_path = self._paths(entry.name)
+        tmp_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": entry.version,
+                "etag": entry.etag,
+                "last_modified": entry.last_modified,
+                "checked_at": entry.checked_at,
+            }, f)
+        os.replace(tmp_path, meta_path)
+
+
+def _read_records(path: str) -> Iterator[dict]:
+    # Opened here rather than on first iteration: a refresh replaces the file
+    # with os.replace, so the handle keeps reading the version the entry
+    # describes however late the caller starts iterating
+    return _iter_records(open(path, "rb"))
+
+
+def _iter_records(f: BinaryIO) -> Iterator[dict]:
+    with f:
+        yield from iter_json_file(f)
+
+
+def snapshot_meta(entry: CachedDataset) -> dict:
+    """Store metadata to record for a dataset in a snapshot"""
+    return {
+        "version": entry.version,
+        "etag": entry.etag,
+        "last_modified": entry.last_modified,
+        "checked_at": entry.checked_at,
+    }
+
+
+# Global store instance
+survivor_store = SurvivorDataStore(
+    base_url=settings.SURVIVOR_API_BASE_URL,
+    cache_dir=settings.SURVIVOR_CACHE_DIR,
+    ttl_seconds=settings.SURVIVOR_CACHE_TTL_SECONDS,
+)
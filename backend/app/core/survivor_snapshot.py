@@ -0,0 +1,244 @@
+"""Compact binary snapshot of the survivoR datasets, loaded with mmap.
+
+build_survivor_snapshot.py writes every dataset into one file once. Each
+worker then maps that file read-only. Opening it only parses a small header,
+and the column pages live in the OS page cache, where every worker process
+shares them instead of holding its own copy of the parsed JSON.
+
+Layout (all integers little-endian):
+
+    MAGIC (8 bytes) | header length (uint64) | header (JSON) | pad to 8 | data
+
+The header records FORMAT_VERSION, each dataset's content version and HTTP
+validators, its row count and, per column, a kind plus offsets into the data
+section (every block is 8-byte aligned). Each column has a uint8 state array
+(ABSENT / VALUE / NULL, since survivoR rows omit missing keys) and then:
+
+    int     int64 values
+    float   float64 values
+    bool    int8 values
+    str     int32 codes into a string dictionary
+    json    int32 codes into a dictionary of JSON-encoded values (mixed types)
+
+A string dictionary is a uint32 offset table (n + 1 entries) followed by the
+UTF-8 blob it indexes.
+"""
+import json
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+MAGIC = b"SVRSNAP\x00"
+FORMAT_VERSION = 1
+
+# Per-cell states
+ABSENT, VALUE, NULL = 0, 1, 2
+
+_INT64_MIN, _INT64_MAX = -(2 ** 63), 2 ** 63 - 1
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _column_kind(values: List[Any]) -> str:
+    kinds = {type(v) for v in values}
+    if not kinds:
+        return "int"
+    if kinds == {bool}:
+        return "bool"
+    if kinds == {int} and all(_INT64_MIN <= v <= _INT64_MAX for v in values):
+        return "int"
+    if kinds == {float}:
+        return "float"
+    if kinds == {str}:
+        return "str"
+    # Mixed ints and floats included, so numbers keep their exact JSON form
+    return "json"
+
+
+class _Writer:
+    def __init__(self):
+        self.blocks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> int:
+        offset = self.size
+        padded = data + b"\x00" * (_align(len(data)) - len(data))
+        self.blocks.append(padded)
+        self.size += len(padded)
+        return offset
+
+    def add_dictionary(self, strings: List[str]) -> dict:
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        offsets[1:] = np.cumsum([len(e) for e in encoded], dtype=np.int64)
+        return {
+            "dict_size": len(encoded),
+            "dict_offsets": self.add(offsets.tobytes()),
+            "dict_blob": self.add(b"".join(encoded)),
+        }
+
+
+def _encode_column(writer: _Writer, states: np.ndarray, values: List[Any]) -> dict:
+    present = [v for v, state in zip(values, states) if state == VALUE]
+    kind = _column_kind(present)
+    meta = {"kind": kind, "states": writer.add(states.tobytes())}
+    if kind in ("int", "float", "bool"):
+        dtype, filler = {"int": ("<i8", 0), "float": ("<f8", 0.0), "bool": ("<i1", 0)}[kind]
+        array = np.array([v if state == VALUE else filler for v, state in zip(values, states)], dtype=dtype)
+        meta["values"] = writer.add(array.tobytes())
+        return meta
+    encode = (lambda v: v) if kind == "str" else (lambda v: json.dumps(v, separators=(",", ":")))
+    code_of: Dict[str, int] = {}
+    codes = np.full(len(values), -1, dtype="<i4")
+    for i, (value, state) in enumerate(zip(values, states)):
+        if state == VALUE:
+            codes[i] = code_of.setdefault(encode(value), len(code_of))
+    meta["codes"] = writer.add(codes.tobytes())
+    meta.update(writer.add_dictionary(list(code_of)))
+    return meta
+
+
+def write_snapshot(path: str, datasets: Dict[str, Tuple[dict, Iterable[dict]]]) -> None:
+    """Write a snapshot; datasets maps name -> (metadata, records), where metadata
+    holds the store's version/etag/last_modified/checked_at for that dataset"""
+    writer = _Writer()
+    header = {"format": FORMAT_VERSION, "built_at": time.time(), "datasets": {}}
+    for name, (meta, records) in datasets.items():
+        rows = list(records)
+        names: Dict[str, None] = {}
+        for row in rows:
+            names.update(dict.fromkeys(row))
+        columns = {}
+        for column in names:
+            states = np.fromiter(
+                (ABSENT if column not in row else NULL if row[column] is None else VALUE for row in rows),
+                dtype=np.uint8,
+                count=len(rows),
+            )
+            columns[column] = _encode_column(writer, states, [row.get(column) for row in rows])
+        header["datasets"][name] = {**meta, "rows": len(rows), "columns": columns}
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    prefix = MAGIC + struct.pack("<Q", len(header_bytes)) + header_bytes
+    prefix += b"\x00" * (_align(len(prefix)) - len(prefix))
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        for block in writer.blocks:
+            f.write(block)
+    # Atomic swap: workers that already mapped the old file keep reading it
+    os.replace(tmp_path, path)
+
+
+class SnapshotTable:
+    """Read-only columnar view over one dataset in a snapshot"""
+
+    def __init__(self, snapshot: "SurvivorSnapshot", name: str, meta: dict):
+        self.snapshot = snapshot
+        self.name = name
+        self.meta = meta
+        self.rows = meta["rows"]
+        self.column_names = list(meta["columns"])
+        self._dictionaries: Dict[str, list] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def kind(self, column: str) -> Optional[str]:
+        meta = self.meta["columns"].get(column)
+        return meta["kind"] if meta else None
+
+    def states(self, column: str) -> np.ndarray:
+        meta = self.meta["columns"].get(column)
+        if meta is None:
+            return np.zeros(self.rows, dtype=np.uint8)
+        return self.snapshot._array(meta["states"], np.uint8, self.rows)
+
+    def values(self, column: str) -> np.ndarray:
+        """Raw values of an int/float/bool column (undefined where state != VALUE)"""
+        meta = self.meta["columns"][column]
+        dtype = {"int": "<i8", "float": "<f8", "bool": "<i1"}[meta["kind"]]
+        return self.snapshot._array(meta["values"], dtype, self.rows)
+
+    def codes(self, column: str) -> np.ndarray:
+        """Dictionary codes of a str/json column, -1 where there is no value"""
+        meta = self.meta["columns"][column]
+        return self.snapshot._array(meta["codes"], "<i4", self.rows)
+
+    def dictionary(self, column: str) -> list:
+        """Decoded dictionary of a str/json column (small: distinct values only)"""
+        if column not in self._dictionaries:
+            meta = self.meta["columns"][column]
+            offsets = self.snapshot._array(meta["dict_offsets"], "<u4", meta["dict_size"] + 1)
+            blob = self.snapshot._bytes(meta["dict_blob"], int(offsets[-1]))
+            strings = [blob[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(meta["dict_size"])]
+            self._dictionaries[column] = strings if meta["kind"] == "str" else [json.loads(s) for s in strings]
+        return self._dictionaries[column]
+
+    def column(self, column: str) -> Tuple[list, list]:
+        """(python values, states) for one column, None where there is no value"""
+        kind = self.kind(column)
+        states = self.states(column).tolist()
+        if kind in ("str", "json"):
+            dictionary = self.dictionary(column)
+            values = [dictionary[c] if c >= 0 else None for c in self.codes(column).tolist()]
+        else:
+            values = self.values(column).tolist()
+            if kind == "bool":
+                values = [bool(v) for v in values]
+        return values, states
+
+    def __iter__(self) -> Iterator[dict]:
+        """Rebuild the original records, dropping keys that were absent"""
+        columns = [(name, *self.column(name)) for name in self.column_names]
+        for i in range(self.rows):
+            record = {}
+            for name, values, states in columns:
+                state = states[i]
+                if state == VALUE:
+                    record[name] = values[i]
+                elif state == NULL:
+                    record[name] = None
+            yield record
+
+
+class SurvivorSnapshot:
+    """A memory-mapped snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a survivoR snapshot")
+        (header_length,) = struct.unpack_from("<Q", self._mmap, len(MAGIC))
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mmap[start:start + header_length])
+        if self.header.get("format") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported snapshot format {self.header.get('format')} in {path}")
+        self._data_start = _align(start + header_length)
+        self.tables = {name: SnapshotTable(self, name, meta) for name, meta in self.header["datasets"].items()}
+
+    def _array(self, offset: int, dtype, count: int) -> np.ndarray:
+        # Zero-copy, read-only view onto the mapped pages
+        return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=self._data_start + offset)
+
+    def _bytes(self, offset: int, length: int) -> bytes:
+        start = self._data_start + offset
+        return self._mmap[start:start + length]
+
+    def table(self, name: str) -> Optional[SnapshotTable]:
+        return self.tables.get(name)
+
+
+def open_snapshot(path: str) -> Optional[SurvivorSnapshot]:
+    """Open a snapshot if one exists and is readable, else None"""
+    if not os.path.exists(path):
+        return None
+    return SurvivorSnapshot(path)
@@ -1,16 +1,55 @@
+from contextlib import asynccontextmanager
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
+from app.core.compression import CompressionMiddleware
+from app.core.http_client import http_client
+from app.core import process_pool
+from app.core.pubsub import pubsub
+from app.core.survivor_data import survivor_store
+from app.core.survivor_snapshot import open_snapshot
+from app.api.admin import router as admin_router
 from app.api.auth import router as auth_router
 from app.api.survivor import router as survivor_router
 from app.api.leagues import router as leagues_router
 from app.api.users import router as users_router
+from app.api.players import router as players_router
+from app.api.drafts import router as drafts_router
+from app.api.teams import router as teams_router
+from app.api.ws import router as ws_router
+from app.services.draft import draft_rooms
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client shared by every upstream request
+    await http_client.start()
+    # Map the prebuilt survivoR snapshot, if any, instead of parsing JSON per worker
+    try:
+        snapshot = open_snapshot(settings.SURVIVOR_SNAPSHOT_PATH)
+        if snapshot is not None:
+            survivor_store.attach_snapshot(snapshot)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring survivoR snapshot: {str(e)}")
+    # Reload running drafts from their pick logs so the pick clocks keep going
+    try:
+        resumed = await draft_rooms.resume_active()
+        if resumed:
+            logging.info(f"Resumed {resumed} running draft(s)")
+    except Exception as e:
+        logging.warning(f"Could not resume drafts: {str(e)}")
+    yield
+    draft_rooms.close()
+    process_pool.shutdown()
+    await pubsub.close()
+    await http_client.close()
 
 app = FastAPI(
     title="Survivor Fantasy League API",
     description="Fantasy sports platform for CBS Survivor fans",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -22,6 +61,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large JSON responses (brotli when installed, else gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    gzip_level=settings.GZIP_LEVEL,
+    brotli_quality=settings.BROTLI_QUALITY,
+)
+
 # Static files
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 
@@ -30,6 +77,11 @@ app.include_router(auth_router, prefix="/auth", tags=["auth"])
 app.include_router(survivor_router, prefix="/api", tags=["survivor"])
 app.include_router(leagues_router, prefix="/api", tags=["leagues"])
 app.include_router(users_router, prefix="/api", tags=["users"])
+app.include_router(players_router, prefix="/api", tags=["players"])
+app.include_router(drafts_router, prefix="/api", tags=["drafts"])
+app.include_router(teams_router, prefix="/api", tags=["teams"])
+app.include_router(admin_router, prefix="/api", tags=["admin"])
+app.include_router(ws_router, tags=["live"])
 
 # Root endpoints
 @app.get("/", tags=["root"])
@@ -0,0 +1,49 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+import enum
+
+class DraftOrderType(enum.Enum):
+    snake = "snake"  # order reverses every round
+    linear = "linear"  # same order every round
+
+class DraftStatus(enum.Enum):
+    pending = "pending"
+    active = "active"
+    complete = "complete"
+
+class Draft(Base):
+    __tablename__ = "drafts"
+    id = Column(Integer, primary_key=True, index=True)
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), nullable=False, index=True)
+    version = Column(String, nullable=False, default="US")  # survivoR version/season the contestants come from
+    season = Column(Integer, nullable=False)
+    order_type = Column(Enum(DraftOrderType), nullable=False, default=DraftOrderType.snake)
+    rounds = Column(Integer, nullable=False)
+    pick_seconds = Column(Integer, nullable=False, default=90)
+    pick_order = Column(JSON, nullable=False)  # user_ids in first-round order
+    contestants = Column(JSON, nullable=False)  # castaway_ids, fixed when the draft is created
+    status = Column(Enum(DraftStatus), nullable=False, default=DraftStatus.pending)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    started_at = Column(DateTime(timezone=True), nullable=True)
+
+    picks = relationship("DraftPick", back_populates="draft", order_by="DraftPick.pick_number")
+
+class DraftPick(Base):
+    """Append-only log of picks; replaying it rebuilds a draft room"""
+    __tablename__ = "draft_picks"
+    __table_args__ = (
+        # One pick per slot and each contestant once: concurrent writers lose on these
+        UniqueConstraint("draft_id", "pick_number", name="uq_draft_picks_slot"),
+        UniqueConstraint("draft_id", "castaway_id", name="uq_draft_picks_castaway"),
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    draft_id = Column(Integer, ForeignKey("drafts.id", ondelete="CASCADE"), nullable=False)
+    pick_number = Column(Integer, nullable=False)  # 0-based
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    castaway_id = Column(String, nullable=False)
+    auto = Column(Boolean, nullable=False, default=False)  # made by the pick clock
+    made_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    draft = relationship("Draft", back_populates="picks")
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, DateTime, Boolean, Float, Index, JSON, UniqueConstraint
+from sqlalchemy.orm import query_expression, relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
@@ -21,6 +21,7 @@ class LeagueSettings(Base):
     id = Column(Integer, primary_key=True, index=True)
     max_members = Column(Integer, default=20)
     is_private = Column(Boolean, default=True)
+    scoring_rules = Column(JSON(none_as_null=True), nullable=True)  # see services/scoring_rules.py; null means the game type's defaults
     league = relationship("League", back_populates="settings", uselist=False)
 
 class League(Base):
@@ -29,19 +30,43 @@ class League(Base):
     name = Column(String, unique=True, nullable=False)
     game_type = Column(Enum(GameType), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)  # drives ETag/Last-Modified
     settings_id = Column(Integer, ForeignKey("league_settings.id"))
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     join_code = Column(String, unique=True, nullable=False, default=lambda: secrets.token_urlsafe(8))
 
     settings = relationship("LeagueSettings", back_populates="league", uselist=False)
     memberships = relationship("LeagueMembership", back_populates="league")
+    member_count = query_expression()  # loaded by services/leagues.py:select_leagues(), else None
 
 class LeagueMembership(Base):
     __tablename__ = "league_memberships"
+    __table_args__ = (
+        # One membership per user and league; membership checks and join_league's
+        # ON CONFLICT DO NOTHING both go through it
+        UniqueConstraint("league_id", "user_id", name="uq_league_memberships_league_user"),
+        # Leagues of a user, answered from the index alone (role included)
+        Index("ix_league_memberships_user_league", "user_id", "league_id", postgresql_include=["role"]),
+    )
     id = Column(Integer, primary_key=True, index=True)
     league_id = Column(Integer, ForeignKey("leagues.id"))
     user_id = Column(Integer, ForeignKey("users.id"))
     role = Column(Enum(MemberRole), default=MemberRole.member)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    league = relationship("League", back_populates="memberships")
\ No newline at end of file
+    league = relationship("League", back_populates="memberships")
+
+class LeagueStanding(Base):
+    """Materialized leaderboard row per league member, kept current by the scoring path"""
+    __tablename__ = "league_standings"
+    __table_args__ = (
+        # Top-K pages: WHERE league_id = ? AND position > ? ORDER BY position
+        Index("ix_league_standings_league_position", "league_id", "position"),
+    )
+
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True, index=True)  # indexed for the cascade from users
+    points = Column(Float, nullable=False, default=0.0)
+    rank = Column(Integer, nullable=False)  # competition rank: tied members share it
+    position = Column(Integer, nullable=False)  # 1..n, ties broken by user_id; the keyset for paging
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
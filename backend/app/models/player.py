@@ -1,6 +1,6 @@
 from sqlalchemy import Column, Integer, String, Float
 from sqlalchemy.orm import relationship
-from .database import Base
+from app.core.database import Base
 
 class SurvivorPlayer(Base):
     __tablename__ = 'survivor_players'
@@ -19,5 +19,7 @@ class SurvivorPlayer(Base):
     confessional_count = Column(Integer, default=0)
     days_survived = Column(Integer, default=0)
 
-    # Relationships
-    teams = relationship("TeamPlayer", back_populates="player")
\ No newline at end of file
+    teams = relationship("TeamPlayer", back_populates="player")
+
+# Registers TeamPlayer for the relationship above wherever players are queried
+from app.models.team import TeamPlayer  # noqa: E402,F401
@@ -0,0 +1,67 @@
+from sqlalchemy import Column, Integer, BigInteger, SmallInteger, String, Float, DateTime, ForeignKey, Index, JSON, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class ScoredEpisode(Base):
+    """Ledger of episodes whose results have been applied to player scores"""
+    __tablename__ = "scored_episodes"
+    __table_args__ = (UniqueConstraint("version", "season", "episode", name="uq_scored_episodes_episode"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    version = Column(String, nullable=False)
+    season = Column(Integer, nullable=False)
+    episode = Column(Integer, nullable=False)
+    results_hash = Column(String, nullable=False)  # sha1 of the results last applied
+    revision = Column(Integer, nullable=False, default=1)  # bumped by every correction; tags its episode_events
+    scored_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    player_scores = relationship("EpisodePlayerScore", back_populates="scored_episode", cascade="all, delete-orphan")
+
+class EpisodePlayerScore(Base):
+    """Points one episode awarded one castaway, as currently included in total_score"""
+    __tablename__ = "episode_player_scores"
+
+    scored_episode_id = Column(Integer, ForeignKey("scored_episodes.id", ondelete="CASCADE"), primary_key=True)
+    castaway_id = Column(String, primary_key=True)
+    points = Column(Float, nullable=False)
+
+    scored_episode = relationship("ScoredEpisode", back_populates="player_scores")
+
+class EpisodeEvent(Base):
+    """Append-only log of scoring events; a correction appends negated copies of the rows it replaces"""
+    __tablename__ = "episode_events"
+    __table_args__ = (
+        # Replays: WHERE castaway_id IN (...) AND id > ?
+        Index("ix_episode_events_castaway_id", "castaway_id", "id"),
+        # Retractions: WHERE scored_episode_id = ? AND revision = ?
+        Index("ix_episode_events_episode_revision", "scored_episode_id", "revision"),
+    )
+
+    id = Column(BigInteger, primary_key=True)  # log position
+    # Position of the episode's first logged row, shared by its retractions and corrections;
+    # a team earns the row if it held the castaway before this
+    origin_event_id = Column(BigInteger, nullable=False)
+    scored_episode_id = Column(Integer, ForeignKey("scored_episodes.id", ondelete="CASCADE"), nullable=False)
+    revision = Column(Integer, nullable=False)
+    version = Column(String, nullable=False)
+    season = Column(Integer, nullable=False)
+    episode = Column(Integer, nullable=False)
+    castaway_id = Column(String, nullable=False)
+    event = Column(String, nullable=False)  # see EVENTS in services/scoring_rules.py
+    flags = Column(JSON, nullable=False)  # names of the event's flags that are set
+    count = Column(Float, nullable=False, default=1.0)
+    sign = Column(SmallInteger, nullable=False, default=1)  # -1 retracts an earlier row
+    recorded_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class LeagueSnapshot(Base):
+    """A league's replayed state up to one position of the event log"""
+    __tablename__ = "league_snapshots"
+    __table_args__ = (Index("ix_league_snapshots_league_event", "league_id", "last_event_id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), nullable=False)
+    last_event_id = Column(BigInteger, nullable=False)
+    rules_hash = Column(String, nullable=False)  # the ruleset the state was scored with
+    state = Column(JSON, nullable=False)  # {team_id: {castaway_id: points}}
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey, DateTime, Float, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class FantasyTeam(Base):
+    """One league member's roster; score is the sum of its players' points since they joined it"""
+    __tablename__ = "fantasy_teams"
+    __table_args__ = (
+        # Teams in league: WHERE league_id = ? ORDER BY score DESC
+        Index("ix_fantasy_teams_league_score", "league_id", "score"),
+        UniqueConstraint("membership_id", name="uq_fantasy_teams_membership"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    league_id = Column(Integer, ForeignKey("leagues.id", ondelete="CASCADE"), nullable=False)
+    membership_id = Column(Integer, ForeignKey("league_memberships.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)  # copied from the membership for profile pages
+    name = Column(String, nullable=True)
+    score = Column(Float, nullable=False, default=0.0)  # denormalized, kept current by services/scoring.py
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    players = relationship("TeamPlayer", back_populates="team", cascade="all, delete-orphan")
+
+class TeamPlayer(Base):
+    __tablename__ = "team_players"
+    __table_args__ = (
+        # Teams holding player X: WHERE player_id = ?
+        Index("ix_team_players_player_team", "player_id", "team_id"),
+    )
+
+    team_id = Column(Integer, ForeignKey("fantasy_teams.id", ondelete="CASCADE"), primary_key=True)
+    player_id = Column(Integer, ForeignKey("survivor_players.id", ondelete="CASCADE"), primary_key=True)
+    added_at = Column(DateTime(timezone=True), server_default=func.now())
+    from_event_id = Column(BigInteger, nullable=False, default=0)  # the team earns episode_events after this one
+
+    team = relationship("FantasyTeam", back_populates="players")
+    player = relationship("SurvivorPlayer", back_populates="teams")
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class User(Base):
     __tablename__ = 'users'
+    __table_args__ = (
+        # Admin user listing: keyset pages over ORDER BY created_at DESC, id DESC
+        Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
 
     # Primary key
     id = Column(Integer, primary_key=True, index=True)
@@ -21,7 +25,8 @@ class User(Base):
     first_name = Column(String, nullable=True)
     last_name = Column(String, nullable=True)
     is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)  # drives ETag/Last-Modified
     profile_picture = Column(String, nullable=True)  # stores relative path or filename
     bio = Column(String, nullable=True)
 
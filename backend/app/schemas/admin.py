@@ -0,0 +1,100 @@
+from pydantic import BaseModel, field_validator
+from typing import List, Optional
+from app.schemas.league import MemberRole
+
+class EngineProfileOut(BaseModel):
+    name: str
+    pooled: bool
+    pool_size: int
+    max_overflow: int
+    pool_timeout: float
+    pool_recycle: int
+    pool_pre_ping: bool
+    statement_cache_size: int
+    statement_timeout_ms: int
+    slow_query_ms: int
+    echo: bool
+
+class PoolStatusOut(BaseModel):
+    """Current occupancy; only pooled profiles report the counts"""
+    pool_class: str
+    size: Optional[int] = None
+    checked_in: Optional[int] = None
+    checked_out: Optional[int] = None
+    overflow: Optional[int] = None  # negative while the pool has not opened all its connections yet
+
+class PoolMetricsOut(BaseModel):
+    """Counters since the process started (or since the last reset)"""
+    checkouts: int
+    checkout_timeouts: int
+    wait_ms_total: float
+    wait_ms_avg: float
+    wait_ms_max: float
+    connections_opened: int
+    connections_invalidated: int
+    overflow_max: int
+    slow_queries: int
+
+class DbPoolReport(BaseModel):
+    profile: EngineProfileOut
+    pool: PoolStatusOut
+    metrics: PoolMetricsOut
+
+class BulkUserDelete(BaseModel):
+    user_ids: Optional[List[int]] = None  # None with all=true deletes everyone but the caller
+    all: bool = False
+    confirm: bool = False
+
+class BulkUsersDeleted(BaseModel):
+    users_deleted: int
+    users_skipped: int  # in the pick order of an active draft; delete them once it completes
+    memberships_removed: int
+    leagues_transferred: int  # owned leagues handed to another member
+    leagues_deleted: int  # owned leagues nobody else was left in
+    draft_picks_removed: int
+    chunks: int
+
+    class Config:
+        from_attributes = True
+
+class BulkAdminFlag(BaseModel):
+    user_ids: List[int]
+    is_admin: bool
+
+class BulkAdminFlagsChanged(BaseModel):
+    users_updated: int  # users that already had the flag are not counted
+    chunks: int
+
+    class Config:
+        from_attributes = True
+
+class MembershipImportRow(BaseModel):
+    league_id: int
+    user_id: int
+    role: MemberRole = MemberRole.member
+
+    @field_validator("role")
+    @classmethod
+    def not_owner(cls, role: MemberRole) -> MemberRole:
+        if role == MemberRole.owner:
+            raise ValueError("owners are set by creating or transferring a league")
+        return role
+
+class MembershipImport(BaseModel):
+    memberships: List[MembershipImportRow]
+
+class MembershipKey(BaseModel):
+    league_id: int
+    user_id: int
+
+class MembershipRemoval(BaseModel):
+    memberships: List[MembershipKey]
+
+class BulkMembershipsChanged(BaseModel):
+    changed: int  # memberships inserted or removed
+    skipped: int  # already members / not members, unknown leagues or users, league owners
+    leagues: int  # leagues whose membership changed
+    chunks: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,46 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from enum import Enum
+from datetime import datetime
+
+class DraftOrderType(str, Enum):
+    snake = "snake"
+    linear = "linear"
+
+class DraftStatus(str, Enum):
+    pending = "pending"
+    active = "active"
+    complete = "complete"
+
+class DraftCreate(BaseModel):
+    season: int
+    version: str = "US"
+    order_type: DraftOrderType = DraftOrderType.snake
+    rounds: int = Field(default=3, ge=1, le=20)
+    pick_seconds: int = Field(default=90, ge=5, le=3600)
+    pick_order: Optional[List[int]] = None  # user_ids; members in random order if omitted
+
+class DraftPickIn(BaseModel):
+    castaway_id: str
+
+class DraftPickOut(BaseModel):
+    pick_number: int
+    user_id: int
+    castaway_id: str
+    auto: bool
+
+class DraftState(BaseModel):
+    id: int
+    league_id: int
+    version: str
+    season: int
+    order_type: DraftOrderType
+    rounds: int
+    pick_seconds: int
+    pick_order: List[int]
+    status: DraftStatus
+    picks: List[DraftPickOut]
+    available: List[str]
+    on_the_clock: Optional[int] = None  # user_id, while the draft is active
+    pick_number: Optional[int] = None
+    deadline: Optional[datetime] = None  # when the clock auto-picks
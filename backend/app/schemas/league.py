@@ -37,6 +37,7 @@ class LeagueOut(LeagueBase):
     owner_id: int
     join_code: str  # add join_code to schema
     settings: Optional[LeagueSettingsOut]
+    member_count: Optional[int] = None
 
     class Config:
         orm_mode = True
@@ -51,4 +52,31 @@ class LeagueMembershipOut(BaseModel):
 
     class Config:
         orm_mode = True
-        from_attributes = True  # for Pydantic v2 compatibility
\ No newline at end of file
+        from_attributes = True  # for Pydantic v2 compatibility
+
+class LeaguePage(BaseModel):
+    items: List[LeagueOut]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+    total_estimate: Optional[int] = None  # with ?with_total=true
+
+class LeagueMembersPage(BaseModel):
+    items: List[LeagueMembershipOut]
+    next_cursor: Optional[str] = None
+    total_estimate: Optional[int] = None  # with ?with_total=true; the planner's estimate
+
+class LeagueStandingOut(BaseModel):
+    user_id: int
+    username: str
+    points: float
+    rank: int
+    position: int
+
+    class Config:
+        from_attributes = True
+
+class LeagueStandingsPage(BaseModel):
+    items: List[LeagueStandingOut]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= for the next page
+
+class MyLeagueStanding(LeagueStandingOut):
+    out_of: int  # members ranked in the league
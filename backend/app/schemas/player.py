@@ -5,10 +5,10 @@ class SurvivorPlayerBase(BaseModel):
     castaway_id: str
     name: str
     season: int
-    age: int
-    occupation: str
-    tribe: str
-    status: str
+    age: Optional[int] = None
+    occupation: Optional[str] = None
+    tribe: Optional[str] = None
+    status: Optional[str] = None
     total_score: float = 0.0
     immunity_wins: int = 0
     reward_wins: int = 0
@@ -25,7 +25,7 @@ class SurvivorPlayer(SurvivorPlayerBase):
     id: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 class SurvivorPlayerList(BaseModel):
     players: List[SurvivorPlayer]
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from typing import List, Optional
+
+class CastawayProjection(BaseModel):
+    castaway_id: str
+    name: Optional[str] = None
+    status: str  # "active" or "eliminated" as of the projected episode
+    points_to_date: float
+    win_probability: float
+    eliminated_next_probability: float  # voted out in the next episode
+    finalist_probability: float  # makes the final tribal council
+    projected_points: float  # points to date plus the expected rest of the season
+
+class TeamProjection(BaseModel):
+    user_id: int
+    castaway_ids: List[str]
+    points_to_date: float
+    projected_points: float
+
+class SeasonProjection(BaseModel):
+    version: str
+    season: int
+    episode: int  # projection as of the end of this episode
+    simulations: int
+    remaining_episodes: int
+    castaways: List[CastawayProjection]
+    teams: Optional[List[TeamProjection]] = None  # drafted rosters, when a league is given
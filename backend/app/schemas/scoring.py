@@ -0,0 +1,92 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from app.schemas.league import GameType
+
+class EpisodeResults(BaseModel):
+    """One episode's results; rows use the survivoR dataset shapes"""
+    version: str = "US"
+    season: int
+    episode: int
+    challenges: List[Dict[str, Any]] = []  # challenge_results rows
+    votes: List[Dict[str, Any]] = []  # vote_history rows
+    confessionals: List[Dict[str, Any]] = []  # confessionals rows
+    eliminated: List[str] = []  # castaway_ids out this episode besides voted_out_id (quits, medevacs)
+
+class EpisodeScoreResult(BaseModel):
+    version: str
+    season: int
+    episode: int
+    applied: bool  # False when these exact results were already applied
+    players_scored: int
+    players_updated: int
+    teams_updated: int = 0  # fantasy teams whose score moved
+
+class EpisodeEventOut(BaseModel):
+    """One row of the episode event log"""
+    id: int
+    revision: int
+    castaway_id: str
+    event: str
+    flags: List[str]
+    count: float
+    sign: int  # -1 retracts a row of the previous revision
+    recorded_at: datetime
+
+class LeagueRebuildOut(BaseModel):
+    league_id: int
+    events_replayed: int
+    teams_updated: int
+    snapshot_event_id: Optional[int] = None  # set when the rebuild stored a new snapshot
+
+class ScoringRule(BaseModel):
+    """Points for every event row matching event and the flag conditions in when"""
+    event: str
+    points: float
+    when: Dict[str, bool] = {}
+    per_count: bool = False  # multiply by the event's count (e.g. confessionals)
+
+class ScoringRuleset(BaseModel):
+    rules: List[ScoringRule]
+
+class LeagueScoringRules(ScoringRuleset):
+    game_type: GameType
+    is_default: bool  # the league has no rules of its own
+    hash: str
+
+class DistributionStats(BaseModel):
+    count: int
+    mean: float
+    std: float
+    min: float
+    p10: float
+    p25: float
+    p50: float
+    p75: float
+    p90: float
+    max: float
+
+class BacktestCastaway(BaseModel):
+    castaway_id: str
+    seasons: int
+    total: float  # career fantasy points under the ruleset
+    mean_per_season: float
+    best_season_total: float
+
+class BacktestSeason(BaseModel):
+    version: str
+    season: int
+    castaways: int
+    mean: float
+    max: float
+    top_castaway_id: Optional[str] = None
+
+class BacktestResult(BaseModel):
+    hash: str  # ruleset hash
+    game_type: GameType
+    dataset_versions: List[str]
+    seasons: int
+    season_totals: DistributionStats  # one value per castaway per season
+    episode_points: DistributionStats  # one value per castaway per episode they played
+    castaways: List[BacktestCastaway]  # best career totals first
+    by_season: List[BacktestSeason]
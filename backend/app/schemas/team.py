@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+class FantasyTeamOut(BaseModel):
+    id: int
+    league_id: int
+    league_name: str
+    user_id: int
+    username: str
+    name: Optional[str] = None
+    score: float  # points earned by the roster since each player joined it
+    updated_at: datetime
+
+class TeamPlayerOut(BaseModel):
+    player_id: int
+    castaway_id: str
+    name: str
+    status: Optional[str] = None
+    total_score: float = 0.0
+    added_at: Optional[datetime] = None
+
+class FantasyTeamDetail(FantasyTeamOut):
+    players: List[TeamPlayerOut]
@@ -0,0 +1,145 @@
+"""Historical backtests of scoring rules.
+
+backtest() replays every survivoR season under a ruleset. Each season is one
+job in the shared process pool (app/core/process_pool.py): the worker groups
+the season's rows by episode, builds one event table for the whole season and
+scores it in a single pass with the compiled rules (scoring_rules.py). The
+parent combines the per-season results into career totals per castaway and
+distribution stats.
+
+Results are cached by (ruleset hash, dataset versions), so comparing rulesets
+that were already run is instant.
+"""
+import asyncio
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.process_pool import run_in_process
+from app.core.result_cache import ResultCache
+from app.models.league import GameType
+from app.schemas.scoring import EpisodeResults
+from app.services.projections import ProjectionIndex, projection_index
+from app.services.scoring_rules import DEFAULT_RULES, VOCABULARIES, EventTableBuilder, compile_rules
+from app.services.survivor_index import DatasetIndex
+
+# Percentiles reported by distribution_stats()
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+def backtest_season(rules: dict, version: str, season: int, challenges: List[dict], votes: List[dict], confessionals: List[dict]) -> dict:
+    """Score one season under a ruleset (runs in a worker process)"""
+    episodes: Dict[int, EpisodeResults] = {}
+    for key, rows in (("challenges", challenges), ("votes", votes), ("confessionals", confessionals)):
+        for row in rows:
+            number = row.get("episode") or 0
+            if number not in episodes:
+                episodes[number] = EpisodeResults(version=version, season=season, episode=number)
+            getattr(episodes[number], key).append(row)
+    builder = EventTableBuilder(VOCABULARIES[GameType.survivor])
+    for number in sorted(episodes):
+        builder.add_survivor_episode(episodes[number])
+    table = builder.build()
+    compiled = compile_rules(GameType.survivor, rules)
+    points = compiled.row_points(table)
+    totals = np.bincount(table.castaway, weights=points, minlength=len(table.castaway_ids))
+    # Points per (castaway, episode) the castaway had events in
+    cell = table.castaway * (int(table.episode.max(initial=0)) + 1) + table.episode
+    cells, inverse = np.unique(cell, return_inverse=True)
+    return {
+        "version": version,
+        "season": season,
+        "castaway_ids": table.castaway_ids,
+        "totals": totals,
+        "episode_points": np.bincount(inverse, weights=points, minlength=len(cells)),
+    }
+
+
+def distribution_stats(values: np.ndarray) -> dict:
+    if len(values) == 0:
+        return {"count": 0, "mean": 0.0, "std": 0.0, "min": 0.0, "max": 0.0, **{f"p{p}": 0.0 for p in PERCENTILES}}
+    percentiles = np.percentile(values, PERCENTILES)
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        **{f"p{p}": float(v) for p, v in zip(PERCENTILES, percentiles)},
+    }
+
+
+def combine(digest: str, versions: tuple, seasons: List[dict]) -> dict:
+    """Career totals, per-season summaries and distributions from per-season results"""
+    careers: Dict[str, dict] = defaultdict(lambda: {"seasons": 0, "total": 0.0, "best_season_total": None})
+    by_season = []
+    for result in seasons:
+        totals = result["totals"]
+        for castaway_id, total in zip(result["castaway_ids"], totals.tolist()):
+            career = careers[castaway_id]
+            career["seasons"] += 1
+            career["total"] += total
+            if career["best_season_total"] is None or total > career["best_season_total"]:
+                career["best_season_total"] = total
+        top = int(totals.argmax()) if len(totals) else None
+        by_season.append({
+            "version": result["version"],
+            "season": result["season"],
+            "castaways": len(totals),
+            "mean": float(totals.mean()) if len(totals) else 0.0,
+            "max": float(totals.max()) if len(totals) else 0.0,
+            "top_castaway_id": result["castaway_ids"][top] if top is not None else None,
+        })
+    castaways = [
+        {
+            "castaway_id": castaway_id,
+            "seasons": career["seasons"],
+            "total": career["total"],
+            "mean_per_season": career["total"] / career["seasons"],
+            "best_season_total": career["best_season_total"],
+        }
+        for castaway_id, career in careers.items()
+    ]
+    castaways.sort(key=lambda c: (-c["total"], c["castaway_id"]))
+    empty = np.array([], dtype=np.float64)
+    return {
+        "hash": digest,
+        "game_type": GameType.survivor.value,
+        "dataset_versions": list(versions),
+        "seasons": len(seasons),
+        "season_totals": distribution_stats(np.concatenate([r["totals"] for r in seasons] or [empty])),
+        "episode_points": distribution_stats(np.concatenate([r["episode_points"] for r in seasons] or [empty])),
+        "castaways": castaways,
+        "by_season": by_season,
+    }
+
+
+class Backtests:
+    """Cached backtests; concurrent requests for one ruleset share a run"""
+
+    def __init__(self, index: DatasetIndex, maxsize: int):
+        self.index = index
+        self.cache: ResultCache[dict] = ResultCache(maxsize)
+
+    async def run(self, rules: Optional[dict] = None) -> dict:
+        """Backtest a survivor ruleset (the default when None); raises InvalidRules"""
+        rules = rules if rules is not None else DEFAULT_RULES[GameType.survivor]
+        compiled = compile_rules(GameType.survivor, rules)  # validates before any work is queued
+        index = await self.index.get()
+        key = (compiled.digest, index.versions)
+        return await self.cache.get_or_compute(key, lambda: self._run(index, rules, compiled.digest))
+
+    async def _run(self, index: ProjectionIndex, rules: dict, digest: str) -> dict:
+        jobs = []
+        for version, season in index.seasons():
+            events = index.events(version, season)
+            jobs.append(run_in_process(
+                backtest_season, rules, version, season, events.challenges, events.votes, events.confessionals
+            ))
+        return combine(digest, index.versions, list(await asyncio.gather(*jobs)))
+
+
+# Global backtest cache
+backtests = Backtests(projection_index, maxsize=settings.BACKTEST_CACHE_SIZE)
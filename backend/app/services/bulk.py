@@ -0,0 +1,317 @@
+"""Set-based bulk admin operations.
+
+Every operation works through its rows in chunks of BULK_CHUNK_SIZE. A chunk
+is a few set-based statements (INSERT/UPDATE/DELETE ... RETURNING over id
+arrays, no ORM objects) in a transaction of its own, committed before the
+next chunk starts: locks are held for one chunk at a time, no statement has
+more than a chunk of rows to work through, and an operation that stops half
+way keeps the chunks it finished. Standings changes are published, and the
+cached principals of deleted users or changed admin flags dropped, after
+each commit.
+
+Deleting users cleans up what references them, in the same chunk:
+
+- users in the pick order of an active draft are skipped (counted in
+  users_skipped): a running draft's pick log and clock depend on every
+  picker, so they can only go once it is complete;
+- pending drafts drop them from their pick order (a draft left without
+  pickers is deleted), and the live rooms of changed or deleted drafts are
+  dropped from draft_rooms after the commit, to be reloaded on next use;
+- leagues they own pass to a remaining member (league admins first, then
+  whoever joined first); leagues nobody else is left in are deleted, with
+  their settings, drafts, teams and standings;
+- their memberships (and so their teams) are removed and the leagues they
+  were in re-ranked;
+- their draft picks, which by then only completed drafts can hold, are removed.
+
+benchmarks/bench_bulk_admin.py runs these at hundreds of thousands of rows.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Integer, String, all_, any_, cast, delete, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.principals import principal_cache
+from app.models.draft import Draft, DraftPick, DraftStatus
+from app.models.league import League, LeagueMembership, LeagueSettings, MemberRole
+from app.models.user import User
+from app.services.draft import draft_rooms
+from app.services.leagues import touch_leagues
+from app.services.standings import StandingChanges, publish_standing_changes, sync_members
+
+users = User.__table__
+drafts = Draft.__table__
+leagues = League.__table__
+memberships = LeagueMembership.__table__
+
+
+@dataclass
+class UsersDeleted:
+    users_deleted: int = 0
+    users_skipped: int = 0  # in the pick order of an active draft
+    memberships_removed: int = 0
+    leagues_transferred: int = 0
+    leagues_deleted: int = 0
+    draft_picks_removed: int = 0
+    chunks: int = 0
+    user_ids: List[int] = field(default_factory=list)  # the users deleted
+
+
+@dataclass
+class AdminFlagsChanged:
+    users_updated: int = 0
+    chunks: int = 0
+    user_ids: List[int] = field(default_factory=list)  # the users whose flag changed
+
+
+@dataclass
+class MembershipsChanged:
+    changed: int = 0  # memberships inserted or removed
+    skipped: int = 0  # duplicates, unknown leagues or users, owners
+    leagues: int = 0  # leagues whose membership changed
+    chunks: int = 0
+
+
+def _ids(values: Sequence[int]):
+    """One array parameter instead of one parameter per id"""
+    return literal(list(values), ARRAY(Integer))
+
+
+def _chunks(rows: Sequence, size: Optional[int] = None) -> Iterable[Sequence]:
+    size = size or settings.BULK_CHUNK_SIZE
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def _user_id_chunks(session: AsyncSession, user_ids: Optional[Iterable[int]], keep: Set[int]) -> AsyncIterator[List[int]]:
+    """Chunks of the given user ids, or of every user when user_ids is None, never including keep"""
+    if user_ids is not None:
+        for chunk in _chunks(sorted(set(user_ids) - keep)):
+            yield list(chunk)
+        return
+    last = 0
+    while True:
+        stmt = select(users.c.id).where(users.c.id > last).order_by(users.c.id).limit(settings.BULK_CHUNK_SIZE)
+        if keep:
+            stmt = stmt.where(users.c.id.not_in(keep))
+        chunk = (await session.execute(stmt)).scalars().all()
+        if not chunk:
+            return
+        yield list(chunk)
+        last = chunk[-1]
+
+
+async def delete_users(session: AsyncSession, user_ids: Optional[Iterable[int]], keep: Iterable[int] = ()) -> UsersDeleted:
+    """Delete users (every user if user_ids is None) except those in keep, with their dependent rows"""
+    result = UsersDeleted()
+    async for chunk in _user_id_chunks(session, user_ids, set(keep)):
+        deleted = len(result.user_ids)
+        changes, draft_ids = await _delete_user_chunk(session, chunk, result)
+        await session.commit()
+        principal_cache.invalidate_ids(result.user_ids[deleted:])
+        for draft_id in draft_ids:
+            draft_rooms.drop(draft_id)
+        await publish_standing_changes(changes)
+        result.chunks += 1
+    logging.info(
+        f"Bulk delete: {result.users_deleted} users ({result.users_skipped} in active drafts skipped), "
+        f"{result.memberships_removed} memberships, "
+        f"{result.leagues_transferred} leagues transferred, {result.leagues_deleted} leagues deleted "
+        f"in {result.chunks} chunks"
+    )
+    return result
+
+
+async def _running_drafts(session: AsyncSession, ids: List[int]) -> list:
+    """Pending and active drafts with any of the users in their pick order, locked until commit"""
+    entry = func.json_array_elements_text(drafts.c.pick_order).table_valued("value").alias("entry")
+    return (await session.execute(
+        select(drafts.c.id, drafts.c.status, drafts.c.pick_order)
+        .where(
+            drafts.c.status != DraftStatus.complete,
+            select(entry.c.value).where(cast(entry.c.value, Integer) == any_(_ids(ids))).exists(),
+        )
+        .order_by(drafts.c.id)
+        .with_for_update()
+    )).all()
+
+
+async def _delete_user_chunk(session: AsyncSession, ids: List[int], result: UsersDeleted) -> Tuple[StandingChanges, List[int]]:
+    """Delete one chunk of users; returns the standings changes and the drafts whose rooms are stale"""
+    running = await _running_drafts(session, ids)
+    busy = {user_id for draft in running if draft.status == DraftStatus.active for user_id in draft.pick_order}
+    if busy & set(ids):
+        result.users_skipped += len(busy & set(ids))
+        ids = [user_id for user_id in ids if user_id not in busy]
+        if not ids:
+            return {}, []
+    gone = set(ids)
+    draft_ids: List[int] = []
+    for draft in running:
+        if draft.status != DraftStatus.pending or gone.isdisjoint(draft.pick_order):
+            continue
+        pick_order = [user_id for user_id in draft.pick_order if user_id not in gone]
+        if pick_order:
+            await session.execute(update(drafts).where(drafts.c.id == draft.id).values(pick_order=pick_order))
+        else:
+            await session.execute(delete(drafts).where(drafts.c.id == draft.id))
+        draft_ids.append(draft.id)
+
+    owned = (await session.execute(
+        select(leagues.c.id).where(leagues.c.owner_id == any_(_ids(ids))).order_by(leagues.c.id).with_for_update()
+    )).scalars().all()
+    orphaned: List[int] = []
+    if owned:
+        # One successor per league: admins first, then the earliest member
+        successors = (await session.execute(
+            select(memberships.c.league_id, memberships.c.user_id, memberships.c.id)
+            .where(
+                memberships.c.league_id == any_(_ids(owned)),
+                memberships.c.user_id.is_not(None),
+                memberships.c.user_id != all_(_ids(ids)),
+            )
+            .distinct(memberships.c.league_id)
+            .order_by(
+                memberships.c.league_id,
+                memberships.c.role.is_distinct_from(MemberRole.admin),
+                memberships.c.joined_at,
+                memberships.c.id,
+            )
+        )).all()
+        if successors:
+            handover = _membership_rows([(s.league_id, s.user_id) for s in successors])
+            await session.execute(
+                update(leagues).where(leagues.c.id == handover.c.league_id)
+                .values(owner_id=handover.c.user_id, updated_at=func.now())
+            )
+            await session.execute(
+                update(memberships).where(memberships.c.id == any_(_ids([s.id for s in successors])))
+                .values(role=MemberRole.owner)
+            )
+        result.leagues_transferred += len(successors)
+        orphaned = sorted(set(owned) - {s.league_id for s in successors})
+    if orphaned:
+        draft_ids += (await session.execute(
+            select(drafts.c.id).where(drafts.c.league_id == any_(_ids(orphaned)), drafts.c.status != DraftStatus.complete)
+        )).scalars().all()
+        result.memberships_removed += len((await session.execute(
+            delete(memberships).where(memberships.c.league_id == any_(_ids(orphaned))).returning(memberships.c.id)
+        )).all())
+        # Standings, drafts, teams and snapshots go with the league (ON DELETE CASCADE)
+        settings_ids = (await session.execute(
+            delete(leagues).where(leagues.c.id == any_(_ids(orphaned))).returning(leagues.c.settings_id)
+        )).scalars().all()
+        settings_ids = [settings_id for settings_id in settings_ids if settings_id is not None]
+        if settings_ids:
+            await session.execute(delete(LeagueSettings.__table__).where(LeagueSettings.id == any_(_ids(settings_ids))))
+        result.leagues_deleted += len(orphaned)
+
+    left = (await session.execute(
+        delete(memberships).where(memberships.c.user_id == any_(_ids(ids))).returning(memberships.c.league_id)
+    )).scalars().all()
+    result.memberships_removed += len(left)
+    # Re-rank before the users go, so their standings rows are reported as removed
+    changes = await sync_members(session, left)
+    await touch_leagues(session, left)
+    picks = DraftPick.__table__
+    result.draft_picks_removed += len((await session.execute(
+        delete(picks).where(picks.c.user_id == any_(_ids(ids))).returning(picks.c.id)
+    )).all())
+    deleted = (await session.execute(
+        delete(users).where(users.c.id == any_(_ids(ids))).returning(users.c.id)
+    )).scalars().all()
+    result.users_deleted += len(deleted)
+    result.user_ids.extend(deleted)
+    return changes, draft_ids
+
+
+async def set_admin_flags(session: AsyncSession, user_ids: Iterable[int], is_admin: bool) -> AdminFlagsChanged:
+    """Grant or revoke the site admin flag; users who already have the value are left alone"""
+    result = AdminFlagsChanged()
+    for chunk in _chunks(sorted(set(user_ids))):
+        updated = (await session.execute(
+            update(users)
+            .where(users.c.id == any_(_ids(chunk)), users.c.is_admin.is_distinct_from(is_admin))
+            .values(is_admin=is_admin, updated_at=func.now())
+            .returning(users.c.id)
+        )).scalars().all()
+        await session.commit()
+        principal_cache.invalidate_ids(updated)
+        result.users_updated += len(updated)
+        result.user_ids.extend(updated)
+        result.chunks += 1
+    logging.info(f"Bulk admin flag {'granted to' if is_admin else 'revoked from'} {result.users_updated} users")
+    return result
+
+
+def _membership_rows(rows: Sequence[Tuple]):
+    """(league_id, user_id[, role]) tuples as a derived table, from one array parameter per column"""
+    columns = [
+        func.unnest(_ids([row[0] for row in rows])).label("league_id"),
+        func.unnest(_ids([row[1] for row in rows])).label("user_id"),
+    ]
+    if rows and len(rows[0]) > 2:
+        columns.append(func.unnest(literal([row[2].value for row in rows], ARRAY(String))).label("role"))
+    return select(*columns).subquery("rows")
+
+
+async def import_memberships(session: AsyncSession, rows: Sequence[Tuple[int, int, MemberRole]]) -> MembershipsChanged:
+    """Add (league_id, user_id, role) memberships, skipping existing ones and unknown leagues or users"""
+    result = MembershipsChanged()
+    touched: Set[int] = set()
+    for chunk in _chunks(rows):
+        incoming = _membership_rows(chunk)
+        inserted = (await session.execute(
+            insert(memberships)
+            .from_select(
+                ["league_id", "user_id", "role"],
+                select(incoming.c.league_id, incoming.c.user_id, cast(incoming.c.role, memberships.c.role.type))
+                .join(leagues, leagues.c.id == incoming.c.league_id)
+                .join(users, users.c.id == incoming.c.user_id),
+            )
+            .on_conflict_do_nothing(index_elements=[memberships.c.league_id, memberships.c.user_id])
+            .returning(memberships.c.league_id)
+        )).scalars().all()
+        changes = await sync_members(session, inserted)
+        await touch_leagues(session, inserted)
+        await session.commit()
+        await publish_standing_changes(changes)
+        result.changed += len(inserted)
+        result.skipped += len(chunk) - len(inserted)
+        result.chunks += 1
+        touched.update(inserted)
+    result.leagues = len(touched)
+    logging.info(f"Bulk membership import: {result.changed} added, {result.skipped} skipped")
+    return result
+
+
+async def remove_memberships(session: AsyncSession, rows: Sequence[Tuple[int, int]]) -> MembershipsChanged:
+    """Remove (league_id, user_id) memberships; league owners stay (transfer ownership first)"""
+    result = MembershipsChanged()
+    touched: Set[int] = set()
+    for chunk in _chunks(rows):
+        outgoing = _membership_rows(chunk)
+        removed = (await session.execute(
+            delete(memberships)
+            .where(
+                memberships.c.league_id == outgoing.c.league_id,
+                memberships.c.user_id == outgoing.c.user_id,
+                memberships.c.role.is_distinct_from(MemberRole.owner),
+            )
+            .returning(memberships.c.league_id)
+        )).scalars().all()
+        changes = await sync_members(session, removed)
+        await touch_leagues(session, removed)
+        await session.commit()
+        await publish_standing_changes(changes)
+        result.changed += len(removed)
+        result.skipped += len(chunk) - len(removed)
+        result.chunks += 1
+        touched.update(removed)
+    result.leagues = len(touched)
+    logging.info(f"Bulk membership removal: {result.changed} removed, {result.skipped} skipped")
+    return result
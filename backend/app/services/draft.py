@@ -0,0 +1,382 @@
+"""Live draft rooms.
+
+Each running draft has one DraftRoom per worker holding its authoritative
+state in memory: the pick order, the pick log and a bitset of contestants that
+are still available (bit i <-> draft.contestants[i]), so validating a pick is
+a dict lookup plus a bit test. Every pick is appended to draft_picks before it
+is applied, and that log is the only durable state: DraftRoom.load() replays
+it, so a restarted worker picks up exactly where the room left off, pick clock
+included (the clock runs from the previous pick's made_at).
+
+A per-room pick clock auto-picks the first available contestant (in the
+draft's contestant order) when the player on the clock runs out of time.
+An auto-pick that fails is retried after a backoff (AUTO_PICK_RETRY_SECONDS,
+doubling up to AUTO_PICK_RETRY_MAX_SECONDS), never straight away against a
+deadline that has already passed. The final pick builds the pickers' fantasy
+teams in the same transaction.
+
+Picks are serialized by the room's lock within a worker. Across workers the
+unique (draft_id, pick_number) and (draft_id, castaway_id) constraints decide:
+the loser of a race reloads the room from the log and gets a conflict. Any
+other failed insert is an error, not a race, and is raised as such. A room
+that would reject a pick first checks whether the log has moved past it and,
+if so, reloads and judges the pick again, so a worker that missed another's
+picks doesn't turn away the player actually on the clock.
+
+Pick clocks assume a single worker, as LocalPubSub does: every worker that has
+a running draft loaded (resume_active() loads them all) arms its own clock.
+With several workers the duplicate auto-picks are conditional on the same
+pick number, so the constraints still let only one through, but each loser
+costs a failed insert and a reload.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.database import async_session_maker
+from app.core.pubsub import draft_channel, pubsub
+from app.models.draft import Draft, DraftOrderType, DraftPick, DraftStatus
+from app.services.teams import build_draft_teams
+
+drafts = Draft.__table__
+draft_picks = DraftPick.__table__
+
+# Unique constraints a concurrent pick for the same slot or contestant violates
+RACE_CONSTRAINTS = {"uq_draft_picks_slot", "uq_draft_picks_castaway"}
+
+# Backoff after a failed auto-pick (seconds; doubles per failure up to the max)
+AUTO_PICK_RETRY_SECONDS = 5
+AUTO_PICK_RETRY_MAX_SECONDS = 300
+
+
+class DraftError(Exception):
+    """A pick or state change the draft does not allow"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def lost_race(error: IntegrityError) -> bool:
+    """Whether a draft_picks insert failed on a slot or contestant another pick already took"""
+    # asyncpg's UniqueViolationError, wrapped by the DBAPI adapter, names the constraint
+    cause = getattr(error.orig, "__cause__", None)
+    return getattr(cause, "constraint_name", None) in RACE_CONSTRAINTS
+
+
+def lowest_bit(bits: int) -> int:
+    """Index of the lowest set bit (bits must be non-zero)"""
+    return (bits & -bits).bit_length() - 1
+
+
+class DraftRoom:
+    """In-memory state of one draft, rebuilt from its pick log"""
+
+    def __init__(self, draft: Draft, picks: List[DraftPick]):
+        self.id = draft.id
+        self.league_id = draft.league_id
+        self.version = draft.version
+        self.season = draft.season
+        self.order_type = draft.order_type
+        self.rounds = draft.rounds
+        self.pick_seconds = draft.pick_seconds
+        self.pick_order: List[int] = list(draft.pick_order)
+        self.contestants: List[str] = list(draft.contestants)
+        self.index: Dict[str, int] = {castaway_id: i for i, castaway_id in enumerate(self.contestants)}
+        self.status = draft.status
+        self.total_picks = min(self.rounds * len(self.pick_order), len(self.contestants))
+        self.available = (1 << len(self.contestants)) - 1
+        self.picks: List[dict] = []
+        self.clock_started: Optional[datetime] = draft.started_at
+        for pick in picks:
+            self._apply(pick.pick_number, pick.user_id, pick.castaway_id, pick.auto, pick.made_at)
+        self.lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    @classmethod
+    async def load(cls, draft_id: int) -> Optional["DraftRoom"]:
+        """Rebuild a room from the drafts row and its pick log"""
+        async with async_session_maker() as session:
+            draft = await session.get(Draft, draft_id)
+            if draft is None:
+                return None
+            picks = (await session.execute(
+                select(DraftPick).where(DraftPick.draft_id == draft_id).order_by(DraftPick.pick_number)
+            )).scalars().all()
+        return cls(draft, picks)
+
+    # State
+
+    @property
+    def pick_number(self) -> int:
+        return len(self.picks)
+
+    def on_the_clock(self, pick_number: Optional[int] = None) -> Optional[int]:
+        """user_id due to make a pick (the next one by default)"""
+        pick_number = self.pick_number if pick_number is None else pick_number
+        if pick_number >= self.total_picks:
+            return None
+        round_number, slot = divmod(pick_number, len(self.pick_order))
+        if self.order_type == DraftOrderType.snake and round_number % 2 == 1:
+            slot = len(self.pick_order) - 1 - slot
+        return self.pick_order[slot]
+
+    @property
+    def deadline(self) -> Optional[datetime]:
+        if self.status != DraftStatus.active or self.clock_started is None:
+            return None
+        return self.clock_started + timedelta(seconds=self.pick_seconds)
+
+    def is_available(self, castaway_id: str) -> bool:
+        bit = self.index.get(castaway_id)
+        return bit is not None and (self.available >> bit) & 1 == 1
+
+    def _apply(self, pick_number: int, user_id: int, castaway_id: str, auto: bool, made_at: datetime) -> dict:
+        pick = {"pick_number": pick_number, "user_id": user_id, "castaway_id": castaway_id, "auto": auto}
+        self.picks.append(pick)
+        self.available &= ~(1 << self.index[castaway_id])
+        self.clock_started = made_at
+        if self.pick_number >= self.total_picks:
+            self.status = DraftStatus.complete
+        return pick
+
+    def state(self) -> dict:
+        available = []
+        bits = self.available
+        while bits:
+            bit = lowest_bit(bits)
+            available.append(self.contestants[bit])
+            bits &= bits - 1
+        active = self.status == DraftStatus.active
+        return {
+            "id": self.id,
+            "league_id": self.league_id,
+            "version": self.version,
+            "season": self.season,
+            "order_type": self.order_type.value,
+            "rounds": self.rounds,
+            "pick_seconds": self.pick_seconds,
+            "pick_order": self.pick_order,
+            "status": self.status.value,
+            "picks": self.picks,
+            "available": available,
+            "on_the_clock": self.on_the_clock() if active else None,
+            "pick_number": self.pick_number if active else None,
+            "deadline": self.deadline,
+        }
+
+    def _message(self, type_: str, **extra) -> dict:
+        active = self.status == DraftStatus.active
+        deadline = self.deadline
+        return {
+            "type": type_,
+            "draft_id": self.id,
+            "status": self.status.value,
+            "on_the_clock": self.on_the_clock() if active else None,
+            "pick_number": self.pick_number if active else None,
+            "deadline": deadline.isoformat() if deadline else None,
+            **extra,
+        }
+
+    # Commands
+
+    async def start(self) -> None:
+        async with self.lock:
+            async with async_session_maker() as session:
+                started = (await session.execute(
+                    update(drafts)
+                    .where(drafts.c.id == self.id, drafts.c.status == DraftStatus.pending)
+                    .values(status=DraftStatus.active, started_at=datetime.now(timezone.utc))
+                    .returning(drafts.c.started_at, drafts.c.pick_order)
+                )).first()
+                await session.commit()
+            if started is None:
+                raise DraftError(409, "Draft has already started")
+            # Deleting users edits pending pick orders, maybe after this room loaded
+            self.pick_order = list(started.pick_order)
+            self.total_picks = min(self.rounds * len(self.pick_order), len(self.contestants))
+            self.status = DraftStatus.active
+            self.clock_started = started.started_at
+            self.arm()
+        await pubsub.publish(draft_channel(self.id), self._message("draft_started"))
+
+    async def pick(self, user_id: int, castaway_id: Optional[str], auto: bool = False, pick_number: Optional[int] = None) -> dict:
+        """Make the next pick; auto picks choose the first available contestant
+
+        pick_number, when given, makes the pick conditional on still being on
+        that slot (the clock uses it so a late timer never takes the next pick).
+        """
+        async with self.lock:
+            try:
+                castaway_id = self._check_pick(user_id, castaway_id, auto, pick_number)
+            except DraftError:
+                if not await self._behind_log():
+                    raise
+                # Another worker moved the draft on: judge the pick against the log
+                await self.reload()
+                castaway_id = self._check_pick(user_id, castaway_id, auto, pick_number)
+            number = self.pick_number
+            try:
+                async with async_session_maker() as session:
+                    made_at = await session.scalar(
+                        draft_picks.insert()
+                        .values(draft_id=self.id, pick_number=number, user_id=user_id, castaway_id=castaway_id, auto=auto)
+                        .returning(draft_picks.c.made_at)
+                    )
+                    if number + 1 >= self.total_picks:
+                        await session.execute(
+                            update(drafts).where(drafts.c.id == self.id).values(status=DraftStatus.complete)
+                        )
+                        # The final pick turns the log into fantasy team rosters
+                        await build_draft_teams(session, self.id, self.league_id)
+                    await session.commit()
+            except IntegrityError as e:
+                if not lost_race(e):
+                    raise
+                # Another worker got there first: its pick is in the log
+                await self.reload()
+                raise DraftError(409, "Pick already made")
+            pick = self._apply(number, user_id, castaway_id, auto, made_at)
+            self.arm()
+        await pubsub.publish(draft_channel(self.id), self._message("draft_pick", pick=pick))
+        if self.status == DraftStatus.complete:
+            draft_rooms.discard(self)
+        return pick
+
+    def _check_pick(self, user_id: int, castaway_id: Optional[str], auto: bool, pick_number: Optional[int]) -> str:
+        """The contestant a pick takes, or the DraftError this room rejects it with"""
+        if self.status != DraftStatus.active:
+            raise DraftError(409, "Draft is not running")
+        if pick_number is not None and pick_number != self.pick_number:
+            raise DraftError(409, "Pick already made")
+        if user_id != self.on_the_clock():
+            raise DraftError(403, "Not your pick")
+        if auto:
+            return self.contestants[lowest_bit(self.available)]
+        if castaway_id not in self.index:
+            raise DraftError(404, "Contestant is not in this draft")
+        if not self.is_available(castaway_id):
+            raise DraftError(409, "Contestant already drafted")
+        return castaway_id
+
+    async def _behind_log(self) -> bool:
+        """Whether the drafts row or the pick log has moved past this room"""
+        async with async_session_maker() as session:
+            logged = (await session.execute(
+                select(
+                    drafts.c.status,
+                    select(func.coalesce(func.max(draft_picks.c.pick_number) + 1, 0))
+                    .where(draft_picks.c.draft_id == self.id)
+                    .scalar_subquery(),
+                ).where(drafts.c.id == self.id)
+            )).first()
+        return logged is None or logged[0] != self.status or logged[1] > self.pick_number
+
+    async def reload(self) -> None:
+        """Catch up with the log (called with the lock held)"""
+        fresh = await DraftRoom.load(self.id)
+        if fresh is None:
+            self.status = DraftStatus.complete
+            self.arm()
+            return
+        self.status = fresh.status
+        self.pick_order = fresh.pick_order
+        self.total_picks = fresh.total_picks
+        self.picks = fresh.picks
+        self.available = fresh.available
+        self.clock_started = fresh.clock_started
+        self.arm()
+
+    # Pick clock
+
+    def arm(self) -> None:
+        """(Re)start the pick clock for the current pick"""
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+        if self.deadline is not None:
+            self._timer = asyncio.create_task(self._clock(self.pick_number, self.deadline))
+
+    def disarm(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    async def _clock(self, pick_number: int, deadline: datetime, failures: int = 0) -> None:
+        delay = (deadline - datetime.now(timezone.utc)).total_seconds()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        try:
+            await self.pick(self.on_the_clock(pick_number), None, auto=True, pick_number=pick_number)
+        except DraftError:
+            pass  # the pick was made just in time
+        except Exception as e:
+            retry = min(AUTO_PICK_RETRY_SECONDS * 2 ** failures, AUTO_PICK_RETRY_MAX_SECONDS)
+            logging.error(f"Auto-pick {pick_number} failed in draft {self.id}: {str(e)}; retrying in {retry}s")
+            # pick() failed without re-arming; unless a pick or reload has since
+            # armed a new clock, back off instead of retrying the passed deadline
+            if self._timer is asyncio.current_task() and self.status == DraftStatus.active and self.pick_number == pick_number:
+                retry_at = datetime.now(timezone.utc) + timedelta(seconds=retry)
+                self._timer = asyncio.create_task(self._clock(pick_number, retry_at, failures + 1))
+
+
+class DraftRooms:
+    """Registry of the rooms loaded in this worker"""
+
+    def __init__(self):
+        self._rooms: Dict[int, DraftRoom] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    async def get(self, draft_id: int) -> Optional[DraftRoom]:
+        """The live room for a draft, loading it from the log on first use"""
+        room = self._rooms.get(draft_id)
+        if room is not None:
+            return room
+        async with self._locks.setdefault(draft_id, asyncio.Lock()):
+            room = self._rooms.get(draft_id)
+            if room is None:
+                room = await DraftRoom.load(draft_id)
+                if room is None:
+                    return None
+                if room.status == DraftStatus.complete:
+                    # Finished drafts are read-only; no need to keep them around
+                    return room
+                room.arm()
+                self._rooms[draft_id] = room
+        return room
+
+    def drop(self, draft_id: int) -> None:
+        """Forget a room whose drafts row changed underneath it; the next get() reloads it"""
+        room = self._rooms.pop(draft_id, None)
+        if room is not None:
+            room.disarm()
+        self._locks.pop(draft_id, None)
+
+    def discard(self, room: DraftRoom) -> None:
+        if self._rooms.get(room.id) is room:
+            del self._rooms[room.id]
+        self._locks.pop(room.id, None)
+
+    async def resume_active(self) -> int:
+        """Load every running draft so their pick clocks keep ticking after a restart"""
+        async with async_session_maker() as session:
+            draft_ids = (await session.execute(
+                select(drafts.c.id).where(drafts.c.status == DraftStatus.active)
+            )).scalars().all()
+        for draft_id in draft_ids:
+            await self.get(draft_id)
+        return len(draft_ids)
+
+    def close(self) -> None:
+        for room in self._rooms.values():
+            room.disarm()
+        self._rooms.clear()
+
+
+# Global registry of live draft rooms
+draft_rooms = DraftRooms()
@@ -0,0 +1,230 @@
+"""Event-sourced episode results and per-league snapshots.
+
+Every scored episode appends its scoring events (one row per castaway event,
+in the vocabulary of services/scoring_rules.py) to episode_events. The log is
+append-only: a correction appends, under the episode's next revision, negated
+copies (sign = -1) of the rows it replaces followed by the new rows, so any
+range of the log can be folded on its own and the history stays auditable.
+
+A league's state is what its teams have earned under the league's ruleset:
+points per (team, castaway), counting only episodes first logged after each
+player joined the team. Every row carries origin_event_id, the position of its
+episode's first logged row, and a team earns it when that is past
+team_players.from_event_id, so a correction moves exactly the teams the
+original counted for. rebuild_league() starts from the league's
+latest snapshot taken with the same ruleset, replays only the events logged
+since, writes the resulting team scores and moves standings by the
+difference. A rebuild that had to replay at least LEAGUE_SNAPSHOT_EVENTS
+events stores a new snapshot; after a rules change no snapshot matches and
+the whole log is replayed once.
+
+Appending takes an exclusive transaction-level advisory lock and readers that
+need a consistent log position take it shared, so a snapshot never claims a
+log position that an uncommitted append could still fill in below.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import BigInteger, Float, Integer, SmallInteger, column, delete, func, literal, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.league import GameType, League, LeagueSettings
+from app.models.player import SurvivorPlayer
+from app.models.scoring import EpisodeEvent, LeagueSnapshot
+from app.models.team import FantasyTeam, TeamPlayer
+from app.schemas.scoring import EpisodeResults
+from app.services.scoring_rules import VOCABULARIES, EventTable, EventTableBuilder, compile_rules
+from app.services.standings import StandingChanges, apply_standing_deltas
+
+events = EpisodeEvent.__table__
+snapshots = LeagueSnapshot.__table__
+
+# pg_advisory_xact_lock key serializing appends against log-position reads
+EVENT_LOG_LOCK = 0x5355_5256  # "SURV"
+
+# Snapshots kept per league; older ones are dropped when a new one is stored
+SNAPSHOTS_KEPT = 3
+
+_ROW = (events.c.castaway_id, events.c.episode, events.c.event, events.c.flags, events.c.count, events.c.sign)
+
+
+async def lock_event_log(session: AsyncSession, shared: bool = False) -> None:
+    """Hold the event log lock until the transaction ends"""
+    lock = func.pg_advisory_xact_lock_shared if shared else func.pg_advisory_xact_lock
+    await session.execute(select(lock(EVENT_LOG_LOCK)))
+
+
+def event_table(rows: Iterable) -> EventTable:
+    """Survivor event table over episode_events rows (castaway_id, episode, event, flags, count, sign)"""
+    builder = EventTableBuilder(VOCABULARIES[GameType.survivor])
+    for castaway_id, episode, event, flags, count, sign in rows:
+        builder.episode = episode
+        builder.add(castaway_id, event, count, sign, **dict.fromkeys(flags, True))
+    return builder.build()
+
+
+async def append_episode_events(
+    session: AsyncSession, scored_episode_id: int, revision: int, results: EpisodeResults, table: EventTable
+) -> Tuple[Optional[int], EventTable]:
+    """Log an episode's events under a revision, retracting the previous revision's rows
+
+    Returns the episode's origin_event_id and the rows appended (retractions
+    included), for applying them incrementally. The caller must hold
+    lock_event_log().
+    """
+    appended = []
+    origin = None
+    if revision > 1:
+        origin = await session.scalar(
+            select(func.min(events.c.origin_event_id)).where(events.c.scored_episode_id == scored_episode_id)
+        )
+        previous = (events.c.scored_episode_id == scored_episode_id) & (events.c.revision == revision - 1) & (events.c.sign == 1)
+        retracted = await session.execute(
+            insert(events)
+            .from_select(
+                [
+                    "scored_episode_id", "revision", "version", "season", "episode", "castaway_id", "event", "flags",
+                    "count", "sign", "origin_event_id",
+                ],
+                select(
+                    events.c.scored_episode_id, literal(revision, Integer), events.c.version, events.c.season,
+                    events.c.episode, events.c.castaway_id, events.c.event, events.c.flags, events.c.count,
+                    literal(-1, SmallInteger), events.c.origin_event_id,
+                ).where(previous).order_by(events.c.id),
+            )
+            .returning(*_ROW)
+        )
+        appended.extend(retracted.all())
+    described = VOCABULARIES[GameType.survivor].described
+    rows = []
+    for code, signature, count in zip(table.castaway.tolist(), table.signature.tolist(), table.count.tolist()):
+        event, flags = described[signature]
+        rows.append({
+            "scored_episode_id": scored_episode_id, "revision": revision, "version": results.version,
+            "season": results.season, "episode": results.episode, "castaway_id": table.castaway_ids[code],
+            "event": event, "flags": list(flags), "count": count, "sign": 1,
+        })
+    if rows:
+        if origin is None:
+            # The episode's first rows: draw their positions up front so they can carry the first one
+            sequence = func.pg_get_serial_sequence(events.name, events.c.id.name)
+            ids = (await session.scalars(
+                select(func.nextval(sequence)).select_from(func.generate_series(1, len(rows)))
+            )).all()
+            for row, event_id in zip(rows, sorted(ids)):
+                row["id"] = event_id
+            origin = min(ids)
+        for row in rows:
+            row["origin_event_id"] = origin
+        await session.execute(insert(events), rows)
+        appended.extend((r["castaway_id"], r["episode"], r["event"], r["flags"], r["count"], 1) for r in rows)
+    return origin, event_table(appended)
+
+
+@dataclass
+class LeagueRebuild:
+    league_id: int
+    events_replayed: int = 0
+    teams_updated: int = 0
+    snapshot_event_id: Optional[int] = None  # log position of the snapshot stored, if one was
+    changes: StandingChanges = field(default_factory=dict)  # publish after commit
+
+
+async def rebuild_league(session: AsyncSession, league_id: int) -> LeagueRebuild:
+    """Recompute a league's team scores from its last snapshot plus the events since
+
+    Runs in the caller's transaction; publish result.changes after committing.
+    """
+    result = LeagueRebuild(league_id=league_id)
+    league = (await session.execute(
+        select(League.game_type, LeagueSettings.scoring_rules)
+        .outerjoin(LeagueSettings, LeagueSettings.id == League.settings_id)
+        .where(League.id == league_id)
+    )).first()
+    if league is None or league.game_type != GameType.survivor:
+        # Only survivor results are logged so far
+        return result
+    await lock_event_log(session, shared=True)
+    rules = compile_rules(GameType.survivor, league.scoring_rules)
+    snapshot = (await session.execute(
+        select(snapshots.c.last_event_id, snapshots.c.state)
+        .where(snapshots.c.league_id == league_id, snapshots.c.rules_hash == rules.digest)
+        .order_by(snapshots.c.last_event_id.desc())
+        .limit(1)
+    )).first()
+    after = snapshot.last_event_id if snapshot else 0
+    state: Dict[str, Dict[str, float]] = snapshot.state if snapshot else {}
+    upto = await session.scalar(select(func.coalesce(func.max(events.c.id), 0)))
+
+    teams = FantasyTeam.__table__
+    team_rows = (await session.execute(
+        select(teams.c.id, teams.c.user_id, teams.c.score)
+        .where(teams.c.league_id == league_id)
+        .order_by(teams.c.id)
+        .with_for_update()
+    )).all()
+    if not team_rows:
+        return result
+    team_players = TeamPlayer.__table__
+    players = SurvivorPlayer.__table__
+    roster = (await session.execute(
+        select(team_players.c.team_id, players.c.castaway_id, team_players.c.from_event_id)
+        .join(players, players.c.id == team_players.c.player_id)
+        .where(team_players.c.team_id.in_([row.id for row in team_rows]))
+    )).all()
+
+    logged = (await session.execute(
+        select(events.c.origin_event_id, *_ROW)
+        .where(
+            events.c.castaway_id.in_(sorted({row.castaway_id for row in roster})),
+            events.c.id > after,
+            events.c.id <= upto,
+        )
+        .order_by(events.c.id)
+    )).all()
+    table = event_table(row[1:] for row in logged)
+    origins = np.array([row.origin_event_id for row in logged], dtype=np.int64)
+    points = rules.row_points(table) if len(table) else np.zeros(0)
+    result.events_replayed = len(logged)
+    # Each castaway's rows since the snapshot, in log order
+    rows_of = {castaway_id: np.flatnonzero(table.castaway == code) for code, castaway_id in enumerate(table.castaway_ids)}
+
+    replayed: Dict[str, Dict[str, float]] = {}
+    for team_id, castaway_id, from_event_id in roster:
+        earned = state.get(str(team_id), {}).get(castaway_id, 0.0)
+        rows = rows_of.get(castaway_id)
+        if rows is not None:
+            earned += float(points[rows][origins[rows] > from_event_id].sum())
+        replayed.setdefault(str(team_id), {})[castaway_id] = earned
+
+    scores = {row.id: sum(replayed.get(str(row.id), {}).values()) for row in team_rows}
+    moved = [(row.id, row.user_id, scores[row.id] - row.score) for row in team_rows if abs(scores[row.id] - row.score) > 1e-9]
+    if moved:
+        rows = values(column("id", BigInteger), column("score", Float), name="scores").data(
+            [(team_id, scores[team_id]) for team_id, _, _ in moved]
+        )
+        await session.execute(
+            update(teams).where(teams.c.id == rows.c.id).values(score=rows.c.score, updated_at=func.now())
+        )
+        result.changes = await apply_standing_deltas(session, {(league_id, user_id): delta for _, user_id, delta in moved})
+    result.teams_updated = len(moved)
+
+    if result.events_replayed >= settings.LEAGUE_SNAPSHOT_EVENTS:
+        await session.execute(insert(snapshots).values(
+            league_id=league_id, last_event_id=upto, rules_hash=rules.digest, state=replayed,
+        ))
+        stale = (
+            select(snapshots.c.id).where(snapshots.c.league_id == league_id)
+            .order_by(snapshots.c.last_event_id.desc()).offset(SNAPSHOTS_KEPT)
+        )
+        await session.execute(delete(snapshots).where(snapshots.c.id.in_(stale)))
+        result.snapshot_event_id = upto
+    logging.info(
+        f"Rebuilt league {league_id}: replayed {result.events_replayed} events after {after}, "
+        f"{result.teams_updated} team scores changed"
+    )
+    return result
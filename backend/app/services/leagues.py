@@ -0,0 +1,77 @@
+"""League read paths and membership lookups.
+
+Every endpoint returning LeagueOut selects leagues through select_leagues(),
+which joins each league's settings and computes its member count in the same
+statement, so a response costs one query however many leagues it holds and
+nothing is lazy-loaded during serialization (which AsyncSession would refuse
+anyway). benchmarks/query_budget.py checks the statement count per route.
+
+Memberships are unique per (league_id, user_id) (uq_league_memberships_league_user),
+so get_membership() is a single index probe and add_member() can insert
+without looking first: the constraint turns a duplicate join, racing or not,
+into a no-op. benchmarks/bench_memberships.py times both at 100k+ rows.
+"""
+from typing import Iterable, Optional
+
+from sqlalchemy import Select, func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, with_expression
+
+from app.models.league import League, LeagueMembership, MemberRole
+
+
+def member_count():
+    """Correlated member count of the League row being selected"""
+    return (
+        select(func.count(LeagueMembership.id))
+        .where(LeagueMembership.league_id == League.id)
+        .correlate(League)
+        .scalar_subquery()
+    )
+
+
+def select_leagues() -> Select:
+    """SELECT of League rows with settings and member_count loaded"""
+    return select(League).options(joinedload(League.settings), with_expression(League.member_count, member_count()))
+
+
+async def get_league(session: AsyncSession, league_id: int) -> Optional[League]:
+    return (await session.execute(select_leagues().where(League.id == league_id))).scalars().first()
+
+
+async def touch_league(session: AsyncSession, league_id: int) -> None:
+    """Mark a league changed, e.g. when its membership (and so member_count) changes
+
+    ETags and Last-Modified of league responses derive from leagues.updated_at.
+    """
+    await touch_leagues(session, [league_id])
+
+
+async def touch_leagues(session: AsyncSession, league_ids: Iterable[int]) -> None:
+    league_ids = sorted(set(league_ids))
+    if league_ids:
+        await session.execute(update(League).where(League.id.in_(league_ids)).values(updated_at=func.now()))
+
+
+async def get_membership(session: AsyncSession, league_id: int, user_id: int) -> Optional[LeagueMembership]:
+    return await session.scalar(
+        select(LeagueMembership).where(LeagueMembership.league_id == league_id, LeagueMembership.user_id == user_id)
+    )
+
+
+async def add_member(
+    session: AsyncSession, league_id: int, user_id: int, role: MemberRole = MemberRole.member
+) -> Optional[LeagueMembership]:
+    """Insert a membership in one statement; None if the league doesn't exist or the user already belongs to it"""
+    memberships = LeagueMembership.__table__
+    stmt = (
+        insert(LeagueMembership)
+        .from_select(
+            ["league_id", "user_id", "role"],
+            select(League.id, literal(user_id), literal(role, memberships.c.role.type)).where(League.id == league_id),
+        )
+        .on_conflict_do_nothing(index_elements=[memberships.c.league_id, memberships.c.user_id])
+        .returning(LeagueMembership)
+    )
+    return await session.scalar(stmt)
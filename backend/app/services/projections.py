@@ -0,0 +1,346 @@
+"""Monte Carlo projections for the rest of a season.
+
+Starting from the state after a given episode, simulate() plays the remaining
+episodes many times over, vectorized across simulations: each episode one
+castaway wins individual immunity and one of the others is voted out, until
+FINALISTS remain and one of them wins. Both draws are weighted by rates
+from the survivoR data, each castaway's own rate shrunk towards the
+historical rate over every season (PRIOR_WEIGHT pseudo-observations):
+
+- immunity: individual immunity wins per immunity challenge;
+- vote-out: votes received per tribal council attended;
+- confessionals per episode, which only feed projected points.
+
+Categorical draws are inverse-CDF lookups on row-wise cumulative weights, so
+one episode across all simulations is a handful of (simulations x castaways)
+array operations.
+Fantasy points follow the default survivor ruleset (scoring_rules.POINTS).
+
+Simulations are split into chunks that run in the shared process pool
+(app/core/process_pool.py). Results are cached (app/core/result_cache.py)
+per dataset version, (version, season, episode) and simulation count, and
+the seed is derived from that key so a cached and a recomputed projection
+agree.
+"""
+import asyncio
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.process_pool import pool_size, run_in_process
+from app.core.result_cache import ResultCache
+from app.models.draft import Draft, DraftPick
+from app.schemas.scoring import EpisodeResults
+from app.services.scoring import score_episode
+from app.services.scoring_rules import POINTS
+from app.services.survivor_index import DatasetIndex, episode_order
+from app.services.survivor_stats import challenge_kinds, is_challenge_win
+
+# Castaways left at the final tribal council
+FINALISTS = 3
+
+# Weight of the historical rate, in pseudo-observations, in each castaway's rate
+PRIOR_WEIGHT = 5.0
+
+
+class SeasonEvents:
+    """One season's rows from each dataset, in episode order"""
+
+    __slots__ = ("roster", "challenges", "votes", "confessionals")
+
+    def __init__(self):
+        self.roster: List[dict] = []
+        self.challenges: List[dict] = []
+        self.votes: List[dict] = []
+        self.confessionals: List[dict] = []
+
+
+@dataclass
+class SeasonState:
+    """Where a season stands after an episode, ready to simulate"""
+    episode: int
+    castaways: List[dict]  # {"castaway_id", "name", "status", "points_to_date"} for the whole roster
+    alive: List[str]
+    strength: np.ndarray  # immunity win rate of each alive castaway
+    threat: np.ndarray  # votes received per tribal council
+    confessional_rate: np.ndarray  # confessionals per episode
+
+
+def _season_key(record: dict) -> Tuple[str, Optional[int]]:
+    return record.get("version") or "US", record.get("season")
+
+
+def _shrink(hits: np.ndarray, trials: np.ndarray, prior: float) -> np.ndarray:
+    # Strictly positive, so every castaway can still be drawn
+    return np.maximum((hits + PRIOR_WEIGHT * prior) / (trials + PRIOR_WEIGHT), 1e-6)
+
+
+class ProjectionIndex:
+    """survivoR rows partitioned by season, plus the historical base rates"""
+
+    def __init__(self, versions: tuple, seasons: Dict[Tuple[str, int], SeasonEvents], priors: Dict[str, float]):
+        self.versions = versions
+        self._seasons = seasons
+        self.priors = priors
+
+    @classmethod
+    def build(cls, versions: tuple, datasets: Dict[str, Iterable[dict]]) -> "ProjectionIndex":
+        seasons: Dict[Tuple[str, int], SeasonEvents] = defaultdict(SeasonEvents)
+        immunity_wins = immunity_trials = votes = tribals = confessionals = confessional_rows = 0
+        for record in datasets["castaways"]:
+            seasons[_season_key(record)].roster.append(record)
+        for record in datasets["challenges"]:
+            seasons[_season_key(record)].challenges.append(record)
+            if record.get("castaway_id") is not None and challenge_kinds(record)[0]:
+                immunity_trials += 1
+                immunity_wins += is_challenge_win(record)
+        for record in datasets["votes"]:
+            seasons[_season_key(record)].votes.append(record)
+            tribals += record.get("castaway_id") is not None
+            votes += record.get("vote_id") is not None
+        for record in datasets["confessionals"]:
+            seasons[_season_key(record)].confessionals.append(record)
+            confessionals += record.get("confessional_count") or 0
+            confessional_rows += 1
+        for events in seasons.values():
+            for rows in (events.challenges, events.votes, events.confessionals):
+                rows.sort(key=episode_order)
+        priors = {
+            "immunity_win_rate": immunity_wins / max(immunity_trials, 1),
+            "vote_rate": votes / max(tribals, 1),
+            "confessional_rate": confessionals / max(confessional_rows, 1),
+        }
+        return cls(versions, dict(seasons), priors)
+
+    def seasons(self) -> List[Tuple[str, int]]:
+        return sorted(key for key in self._seasons if key[1] is not None)
+
+    def events(self, version: str, season: int) -> Optional[SeasonEvents]:
+        return self._seasons.get((version, season))
+
+    def latest_episode(self, version: str, season: int) -> Optional[int]:
+        """Last episode with any results, 0 before the first one, None for unknown seasons"""
+        events = self._seasons.get((version, season))
+        if events is None:
+            return None
+        episodes = [rows[-1].get("episode") or 0 for rows in (events.challenges, events.votes, events.confessionals) if rows]
+        return max(episodes, default=0)
+
+    def state(self, version: str, season: int, episode: int) -> Optional[SeasonState]:
+        """The season as of the end of an episode, or None for unknown seasons"""
+        events = self._seasons.get((version, season))
+        if events is None or not events.roster:
+            return None
+
+        def played(rows: List[dict]) -> List[dict]:
+            return [r for r in rows if (r.get("episode") or 0) <= episode]
+
+        challenges, votes, confessionals = played(events.challenges), played(events.votes), played(events.confessionals)
+        by_episode: Dict[int, EpisodeResults] = {}
+        for key, rows in (("challenges", challenges), ("votes", votes), ("confessionals", confessionals)):
+            for row in rows:
+                number = row.get("episode") or 0
+                if number not in by_episode:
+                    by_episode[number] = EpisodeResults(version=version, season=season, episode=number)
+                getattr(by_episode[number], key).append(row)
+        points: Dict[str, float] = defaultdict(float)
+        for results in by_episode.values():
+            for castaway_id, value in score_episode(results).items():
+                points[castaway_id] += value
+
+        eliminated = {v["voted_out_id"] for v in votes if v.get("voted_out_id") is not None}
+        roster = list(dict.fromkeys(r["castaway_id"] for r in events.roster if r.get("castaway_id")))
+        names = {r["castaway_id"]: r.get("castaway") or r.get("full_name") for r in events.roster if r.get("castaway_id")}
+        alive = [castaway_id for castaway_id in roster if castaway_id not in eliminated]
+        position = {castaway_id: i for i, castaway_id in enumerate(alive)}
+
+        counts = np.zeros((5, len(alive)))  # immunity wins/trials, votes/tribals, confessionals
+        for row in challenges:
+            i = position.get(row.get("castaway_id"))
+            if i is not None and challenge_kinds(row)[0]:
+                counts[1, i] += 1
+                counts[0, i] += is_challenge_win(row)
+        for row in votes:
+            i = position.get(row.get("castaway_id"))
+            if i is not None:
+                counts[3, i] += 1
+            j = position.get(row.get("vote_id"))
+            if j is not None:
+                counts[2, j] += 1
+        for row in confessionals:
+            i = position.get(row.get("castaway_id"))
+            if i is not None:
+                counts[4, i] += row.get("confessional_count") or 0
+        return SeasonState(
+            episode=episode,
+            castaways=[
+                {
+                    "castaway_id": castaway_id,
+                    "name": names.get(castaway_id),
+                    "status": "active" if castaway_id in position else "eliminated",
+                    "points_to_date": points.get(castaway_id, 0.0),
+                }
+                for castaway_id in roster
+            ],
+            alive=alive,
+            strength=_shrink(counts[0], counts[1], self.priors["immunity_win_rate"]),
+            threat=_shrink(counts[2], counts[3], self.priors["vote_rate"]),
+            confessional_rate=_shrink(counts[4], np.full(len(alive), float(len(by_episode))), self.priors["confessional_rate"]),
+        )
+
+
+def _sample(rng: np.random.Generator, weights: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """One weighted draw per row among the columns where mask is set"""
+    cumulative = np.cumsum(mask * weights, axis=1)
+    targets = rng.random(len(mask)) * cumulative[:, -1]
+    # Masked-out columns add no width, so they are never landed on
+    return (cumulative <= targets[:, None]).sum(axis=1)
+
+
+def simulate(
+    strength: np.ndarray,
+    threat: np.ndarray,
+    confessional_rate: np.ndarray,
+    simulations: int,
+    seed: np.random.SeedSequence,
+) -> Dict[str, np.ndarray]:
+    """Play out the rest of a season; returns per-castaway counts/sums over all simulations
+
+    Runs in a worker process: arguments and result are plain arrays.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(strength)
+    rows = np.arange(simulations)
+    alive = np.ones((simulations, n), dtype=bool)
+    points = np.zeros((simulations, n))
+    confessional_points = confessional_rate * POINTS["confessional"]
+    eliminated_next = np.zeros(n, dtype=np.int64)
+    for step in range(max(n - FINALISTS, 0)):
+        immune = _sample(rng, strength, alive)
+        vulnerable = alive.copy()
+        vulnerable[rows, immune] = False
+        out = _sample(rng, threat, vulnerable)
+        points += alive * confessional_points
+        points[rows, immune] += POINTS["immunity_win"]
+        # Whoever goes home gets a majority of the votes cast
+        points[rows, out] += POINTS["eliminated"] + POINTS["vote_received"] * ((n - step) // 2 + 1)
+        alive[rows, out] = False
+        points += alive * POINTS["survived"]
+        if step == 0:
+            eliminated_next = np.bincount(out, minlength=n)
+    if n == 0:
+        winners = np.zeros(n, dtype=np.int64)
+    else:
+        # The jury's pick, weighted like immunity: a crude stand-in for "strong game"
+        winners = np.bincount(_sample(rng, strength, alive), minlength=n)
+    return {
+        "wins": winners,
+        "eliminated_next": eliminated_next,
+        "finalist": alive.sum(axis=0),
+        "points": points.sum(axis=0),
+    }
+
+
+def _seed(key: tuple) -> np.random.SeedSequence:
+    return np.random.SeedSequence(int.from_bytes(hashlib.sha1(repr(key).encode("utf-8")).digest()[:8], "little"))
+
+
+async def _run(state: SeasonState, simulations: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    chunks = max(min(pool_size(), simulations // 1000), 1)
+    sizes = [simulations // chunks + (i < simulations % chunks) for i in range(chunks)]
+    parts = await asyncio.gather(*(
+        run_in_process(simulate, state.strength, state.threat, state.confessional_rate, size, child)
+        for size, child in zip(sizes, seed.spawn(chunks))
+    ))
+    return {key: sum(part[key] for part in parts) for key in parts[0]}
+
+
+class Projections:
+    """Cached projections; concurrent requests for one key share a run"""
+
+    def __init__(self, index: DatasetIndex, maxsize: int):
+        self.index = index
+        self.cache: ResultCache[dict] = ResultCache(maxsize)
+
+    async def get(self, version: str, season: int, episode: Optional[int] = None, simulations: Optional[int] = None) -> Optional[dict]:
+        """Projection as of an episode (latest by default), or None for unknown seasons"""
+        index = await self.index.get()
+        if episode is None:
+            episode = index.latest_episode(version, season)
+            if episode is None:
+                return None
+        simulations = simulations or settings.PROJECTION_SIMULATIONS
+        key = (index.versions, version, season, episode, simulations)
+        return await self.cache.get_or_compute(key, lambda: self._project(index, key))
+
+    async def _project(self, index: ProjectionIndex, key: tuple) -> Optional[dict]:
+        _, version, season, episode, simulations = key
+        state = await asyncio.to_thread(index.state, version, season, episode)
+        if state is None:
+            return None
+        totals = await _run(state, simulations, _seed(key))
+        position = {castaway_id: i for i, castaway_id in enumerate(state.alive)}
+        castaways = []
+        for castaway in state.castaways:
+            i = position.get(castaway["castaway_id"])
+            simulated = {
+                "win_probability": float(totals["wins"][i]) / simulations if i is not None else 0.0,
+                "eliminated_next_probability": float(totals["eliminated_next"][i]) / simulations if i is not None else 0.0,
+                "finalist_probability": float(totals["finalist"][i]) / simulations if i is not None else 0.0,
+                "projected_points": castaway["points_to_date"] + (float(totals["points"][i]) / simulations if i is not None else 0.0),
+            }
+            castaways.append({**castaway, **simulated})
+        castaways.sort(key=lambda c: (-c["win_probability"], -c["projected_points"]))
+        return {
+            "version": version,
+            "season": season,
+            "episode": episode,
+            "simulations": simulations,
+            "remaining_episodes": max(len(state.alive) - FINALISTS, 0),
+            "castaways": castaways,
+        }
+
+
+async def team_projections(session: AsyncSession, league_id: int, projection: dict) -> List[dict]:
+    """Projected totals of each drafted roster in a league's draft for the projected season"""
+    draft_id = await session.scalar(
+        select(Draft.id)
+        .where(Draft.league_id == league_id, Draft.version == projection["version"], Draft.season == projection["season"])
+        .order_by(Draft.id.desc())
+        .limit(1)
+    )
+    if draft_id is None:
+        return []
+    picks = (await session.execute(
+        select(DraftPick.user_id, DraftPick.castaway_id).where(DraftPick.draft_id == draft_id).order_by(DraftPick.pick_number)
+    )).all()
+    by_castaway = {c["castaway_id"]: c for c in projection["castaways"]}
+    teams: Dict[int, dict] = {}
+    for user_id, castaway_id in picks:
+        team = teams.setdefault(user_id, {"user_id": user_id, "castaway_ids": [], "points_to_date": 0.0, "projected_points": 0.0})
+        team["castaway_ids"].append(castaway_id)
+        castaway = by_castaway.get(castaway_id)
+        if castaway is not None:
+            team["points_to_date"] += castaway["points_to_date"]
+            team["projected_points"] += castaway["projected_points"]
+    return sorted(teams.values(), key=lambda t: -t["projected_points"])
+
+
+projection_index: DatasetIndex[ProjectionIndex] = DatasetIndex(
+    {
+        "castaways": "castaways",
+        "challenges": "challenge_results",
+        "votes": "vote_history",
+        "confessionals": "confessionals",
+    },
+    ProjectionIndex.build,
+)
+
+# Global projection cache
+projections = Projections(projection_index, maxsize=settings.PROJECTION_CACHE_SIZE)
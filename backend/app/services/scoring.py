@@ -0,0 +1,148 @@
+"""Incremental episode scoring.
+
+apply_episode() turns one episode's results into fantasy points per castaway
+and adds only the change to survivor_players.total_score, to the score of
+every fantasy team holding those castaways and to their members' league
+standings, all in one transaction; whole seasons are never recomputed.
+
+Each scored episode is recorded in the scored_episodes ledger together with
+the points it awarded (episode_player_scores), which makes scoring idempotent:
+replaying identical results is a no-op, and replaying corrected results
+applies the new points minus the ones applied before.
+
+Its events also go to the append-only event log (services/event_log.py);
+fantasy teams are moved by scoring the appended rows, retractions included,
+with each league's own ruleset.
+"""
+import asyncio
+import hashlib
+import json
+from typing import Dict, Optional
+
+from sqlalchemy import Float, String, column, delete, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.survivor_data import SurvivorDataStore, survivor_store
+from app.models.league import GameType
+from app.models.player import SurvivorPlayer
+from app.models.scoring import EpisodePlayerScore, ScoredEpisode
+from app.schemas.scoring import EpisodeResults, EpisodeScoreResult
+from app.services.event_log import append_episode_events, lock_event_log
+from app.services.scoring_rules import CompiledRules, compile_rules, survivor_event_table
+from app.services.standings import apply_standing_deltas, publish_standing_changes
+from app.services.teams import apply_event_deltas
+
+
+def score_episode(results: EpisodeResults, rules: Optional[CompiledRules] = None) -> Dict[str, float]:
+    """Points per castaway_id for one episode (castaways scoring 0 are left out)
+
+    Scored with the default survivor ruleset unless compiled rules are given.
+    """
+    rules = rules or compile_rules(GameType.survivor)
+    return rules.score(survivor_event_table([results]))
+
+
+def results_hash(results: EpisodeResults) -> str:
+    canonical = json.dumps(results.model_dump(), sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+async def apply_player_deltas(session: AsyncSession, deltas: Dict[str, float]) -> int:
+    """Add score deltas to survivor_players in one UPDATE ... FROM (VALUES ...); returns rows updated"""
+    if not deltas:
+        return 0
+    players = SurvivorPlayer.__table__
+    rows = values(column("castaway_id", String), column("delta", Float), name="deltas").data(list(deltas.items()))
+    result = await session.execute(
+        update(players)
+        .where(players.c.castaway_id == rows.c.castaway_id)
+        .values(total_score=func.coalesce(players.c.total_score, 0) + rows.c.delta)
+    )
+    return result.rowcount
+
+
+async def apply_episode(session: AsyncSession, results: EpisodeResults) -> EpisodeScoreResult:
+    """Score one episode and apply only the point changes, recording it in the ledger"""
+    table = survivor_event_table([results])
+    points = compile_rules(GameType.survivor).score(table)
+    digest = results_hash(results)
+    ledger = ScoredEpisode.__table__
+    key = (ledger.c.version == results.version) & (ledger.c.season == results.season) & (ledger.c.episode == results.episode)
+
+    # Claim the episode; a concurrent replay blocks on the unique constraint until we commit
+    inserted = await session.execute(
+        insert(ledger)
+        .values(version=results.version, season=results.season, episode=results.episode, results_hash=digest)
+        .on_conflict_do_nothing(constraint="uq_scored_episodes_episode")
+        .returning(ledger.c.id)
+    )
+    episode_id: Optional[int] = inserted.scalar()
+    revision = 1
+    previous: Dict[str, float] = {}
+    if episode_id is None:
+        existing = (await session.execute(select(ledger.c.id, ledger.c.results_hash).where(key).with_for_update())).one()
+        episode_id = existing.id
+        if existing.results_hash == digest:
+            await session.rollback()
+            return EpisodeScoreResult(
+                version=results.version, season=results.season, episode=results.episode,
+                applied=False, players_scored=len(points), players_updated=0,
+            )
+        # Corrected results: take back what this episode awarded before
+        scores = EpisodePlayerScore.__table__
+        previous = dict((await session.execute(
+            select(scores.c.castaway_id, scores.c.points).where(scores.c.scored_episode_id == episode_id)
+        )).all())
+        await session.execute(delete(scores).where(scores.c.scored_episode_id == episode_id))
+        revision = await session.scalar(
+            update(ledger)
+            .where(ledger.c.id == episode_id)
+            .values(results_hash=digest, scored_at=func.now(), revision=ledger.c.revision + 1)
+            .returning(ledger.c.revision)
+        )
+
+    if points:
+        await session.execute(
+            insert(EpisodePlayerScore.__table__),
+            [{"scored_episode_id": episode_id, "castaway_id": c, "points": p} for c, p in points.items()],
+        )
+    deltas = {
+        castaway_id: points.get(castaway_id, 0.0) - previous.get(castaway_id, 0.0)
+        for castaway_id in points.keys() | previous.keys()
+    }
+    deltas = {c: d for c, d in deltas.items() if d}
+    updated = await apply_player_deltas(session, deltas)
+    await lock_event_log(session)
+    origin_event_id, appended = await append_episode_events(session, episode_id, revision, results, table)
+    team_deltas = await apply_event_deltas(session, origin_event_id, appended)
+    changes = await apply_standing_deltas(session, team_deltas)
+    await session.commit()
+    await publish_standing_changes(changes)
+    return EpisodeScoreResult(
+        version=results.version, season=results.season, episode=results.episode,
+        applied=True, players_scored=len(points), players_updated=updated, teams_updated=len(team_deltas),
+    )
+
+
+async def episode_results_from_store(
+    version: str, season: int, episode: int, store: SurvivorDataStore = survivor_store
+) -> EpisodeResults:
+    """Collect one episode's rows from the survivoR datasets"""
+    entries = await asyncio.gather(
+        store.entry("challenge_results"), store.entry("vote_history"), store.entry("confessionals")
+    )
+
+    def collect():
+        def rows(entry):
+            return [
+                r for r in store.records(entry)
+                if (r.get("version") or "US") == version and r.get("season") == season and r.get("episode") == episode
+            ]
+        return [rows(entry) for entry in entries]
+
+    challenges, votes, confessionals = await asyncio.to_thread(collect)
+    return EpisodeResults(
+        version=version, season=season, episode=episode,
+        challenges=challenges, votes=votes, confessionals=confessionals,
+    )
@@ -0,0 +1,303 @@
+"""Declarative scoring rules, compiled into vectorized evaluators.
+
+A ruleset is plain JSON, e.g. for survivor:
+
+    {"rules": [
+        {"event": "challenge", "when": {"immunity": true, "won": true}, "points": 5},
+        {"event": "confessional", "points": 0.5, "per_count": true},
+        {"event": "eliminated", "points": -5}
+    ]}
+
+Each game type has a vocabulary (EVENTS): the events its results produce and
+the boolean flags a rule can match on. An event row's signature is its event
+plus its flags as bits, so a vocabulary has a small, fixed number of
+signatures. compile_rules() folds a ruleset into two dense tables over those
+signatures (fixed points, and points per count), so scoring a whole event
+table is one gather plus one bincount by castaway, however many rules there
+are. Compiled rulesets are cached by rule hash.
+
+Leagues store their ruleset on LeagueSettings.scoring_rules; leagues without
+one use DEFAULT_RULES for their game type.
+"""
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.models.league import GameType
+from app.schemas.scoring import EpisodeResults
+from app.services.survivor_stats import challenge_kinds, is_challenge_win
+
+# Events each game type's results produce, with the flags rules can match on
+EVENTS: Dict[GameType, Dict[str, Tuple[str, ...]]] = {
+    GameType.survivor: {
+        "challenge": ("immunity", "reward", "won"),
+        "vote_received": (),
+        "confessional": (),
+        "eliminated": (),
+        "survived": (),  # played the episode and is still in the game
+    },
+    GameType.big_brother: {
+        "competition": ("hoh", "veto", "won"),
+        "nominated": (),
+        "evicted": (),
+        "survived": (),
+    },
+    GameType.love_island: {
+        "challenge": ("won",),
+        "coupled": (),
+        "dumped": (),
+        "survived": (),
+    },
+    GameType.traitors: {
+        "mission": ("won",),
+        "shield": (),
+        "banished": ("traitor",),
+        "murdered": (),
+        "survived": (),
+    },
+}
+
+# Fantasy points per survivor scoring event (the default survivor ruleset)
+POINTS = {
+    "immunity_win": 5.0,
+    "reward_win": 3.0,
+    "confessional": 0.5,  # per confessional
+    "vote_received": -1.0,  # per vote cast against the castaway
+    "eliminated": -5.0,
+    "survived": 2.0,  # played the episode and is still in the game
+}
+
+DEFAULT_RULES: Dict[GameType, dict] = {
+    GameType.survivor: {"rules": [
+        {"event": "challenge", "when": {"immunity": True, "won": True}, "points": POINTS["immunity_win"]},
+        {"event": "challenge", "when": {"reward": True, "won": True}, "points": POINTS["reward_win"]},
+        {"event": "confessional", "points": POINTS["confessional"], "per_count": True},
+        {"event": "vote_received", "points": POINTS["vote_received"], "per_count": True},
+        {"event": "eliminated", "points": POINTS["eliminated"]},
+        {"event": "survived", "points": POINTS["survived"]},
+    ]},
+    GameType.big_brother: {"rules": [
+        {"event": "competition", "when": {"hoh": True, "won": True}, "points": 10.0},
+        {"event": "competition", "when": {"veto": True, "won": True}, "points": 7.0},
+        {"event": "nominated", "points": -3.0},
+        {"event": "evicted", "points": -5.0},
+        {"event": "survived", "points": 2.0},
+    ]},
+    GameType.love_island: {"rules": [
+        {"event": "challenge", "when": {"won": True}, "points": 3.0},
+        {"event": "coupled", "points": 2.0},
+        {"event": "dumped", "points": -5.0},
+        {"event": "survived", "points": 2.0},
+    ]},
+    GameType.traitors: {"rules": [
+        {"event": "mission", "when": {"won": True}, "points": 2.0},
+        {"event": "shield", "points": 5.0},
+        {"event": "banished", "when": {"traitor": True}, "points": -10.0},
+        {"event": "banished", "when": {"traitor": False}, "points": -5.0},
+        {"event": "murdered", "points": -5.0},
+        {"event": "survived", "points": 2.0},
+    ]},
+}
+
+# Compiled rulesets kept in memory
+MAX_COMPILED_RULESETS = 256
+
+
+class InvalidRules(ValueError):
+    """A ruleset that does not fit its game type's vocabulary"""
+
+
+class Vocabulary:
+    """Numbers every (event, flags) combination of a game type"""
+
+    def __init__(self, events: Dict[str, Tuple[str, ...]]):
+        self.events = events
+        self.offsets: Dict[str, int] = {}
+        self.described: List[Tuple[str, Tuple[str, ...]]] = []  # signature -> (event, flags set)
+        size = 0
+        for event, flags in events.items():
+            self.offsets[event] = size
+            size += 1 << len(flags)
+            for bits in range(1 << len(flags)):
+                self.described.append((event, tuple(flag for i, flag in enumerate(flags) if bits & (1 << i))))
+        self.size = size
+
+    def signature(self, event: str, flags: Dict[str, bool]) -> int:
+        bits = 0
+        for i, flag in enumerate(self.events[event]):
+            if flags.get(flag):
+                bits |= 1 << i
+        return self.offsets[event] + bits
+
+    def matching(self, event: str, when: Dict[str, bool]) -> List[int]:
+        """Signatures of an event whose flags satisfy every condition in when"""
+        if event not in self.events:
+            raise InvalidRules(f"Unknown event '{event}'")
+        flags = self.events[event]
+        unknown = set(when) - set(flags)
+        if unknown:
+            raise InvalidRules(f"Unknown flag(s) for '{event}': {', '.join(sorted(unknown))}")
+        wanted = [(1 << flags.index(flag), bool(value)) for flag, value in when.items()]
+        return [
+            self.offsets[event] + bits
+            for bits in range(1 << len(flags))
+            if all(bool(bits & mask) == value for mask, value in wanted)
+        ]
+
+
+VOCABULARIES = {game_type: Vocabulary(events) for game_type, events in EVENTS.items()}
+
+
+class EventTable:
+    """An episode's (or a season's) events as columns: castaway code, episode, signature, count
+
+    sign is set for tables read back from the event log, where -1 marks a
+    retracted row.
+    """
+
+    def __init__(
+        self, castaway_ids: List[str], castaway: np.ndarray, episode: np.ndarray, signature: np.ndarray,
+        count: np.ndarray, sign: Optional[np.ndarray] = None,
+    ):
+        self.castaway_ids = castaway_ids
+        self.castaway = castaway
+        self.episode = episode
+        self.signature = signature
+        self.count = count
+        self.sign = sign
+
+    def __len__(self) -> int:
+        return len(self.signature)
+
+
+class EventTableBuilder:
+    """Collects events row by row, then hands them over as arrays"""
+
+    def __init__(self, vocabulary: Vocabulary):
+        self.vocabulary = vocabulary
+        self._code_of: Dict[str, int] = {}
+        self._castaway: List[int] = []
+        self._episode: List[int] = []
+        self._signature: List[int] = []
+        self._count: List[float] = []
+        self._sign: List[int] = []
+        self.episode = 0  # stamped on the rows added next
+
+    def add(self, castaway_id: str, event: str, count: float = 1.0, sign: int = 1, **flags: bool) -> None:
+        self._castaway.append(self._code_of.setdefault(castaway_id, len(self._code_of)))
+        self._episode.append(self.episode)
+        self._signature.append(self.vocabulary.signature(event, flags))
+        self._count.append(count)
+        self._sign.append(sign)
+
+    def add_survivor_episode(self, results: EpisodeResults) -> None:
+        """Events of one survivor episode, in survivoR dataset shapes"""
+        self.episode = results.episode
+        played = set()
+        for challenge in results.challenges:
+            castaway_id = challenge.get("castaway_id")
+            if castaway_id is None:
+                continue
+            played.add(castaway_id)
+            immunity, reward = challenge_kinds(challenge)
+            self.add(castaway_id, "challenge", immunity=immunity, reward=reward, won=is_challenge_win(challenge))
+        eliminated = set(results.eliminated)
+        for vote in results.votes:
+            if vote.get("castaway_id") is not None:
+                played.add(vote["castaway_id"])
+            if vote.get("vote_id") is not None:
+                self.add(vote["vote_id"], "vote_received")
+            if vote.get("voted_out_id") is not None:
+                eliminated.add(vote["voted_out_id"])
+        for confessional in results.confessionals:
+            castaway_id = confessional.get("castaway_id")
+            if castaway_id is None:
+                continue
+            played.add(castaway_id)
+            self.add(castaway_id, "confessional", confessional.get("confessional_count") or 0)
+        for castaway_id in eliminated:
+            self.add(castaway_id, "eliminated")
+        for castaway_id in played - eliminated:
+            self.add(castaway_id, "survived")
+
+    def build(self) -> EventTable:
+        return EventTable(
+            list(self._code_of),
+            np.array(self._castaway, dtype=np.int64),
+            np.array(self._episode, dtype=np.int64),
+            np.array(self._signature, dtype=np.int64),
+            np.array(self._count, dtype=np.float64),
+            np.array(self._sign, dtype=np.float64) if any(s != 1 for s in self._sign) else None,
+        )
+
+
+class CompiledRules:
+    """A ruleset folded into per-signature point tables"""
+
+    def __init__(self, digest: str, fixed: np.ndarray, per_count: np.ndarray):
+        self.digest = digest
+        self.fixed = fixed
+        self.per_count = per_count
+
+    def row_points(self, table: EventTable) -> np.ndarray:
+        """Points of every event row"""
+        points = self.fixed[table.signature] + self.per_count[table.signature] * table.count
+        return points if table.sign is None else points * table.sign
+
+    def totals(self, table: EventTable) -> np.ndarray:
+        """Points per castaway code of the table"""
+        return np.bincount(table.castaway, weights=self.row_points(table), minlength=len(table.castaway_ids))
+
+    def score(self, table: EventTable) -> Dict[str, float]:
+        """Points per castaway_id (castaways scoring 0 are left out)"""
+        return {
+            castaway_id: value
+            for castaway_id, value in zip(table.castaway_ids, self.totals(table).tolist())
+            if value
+        }
+
+
+def rules_hash(game_type: GameType, rules: dict) -> str:
+    canonical = json.dumps({"game_type": game_type.value, **rules}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+_compiled: "OrderedDict[str, CompiledRules]" = OrderedDict()
+_defaults: Dict[GameType, CompiledRules] = {}
+
+
+def compile_rules(game_type: GameType, rules: Optional[dict] = None) -> CompiledRules:
+    """Compile a ruleset (the game type's default when None), reusing cached compilations"""
+    if rules is None:
+        # The per-episode scoring path asks for this every time; skip hashing it
+        if game_type not in _defaults:
+            _defaults[game_type] = compile_rules(game_type, DEFAULT_RULES[game_type])
+        return _defaults[game_type]
+    digest = rules_hash(game_type, rules)
+    compiled = _compiled.get(digest)
+    if compiled is not None:
+        _compiled.move_to_end(digest)
+        return compiled
+    vocabulary = VOCABULARIES[game_type]
+    fixed = np.zeros(vocabulary.size)
+    per_count = np.zeros(vocabulary.size)
+    for rule in rules.get("rules", []):
+        target = per_count if rule.get("per_count") else fixed
+        for signature in vocabulary.matching(rule["event"], rule.get("when") or {}):
+            target[signature] += rule["points"]
+    compiled = CompiledRules(digest, fixed, per_count)
+    _compiled[digest] = compiled
+    while len(_compiled) > MAX_COMPILED_RULESETS:
+        _compiled.popitem(last=False)
+    return compiled
+
+
+def survivor_event_table(episodes: Iterable[EpisodeResults]) -> EventTable:
+    """One event table over any number of survivor episodes"""
+    builder = EventTableBuilder(VOCABULARIES[GameType.survivor])
+    for results in episodes:
+        builder.add_survivor_episode(results)
+    return builder.build()
@@ -0,0 +1,147 @@
+"""Materialized league standings.
+
+league_standings holds one row per league member with their points, their
+competition rank and a unique position (ties broken by user_id). Writers keep
+it current incrementally:
+
+- apply_standing_deltas() adds point changes, then re-ranks only the leagues
+  they touched;
+- sync_league_members() adds/removes rows as members join or leave
+  (sync_members() does it for many leagues at once, for bulk changes).
+
+Both run inside the caller's transaction and return the rows they changed;
+once the transaction commits, publish_standing_changes() pushes those to the
+league's WebSocket channel. Readers never aggregate: a top-K page is an index
+range scan on (league_id, position) and "my rank" is a primary-key lookup.
+"""
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Float, Integer, column, delete, func, literal, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pubsub import league_channel, pubsub
+from app.models.league import LeagueMembership, LeagueStanding
+
+standings = LeagueStanding.__table__
+
+# Placeholder rank/position for rows that rerank() has not placed yet
+BOTTOM = 2 ** 31 - 1
+
+# Changed rows keyed by (league_id, user_id)
+StandingChanges = Dict[Tuple[int, int], dict]
+
+_RETURNING = (standings.c.league_id, standings.c.user_id, standings.c.points, standings.c.rank, standings.c.position)
+
+
+def _collect(changes: StandingChanges, rows) -> None:
+    for row in rows.mappings():
+        changes.setdefault((row["league_id"], row["user_id"]), {}).update(row)
+
+
+async def rerank(session: AsyncSession, league_ids: Iterable[int]) -> StandingChanges:
+    """Recompute rank and position for some leagues, rewriting only rows that moved"""
+    league_ids = sorted(set(league_ids))
+    if not league_ids:
+        return {}
+    ranked = (
+        select(
+            standings.c.league_id,
+            standings.c.user_id,
+            func.rank().over(partition_by=standings.c.league_id, order_by=standings.c.points.desc()).label("rank"),
+            func.row_number().over(
+                partition_by=standings.c.league_id, order_by=(standings.c.points.desc(), standings.c.user_id)
+            ).label("position"),
+        )
+        .where(standings.c.league_id.in_(league_ids))
+        .subquery()
+    )
+    changes: StandingChanges = {}
+    _collect(changes, await session.execute(
+        update(standings)
+        .where(
+            standings.c.league_id == ranked.c.league_id,
+            standings.c.user_id == ranked.c.user_id,
+            (standings.c.rank != ranked.c.rank) | (standings.c.position != ranked.c.position),
+        )
+        .values(rank=ranked.c.rank, position=ranked.c.position)
+        .returning(*_RETURNING)
+    ))
+    return changes
+
+
+async def apply_standing_deltas(session: AsyncSession, deltas: Dict[Tuple[int, int], float]) -> StandingChanges:
+    """Add point deltas keyed by (league_id, user_id)"""
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+    rows = values(
+        column("league_id", Integer), column("user_id", Integer), column("delta", Float), name="deltas"
+    ).data([(league_id, user_id, delta) for (league_id, user_id), delta in deltas.items()])
+    changes: StandingChanges = {}
+    _collect(changes, await session.execute(
+        update(standings)
+        .where(standings.c.league_id == rows.c.league_id, standings.c.user_id == rows.c.user_id)
+        .values(points=standings.c.points + rows.c.delta)
+        .returning(*_RETURNING)
+    ))
+    # rerank() returns the new rank/position of rows that moved; the rest kept theirs
+    for key, row in (await rerank(session, (league_id for league_id, _ in deltas))).items():
+        changes.setdefault(key, {}).update(row)
+    return changes
+
+
+async def sync_league_members(session: AsyncSession, league_id: int) -> StandingChanges:
+    """Give every member of a league a standings row and drop rows of former members"""
+    return await sync_members(session, [league_id])
+
+
+async def sync_members(session: AsyncSession, league_ids: Iterable[int]) -> StandingChanges:
+    """sync_league_members() for several leagues in one pass"""
+    league_ids = sorted(set(league_ids))
+    if not league_ids:
+        return {}
+    memberships = LeagueMembership.__table__
+    members = select(memberships.c.league_id, memberships.c.user_id).where(
+        memberships.c.league_id.in_(league_ids), memberships.c.user_id.is_not(None)
+    )
+    # New members start at the bottom; rerank() puts them in place
+    await session.execute(
+        insert(standings)
+        .from_select(
+            ["league_id", "user_id", "points", "rank", "position"],
+            select(
+                memberships.c.league_id, memberships.c.user_id, literal(0.0, Float),
+                literal(BOTTOM, Integer), literal(BOTTOM, Integer),
+            ).where(memberships.c.league_id.in_(league_ids), memberships.c.user_id.is_not(None)),
+        )
+        .on_conflict_do_nothing(index_elements=[standings.c.league_id, standings.c.user_id])
+    )
+    removed = await session.execute(
+        delete(standings)
+        .where(
+            standings.c.league_id.in_(league_ids),
+            tuple_(standings.c.league_id, standings.c.user_id).not_in(members),
+        )
+        .returning(standings.c.league_id, standings.c.user_id)
+    )
+    changes: StandingChanges = {
+        (row.league_id, row.user_id): {"league_id": row.league_id, "user_id": row.user_id, "removed": True}
+        for row in removed
+    }
+    changes.update(await rerank(session, league_ids))
+    return changes
+
+
+async def publish_standing_changes(changes: StandingChanges) -> None:
+    """Push committed standings changes to each league's live channel"""
+    by_league: Dict[int, List[dict]] = {}
+    for (league_id, user_id), row in changes.items():
+        by_league.setdefault(league_id, []).append({"id": user_id, **row})
+    for league_id, rows in by_league.items():
+        await pubsub.publish(league_channel(league_id), {
+            "type": "standings",
+            "coalesce": "standings",
+            "league_id": league_id,
+            "rows": rows,
+        })
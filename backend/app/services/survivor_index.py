@@ -0,0 +1,161 @@
+"""Prebuilt lookups over the survivoR datasets.
+
+An index is built from one specific set of dataset versions and is never
+mutated afterwards. When any of its source datasets is refreshed a new index
+is built and swapped in as a whole, so a request always reads one consistent
+snapshot. Builders receive each dataset as a stream of records read from the
+disk cache, so the raw files are never held in memory alongside the index.
+"""
+import asyncio
+import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+from app.core.survivor_data import SurvivorDataStore, survivor_store
+
+# Response key -> survivoR dataset name
+STATS_DATASETS = {
+    "votes": "vote_history",
+    "challenges": "challenge_results",
+    "confessionals": "confessionals",
+}
+
+IndexT = TypeVar("IndexT")
+
+# Upper bound on memoized field projections per SeasonCastawaysIndex
+MAX_PROJECTED_BODIES = 1024
+
+
+def dump_json(data: Any) -> bytes:
+    """Serialize the way FastAPI's JSONResponse does"""
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def episode_order(record: dict) -> Tuple[str, int, int]:
+    """Sort key placing records in (version, season, episode) order"""
+    return (record.get("version") or "", record.get("season") or 0, record.get("episode") or 0)
+
+
+class CastawayStats:
+    """One castaway's records, each list ordered by season then episode"""
+
+    __slots__ = ("records", "row_seasons")
+
+    def __init__(self, records: Dict[str, List[dict]]):
+        self.records = records
+        # key -> season of each row, bisected to slice out a single season
+        self.row_seasons = {
+            key: [r.get("season") or 0 for r in rows] for key, rows in records.items()
+        }
+
+    def for_season(self, season: Optional[int]) -> Dict[str, List[dict]]:
+        if season is None:
+            return self.records
+        result = {}
+        for key, rows in self.records.items():
+            seasons = self.row_seasons[key]
+            result[key] = rows[bisect_left(seasons, season):bisect_right(seasons, season)]
+        return result
+
+
+class CastawayStatsIndex:
+    """votes, challenges and confessionals grouped by castaway_id"""
+
+    def __init__(self, versions: tuple, by_castaway: Dict[str, CastawayStats]):
+        self.versions = versions
+        self._by_castaway = by_castaway
+
+    @classmethod
+    def build(cls, versions: tuple, datasets: Dict[str, Iterable[dict]]) -> "CastawayStatsIndex":
+        grouped: Dict[str, Dict[str, List[dict]]] = defaultdict(lambda: {key: [] for key in STATS_DATASETS})
+        for key, records in datasets.items():
+            for record in records:
+                castaway_id = record.get("castaway_id")
+                if castaway_id is not None:
+                    grouped[castaway_id][key].append(record)
+        by_castaway = {}
+        for castaway_id, records in grouped.items():
+            for rows in records.values():
+                rows.sort(key=episode_order)
+            by_castaway[castaway_id] = CastawayStats(records)
+        return cls(versions, by_castaway)
+
+    def lookup(self, castaway_id: str, season: Optional[int] = None) -> Dict[str, List[dict]]:
+        """Stats for one castaway, optionally limited to one season"""
+        stats = self._by_castaway.get(castaway_id)
+        if stats is None:
+            return {key: [] for key in STATS_DATASETS}
+        return stats.for_season(season)
+
+    def lookup_many(self, castaway_ids: Iterable[str], season: Optional[int] = None) -> Dict[str, Dict[str, List[dict]]]:
+        """Stats for several castaways in one call, keyed by castaway_id"""
+        return {castaway_id: self.lookup(castaway_id, season) for castaway_id in castaway_ids}
+
+
+class SeasonCastawaysIndex:
+    """castaways partitioned by (version, season) with pre-serialized bodies"""
+
+    def __init__(self, versions: tuple, partitions: Dict[Tuple[str, int], List[dict]]):
+        self.versions = versions
+        self._partitions = partitions
+        self._bodies = {(key, None): dump_json(rows) for key, rows in partitions.items()}
+        self._projected: Dict[tuple, bytes] = {}
+
+    @classmethod
+    def build(cls, versions: tuple, datasets: Dict[str, Iterable[dict]]) -> "SeasonCastawaysIndex":
+        partitions: Dict[Tuple[str, int], List[dict]] = defaultdict(list)
+        for castaway in datasets["castaways"]:
+            partitions[(castaway.get("version", "US"), castaway.get("season"))].append(castaway)
+        return cls(versions, dict(partitions))
+
+    def castaways(self, version: str, season: int) -> List[dict]:
+        return self._partitions.get((version, season), [])
+
+    def body(self, version: str, season: int, fields: Optional[Tuple[str, ...]] = None) -> bytes:
+        """JSON body for one season, optionally projected onto some fields"""
+        key = ((version, season), fields or None)
+        body = self._bodies.get(key) or self._projected.get(key)
+        if body is None:
+            rows = self.castaways(version, season)
+            if fields:
+                rows = [{field: row.get(field) for field in fields} for row in rows]
+            body = dump_json(rows)
+            if len(self._projected) < MAX_PROJECTED_BODIES:
+                self._projected[key] = body
+        return body
+
+
+class DatasetIndex(Generic[IndexT]):
+    """Builds an index from some datasets and rebuilds it when they change"""
+
+    def __init__(
+        self,
+        datasets: Dict[str, str],
+        builder: Callable[[tuple, Dict[str, Iterable[dict]]], IndexT],
+        store: SurvivorDataStore = survivor_store,
+    ):
+        self.datasets = datasets
+        self.builder = builder
+        self.store = store
+        self._index: Optional[IndexT] = None
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> IndexT:
+        """Get the index for the current dataset versions"""
+        entries = await asyncio.gather(*(self.store.entry(name) for name in self.datasets.values()))
+        versions = tuple(entry.version for entry in entries)
+        index = self._index
+        if index is not None and index.versions == versions:
+            return index
+        async with self._lock:
+            if self._index is None or self._index.versions != versions:
+                records = {key: self.store.records(entry) for key, entry in zip(self.datasets, entries)}
+                self._index = await asyncio.to_thread(self.builder, versions, records)
+            return self._index
+
+
+castaway_stats_index: DatasetIndex[CastawayStatsIndex] = DatasetIndex(STATS_DATASETS, CastawayStatsIndex.build)
+season_castaways_index: DatasetIndex[SeasonCastawaysIndex] = DatasetIndex(
+    {"castaways": "castaways"}, SeasonCastawaysIndex.build
+)
@@ -0,0 +1,93 @@
+"""Load survivoR castaways and their derived counts into survivor_players.
+
+Rows are written with batched multi-row INSERT ... ON CONFLICT (castaway_id)
+DO UPDATE statements. The update only fires when a column actually changed,
+so re-running the ingest against unchanged data rewrites nothing.
+
+total_score is owned by the scoring path and is never touched here.
+"""
+import asyncio
+import logging
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.survivor_data import SurvivorDataStore, survivor_store
+from app.models.player import SurvivorPlayer
+from app.services.survivor_stats import AGGREGATES, SeasonStats
+
+# Columns the ingest owns (everything but id and total_score)
+INGEST_COLUMNS = ("name", "season", "age", "occupation", "tribe", "status") + AGGREGATES
+
+
+def castaway_status(castaway: dict) -> str:
+    result = castaway.get("result")
+    if castaway.get("winner") is True or result == "Sole Survivor":
+        return "winner"
+    return "eliminated" if result else "active"
+
+
+def build_player_rows(
+    castaways: Iterable[dict],
+    challenges: Iterable[dict],
+    confessionals: Iterable[dict],
+) -> List[dict]:
+    """One survivor_players row per castaway_id, from their latest season"""
+    castaways = list(castaways)
+    latest: Dict[str, dict] = {}
+    for castaway in castaways:
+        castaway_id = castaway.get("castaway_id")
+        if castaway_id is None:
+            continue
+        current = latest.get(castaway_id)
+        if current is None or (castaway.get("season") or 0) >= (current.get("season") or 0):
+            latest[castaway_id] = castaway
+    totals = SeasonStats.from_records((), castaways, challenges, confessionals).castaway_totals()
+    rows = []
+    for castaway_id, castaway in latest.items():
+        rows.append({
+            "castaway_id": castaway_id,
+            "name": castaway.get("castaway") or castaway.get("full_name") or castaway_id,
+            "season": castaway.get("season"),
+            "age": castaway.get("age"),
+            "occupation": castaway.get("occupation"),
+            "tribe": castaway.get("original_tribe"),
+            "status": castaway_status(castaway),
+            **totals.get(castaway_id, dict.fromkeys(AGGREGATES, 0)),
+        })
+    return rows
+
+
+async def upsert_player_rows(session: AsyncSession, rows: List[dict], batch_size: Optional[int] = None) -> int:
+    """Upsert rows in batches; returns how many rows were inserted or changed"""
+    batch_size = batch_size or settings.SURVIVOR_INGEST_BATCH_SIZE
+    table = SurvivorPlayer.__table__
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        stmt = insert(table).values(rows[start:start + batch_size])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.castaway_id],
+            set_={column: stmt.excluded[column] for column in INGEST_COLUMNS},
+            # Skip the write entirely for rows that are already up to date
+            where=or_(*(table.c[column].is_distinct_from(stmt.excluded[column]) for column in INGEST_COLUMNS)),
+        ).returning(table.c.id)
+        result = await session.execute(stmt)
+        written += len(result.all())
+    return written
+
+
+async def ingest_survivor_players(session: AsyncSession, store: SurvivorDataStore = survivor_store) -> dict:
+    """Rebuild survivor_players from the current survivoR datasets"""
+    entries = await asyncio.gather(
+        store.entry("castaways"),
+        store.entry("challenge_results"),
+        store.entry("confessionals"),
+    )
+    rows = await asyncio.to_thread(build_player_rows, *(store.records(entry) for entry in entries))
+    written = await upsert_player_rows(session, rows)
+    await session.commit()
+    logging.info(f"survivoR ingest: {len(rows)} players, {written} inserted or updated")
+    return {"players": len(rows), "written": written}
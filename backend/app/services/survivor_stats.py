@@ -0,0 +1,340 @@
+"""Per-castaway aggregates derived from the survivoR tables.
+
+These feed the SurvivorPlayer columns (immunity_wins, reward_wins,
+confessional_count, days_survived) and /survivor/season-stats.
+
+SeasonStats computes everything in one columnar pass: castaway and version are
+dictionary-encoded, rows from all tables are grouped by (castaway, version,
+season) and summed with NumPy group-by reductions. castaway_totals() is the
+plain-Python equivalent for career totals, kept as the reference the engine
+is benchmarked against (see benchmarks/bench_season_stats.py).
+
+When the datasets come from the binary snapshot, encode_snapshot() builds the
+coded tables straight from the mapped columns: only the (small) dictionaries
+are touched in Python.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.survivor_snapshot import VALUE, SnapshotTable
+from app.services.survivor_index import DatasetIndex
+
+# Column names of the aggregates, as stored on SurvivorPlayer
+AGGREGATES = ("immunity_wins", "reward_wins", "confessional_count", "days_survived")
+
+
+def is_challenge_win(record: dict) -> bool:
+    """Whether a challenge_results row is a win for its castaway"""
+    result = record.get("result")
+    if isinstance(result, str):
+        return result.strip().lower().startswith("won")
+    return bool(record.get("won"))
+
+
+def challenge_kinds(record: dict) -> tuple:
+    """(is immunity, is reward) for a challenge_results row"""
+    challenge_type = (record.get("challenge_type") or "").lower()
+    return "immunity" in challenge_type, "reward" in challenge_type
+
+
+def encode_records(
+    castaways: Iterable[dict],
+    challenges: Iterable[dict],
+    confessionals: Iterable[dict],
+) -> Tuple[List[str], List[str], List[Dict[str, np.ndarray]]]:
+    """Turn record streams into integer-coded columns for SeasonStats.from_codes
+
+    castaway_id and version are dictionary-encoded (shared across the three
+    tables) in the same single pass that pulls out the value columns.
+    """
+    castaway_of: Dict[str, int] = {}
+    version_of: Dict[str, int] = {}
+
+    def encoder(table):
+        """Append (castaway, version, season) codes for each record, yielding kept records"""
+        castaway_codes, version_codes, seasons = [], [], []
+        keys = {"castaway": castaway_codes, "version": version_codes, "season": seasons}
+        add_castaway, add_version, add_season = castaway_codes.append, version_codes.append, seasons.append
+
+        def records():
+            for record in table:
+                castaway_id = record.get("castaway_id")
+                if castaway_id is None:
+                    continue
+                code = castaway_of.get(castaway_id)
+                if code is None:
+                    code = castaway_of[castaway_id] = len(castaway_of)
+                add_castaway(code)
+                version = record.get("version") or "US"
+                code = version_of.get(version)
+                if code is None:
+                    code = version_of[version] = len(version_of)
+                add_version(code)
+                add_season(record.get("season") or 0)
+                yield record
+
+        return keys, records()
+
+    keys, records = encoder(castaways)
+    days = [castaway.get("day") or 0 for castaway in records]
+    castaway_table = _table(keys, days_survived=days)
+
+    # Only a handful of distinct result / challenge_type strings exist
+    wins: Dict[tuple, tuple] = {}
+    keys, records = encoder(challenges)
+    immunity_wins, reward_wins = [], []
+    for challenge in records:
+        outcome = (challenge.get("result"), challenge.get("won"), challenge.get("challenge_type"))
+        flags = wins.get(outcome)
+        if flags is None:
+            won = is_challenge_win(challenge)
+            immunity, reward = challenge_kinds(challenge)
+            flags = wins[outcome] = (won and immunity, won and reward)
+        immunity_wins.append(flags[0])
+        reward_wins.append(flags[1])
+    challenge_table = _table(keys, immunity_wins=immunity_wins, reward_wins=reward_wins)
+
+    keys, records = encoder(confessionals)
+    counts = [confessional.get("confessional_count") or 0 for confessional in records]
+    confessional_table = _table(keys, confessional_count=counts)
+
+    return list(castaway_of), list(version_of), [castaway_table, challenge_table, confessional_table]
+
+
+def _table(keys: Dict[str, list], **values: list) -> Dict[str, np.ndarray]:
+    columns = {**keys, **values}
+    return {name: np.asarray(column, dtype=np.int64) for name, column in columns.items()}
+
+
+class NotColumnar(Exception):
+    """A snapshot column has a kind encode_snapshot() cannot use directly"""
+
+
+def _snapshot_number(table: SnapshotTable, column: str) -> np.ndarray:
+    """int64 values of a numeric column, 0 where missing (like `.get(column) or 0`)"""
+    kind = table.kind(column)
+    if kind is None:
+        return np.zeros(len(table), dtype=np.int64)
+    if kind not in ("int", "bool", "float"):
+        raise NotColumnar(f"{table.name}.{column} is {kind}")
+    values = table.values(column)
+    present = table.states(column) == VALUE
+    if kind == "float":
+        present &= ~np.isnan(values)
+    return np.where(present, values, 0).astype(np.int64)
+
+
+def _snapshot_lookup(table: SnapshotTable, column: str, flag, default) -> np.ndarray:
+    """Apply flag() to each distinct value of a str column; default where missing"""
+    kind = table.kind(column)
+    if kind is None:
+        return np.full(len(table), default)
+    if kind != "str":
+        raise NotColumnar(f"{table.name}.{column} is {kind}")
+    lookup = np.array([flag(value) for value in table.dictionary(column)] + [default])
+    # Code -1 (no value) picks the trailing default
+    return lookup[table.codes(column)]
+
+
+def encode_snapshot(
+    castaways: SnapshotTable,
+    challenges: SnapshotTable,
+    confessionals: SnapshotTable,
+) -> Tuple[List[str], List[str], List[Dict[str, np.ndarray]]]:
+    """encode_records() for snapshot tables, working on the mapped columns"""
+    castaway_of: Dict[str, int] = {}
+    version_of: Dict[str, int] = {}
+
+    def shared_codes(table: SnapshotTable, column: str, codes_of: Dict[str, int]) -> np.ndarray:
+        lookup = [codes_of.setdefault(value, len(codes_of)) for value in table.dictionary(column)]
+        return np.array(lookup + [-1], dtype=np.int64)[table.codes(column)]
+
+    def keys(table: SnapshotTable):
+        if table.kind("castaway_id") != "str":
+            raise NotColumnar(f"{table.name}.castaway_id is {table.kind('castaway_id')}")
+        if table.kind("version") not in (None, "str"):
+            raise NotColumnar(f"{table.name}.version is {table.kind('version')}")
+        keep = table.codes("castaway_id") >= 0
+        castaway = shared_codes(table, "castaway_id", castaway_of)
+        # Missing and empty versions count as US, as in encode_records()
+        us = version_of.setdefault("US", len(version_of))
+        if table.kind("version") is None:
+            version = np.full(len(table), us, dtype=np.int64)
+        else:
+            lookup = [version_of.setdefault(value or "US", len(version_of)) for value in table.dictionary("version")]
+            version = np.array(lookup + [us], dtype=np.int64)[table.codes("version")]
+        season = _snapshot_number(table, "season")
+        return keep, {"castaway": castaway[keep], "version": version[keep], "season": season[keep]}
+
+    keep, castaway_table = keys(castaways)
+    castaway_table["days_survived"] = _snapshot_number(castaways, "day")[keep]
+
+    keep, challenge_table = keys(challenges)
+    result = challenges.kind("result")
+    if result not in (None, "str"):
+        raise NotColumnar(f"challenge_results.result is {result}")
+    # String results decide the win; otherwise fall back to the won flag (see is_challenge_win)
+    won = _snapshot_number(challenges, "won") != 0
+    if result == "str":
+        won = np.where(
+            challenges.codes("result") >= 0,
+            _snapshot_lookup(challenges, "result", lambda value: is_challenge_win({"result": value}), False),
+            won,
+        )
+    immunity = _snapshot_lookup(challenges, "challenge_type", lambda v: challenge_kinds({"challenge_type": v})[0], False)
+    reward = _snapshot_lookup(challenges, "challenge_type", lambda v: challenge_kinds({"challenge_type": v})[1], False)
+    challenge_table["immunity_wins"] = (won & immunity)[keep].astype(np.int64)
+    challenge_table["reward_wins"] = (won & reward)[keep].astype(np.int64)
+
+    keep, confessional_table = keys(confessionals)
+    confessional_table["confessional_count"] = _snapshot_number(confessionals, "confessional_count")[keep]
+
+    return list(castaway_of), list(version_of), [castaway_table, challenge_table, confessional_table]
+
+
+# Seasons are packed into the low bits of the group keys
+SEASON_SPAN = 1 << 16
+
+
+class SeasonStats:
+    """Aggregates per (castaway, version, season), per castaway and per season"""
+
+    def __init__(
+        self,
+        versions: tuple,
+        castaway_ids: np.ndarray,
+        version_names: List[str],
+        group_castaway: np.ndarray,
+        group_version: np.ndarray,
+        group_season: np.ndarray,
+        group_values: Dict[str, np.ndarray],
+    ):
+        self.versions = versions
+        self.castaway_ids = castaway_ids
+        self.version_names = version_names
+        self.group_castaway = group_castaway
+        self.group_version = group_version
+        self.group_season = group_season
+        self.group_values = group_values
+        self.castaway_values = {
+            column: np.bincount(group_castaway, weights=values, minlength=len(castaway_ids)).astype(np.int64)
+            for column, values in group_values.items()
+        }
+        # Partition the groups by (version, season) for season lookups
+        season_key = group_version.astype(np.int64) * SEASON_SPAN + group_season
+        order = np.argsort(season_key, kind="stable")
+        keys, starts = np.unique(season_key[order], return_index=True)
+        bounds = np.append(starts, len(order))
+        self._season_groups = {
+            (version_names[key // SEASON_SPAN], int(key % SEASON_SPAN)): order[bounds[i]:bounds[i + 1]]
+            for i, key in enumerate(keys)
+        }
+
+    @classmethod
+    def from_codes(
+        cls,
+        versions: tuple,
+        castaway_names: Sequence[str],
+        version_names: Sequence[str],
+        tables: List[Dict[str, np.ndarray]],
+    ) -> "SeasonStats":
+        """Aggregate integer-coded tables, each with castaway/version/season code
+        columns plus any of the AGGREGATES columns (missing ones count as 0)"""
+        n_versions = max(len(version_names), 1)
+        castaway = np.concatenate([t["castaway"] for t in tables] or [np.array([], dtype=np.int64)])
+        version = np.concatenate([t["version"] for t in tables] or [np.array([], dtype=np.int64)])
+        season = np.concatenate([t["season"] for t in tables] or [np.array([], dtype=np.int64)])
+        group_keys, group = np.unique((castaway * n_versions + version) * SEASON_SPAN + season, return_inverse=True)
+
+        group_values = {}
+        for column in AGGREGATES:
+            values = np.concatenate([
+                t[column] if column in t else np.zeros(len(t["castaway"]), dtype=np.int64) for t in tables
+            ] or [np.array([], dtype=np.int64)])
+            group_values[column] = np.bincount(group, weights=values, minlength=len(group_keys)).astype(np.int64)
+        return cls(
+            versions,
+            np.asarray(castaway_names, dtype=object),
+            list(version_names),
+            group_castaway=group_keys // SEASON_SPAN // n_versions,
+            group_version=group_keys // SEASON_SPAN % n_versions,
+            group_season=group_keys % SEASON_SPAN,
+            group_values=group_values,
+        )
+
+    @classmethod
+    def from_records(
+        cls,
+        versions: tuple,
+        castaways: Iterable[dict],
+        challenges: Iterable[dict],
+        confessionals: Iterable[dict],
+    ) -> "SeasonStats":
+        return cls.from_codes(versions, *encode_records(castaways, challenges, confessionals))
+
+    @classmethod
+    def build(cls, versions: tuple, datasets: Dict[str, Iterable[dict]]) -> "SeasonStats":
+        """Builder for DatasetIndex over castaways, challenge_results and confessionals"""
+        tables = datasets["castaways"], datasets["challenges"], datasets["confessionals"]
+        if all(isinstance(table, SnapshotTable) for table in tables):
+            try:
+                return cls.from_codes(versions, *encode_snapshot(*tables))
+            except NotColumnar:
+                pass
+        return cls.from_records(versions, *tables)
+
+    def castaway_totals(self) -> Dict[str, Dict[str, int]]:
+        """Career totals per castaway_id (same result as castaway_totals())"""
+        columns = [self.castaway_values[column].tolist() for column in AGGREGATES]
+        return {
+            castaway_id: dict(zip(AGGREGATES, values))
+            for castaway_id, *values in zip(self.castaway_ids.tolist(), *columns)
+        }
+
+    def season(self, version: str, season: int) -> Optional[dict]:
+        """Season-level totals plus one row per castaway, or None if unknown"""
+        groups = self._season_groups.get((version, season))
+        if groups is None:
+            return None
+        castaways = [
+            {"castaway_id": castaway_id, **dict(zip(AGGREGATES, values))}
+            for castaway_id, *values in zip(
+                self.castaway_ids[self.group_castaway[groups]].tolist(),
+                *(self.group_values[column][groups].tolist() for column in AGGREGATES),
+            )
+        ]
+        totals = {column: int(self.group_values[column][groups].sum()) for column in AGGREGATES}
+        return {"version": version, "season": season, "totals": totals, "castaways": castaways}
+
+
+def castaway_totals(
+    castaways: Iterable[dict],
+    challenges: Iterable[dict],
+    confessionals: Iterable[dict],
+) -> Dict[str, Dict[str, int]]:
+    """Career totals per castaway_id, summed over every season they played (pure Python)"""
+    totals: Dict[str, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(AGGREGATES, 0))
+    for castaway in castaways:
+        castaway_id = castaway.get("castaway_id")
+        if castaway_id is not None:
+            totals[castaway_id]["days_survived"] += castaway.get("day") or 0
+    for challenge in challenges:
+        castaway_id = challenge.get("castaway_id")
+        if castaway_id is None or not is_challenge_win(challenge):
+            continue
+        immunity, reward = challenge_kinds(challenge)
+        totals[castaway_id]["immunity_wins"] += immunity
+        totals[castaway_id]["reward_wins"] += reward
+    for confessional in confessionals:
+        castaway_id = confessional.get("castaway_id")
+        if castaway_id is not None:
+            totals[castaway_id]["confessional_count"] += confessional.get("confessional_count") or 0
+    return dict(totals)
+
+
+season_stats_index: DatasetIndex[SeasonStats] = DatasetIndex(
+    {"castaways": "castaways", "challenges": "challenge_results", "confessionals": "confessionals"},
+    SeasonStats.build,
+)
@@ -0,0 +1,148 @@
+"""Fantasy teams and their denormalized scores.
+
+fantasy_teams has one row per league member's roster with a score column that
+the scoring path keeps current: apply_event_deltas() scores the events an
+episode appended to the event log with each league's ruleset, and
+apply_team_deltas() adds the per-castaway point changes to every team holding
+those castaways in a single UPDATE ... FROM, inside the scoring transaction.
+Both hand back the change per (league_id, user_id) so standings can be moved
+by the same amounts. Readers never sum player scores: a league's teams are an
+index scan on (league_id, score) and a profile's teams a lookup on user_id.
+
+A team only earns episodes first logged after its players joined it
+(team_players.from_event_id against episode_events.origin_event_id), so teams
+built from a finished draft start at 0 and later corrections to earlier
+episodes leave them alone. event_log.rebuild_league() recomputes the same
+scores from the log.
+"""
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from sqlalchemy import Float, Select, String, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.draft import DraftPick
+from app.models.league import GameType, League, LeagueMembership, LeagueSettings
+from app.models.player import SurvivorPlayer
+from app.models.scoring import EpisodeEvent
+from app.models.team import FantasyTeam, TeamPlayer
+from app.services.event_log import lock_event_log
+from app.services.scoring_rules import EventTable, compile_rules
+
+teams = FantasyTeam.__table__
+team_players = TeamPlayer.__table__
+
+
+async def apply_team_deltas(
+    session: AsyncSession,
+    deltas: Dict[str, float],
+    origin_event_id: int,
+    league_ids: Optional[Union[Iterable[int], Select]] = None,
+) -> Dict[Tuple[int, int], float]:
+    """Add per-castaway score deltas from one episode to the teams that held them before it was
+    first logged (in some leagues only, if given); returns the change per (league_id, user_id)"""
+    if not deltas:
+        return {}
+    players = SurvivorPlayer.__table__
+    rows = values(column("castaway_id", String), column("delta", Float), name="deltas").data(list(deltas.items()))
+    per_team = (
+        select(team_players.c.team_id, func.sum(rows.c.delta).label("delta"))
+        .select_from(
+            team_players
+            .join(players, players.c.id == team_players.c.player_id)
+            .join(rows, rows.c.castaway_id == players.c.castaway_id)
+        )
+        .where(team_players.c.from_event_id < origin_event_id)
+        .group_by(team_players.c.team_id)
+        .subquery()
+    )
+    stmt = (
+        update(teams)
+        .where(teams.c.id == per_team.c.team_id)
+        .values(score=teams.c.score + per_team.c.delta, updated_at=func.now())
+        .returning(teams.c.league_id, teams.c.user_id, per_team.c.delta)
+    )
+    if league_ids is not None:
+        stmt = stmt.where(teams.c.league_id.in_(league_ids))
+    result = await session.execute(stmt)
+    return {(league_id, user_id): delta for league_id, user_id, delta in result.all() if delta}
+
+
+async def apply_event_deltas(
+    session: AsyncSession, origin_event_id: Optional[int], appended: EventTable
+) -> Dict[Tuple[int, int], float]:
+    """Score an episode's newly logged events with each league's ruleset and add them to team scores
+
+    Leagues on the default rules are updated together; each league with its
+    own ruleset gets its own pass.
+    """
+    if not len(appended):
+        return {}
+    players = SurvivorPlayer.__table__
+    leagues = League.__table__
+    league_settings = LeagueSettings.__table__
+    holding = (
+        select(teams.c.league_id)
+        .join(team_players, team_players.c.team_id == teams.c.id)
+        .join(players, players.c.id == team_players.c.player_id)
+        .where(players.c.castaway_id.in_(appended.castaway_ids), team_players.c.from_event_id < origin_event_id)
+    )
+    custom = (await session.execute(
+        select(leagues.c.id, league_settings.c.scoring_rules)
+        .join(league_settings, league_settings.c.id == leagues.c.settings_id)
+        .where(
+            leagues.c.id.in_(holding),
+            leagues.c.game_type == GameType.survivor,
+            league_settings.c.scoring_rules.is_not(None),
+        )
+    )).all()
+    on_defaults = (
+        select(leagues.c.id)
+        .outerjoin(league_settings, league_settings.c.id == leagues.c.settings_id)
+        .where(league_settings.c.scoring_rules.is_(None))
+    )
+    changes = await apply_team_deltas(session, compile_rules(GameType.survivor).score(appended), origin_event_id, on_defaults)
+    for league_id, rules in custom:
+        changes.update(await apply_team_deltas(
+            session, compile_rules(GameType.survivor, rules).score(appended), origin_event_id, [league_id]
+        ))
+    return changes
+
+
+async def build_draft_teams(session: AsyncSession, draft_id: int, league_id: int) -> int:
+    """Create (or extend) the teams of everyone who picked in a draft; returns roster rows added
+
+    Picks whose castaway has not been ingested into survivor_players yet are
+    skipped. New roster rows start earning after the current end of the event
+    log.
+    """
+    await lock_event_log(session, shared=True)
+    log_position = select(func.coalesce(func.max(EpisodeEvent.__table__.c.id), 0)).scalar_subquery()
+    memberships = LeagueMembership.__table__
+    draft_picks = DraftPick.__table__
+    pickers = select(draft_picks.c.user_id).where(draft_picks.c.draft_id == draft_id).distinct()
+    await session.execute(
+        insert(teams)
+        .from_select(
+            ["league_id", "membership_id", "user_id"],
+            select(memberships.c.league_id, memberships.c.id, memberships.c.user_id)
+            .where(memberships.c.league_id == league_id, memberships.c.user_id.in_(pickers)),
+        )
+        .on_conflict_do_nothing(constraint="uq_fantasy_teams_membership")
+    )
+    players = SurvivorPlayer.__table__
+    result = await session.execute(
+        insert(team_players)
+        .from_select(
+            ["team_id", "player_id", "from_event_id"],
+            select(teams.c.id, players.c.id, log_position)
+            .select_from(
+                draft_picks
+                .join(teams, (teams.c.league_id == league_id) & (teams.c.user_id == draft_picks.c.user_id))
+                .join(players, players.c.castaway_id == draft_picks.c.castaway_id)
+            )
+            .where(draft_picks.c.draft_id == draft_id),
+        )
+        .on_conflict_do_nothing()
+    )
+    return result.rowcount
@@ -0,0 +1,78 @@
+"""Time a full scoring-rules backtest, serially and fanned out across the process pool.
+
+Runs backtest_season() over synthetic seasons sized like the full survivoR
+data (every version and season).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_backtest [--scale 1]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.core import process_pool
+from app.core.config import settings
+from app.models.league import GameType
+from app.services.backtest import backtest_season, combine
+from app.services.scoring_rules import DEFAULT_RULES
+
+
+def synthetic_seasons(scale: int):
+    random.seed(0)
+    seasons = []
+    for version, n_seasons in [("US", 47 * scale), ("AU", 11 * scale), ("NZ", 3 * scale), ("SA", 10 * scale)]:
+        for season in range(1, n_seasons + 1):
+            ids = [f"{version}{season:03d}{i:02d}" for i in range(18)]
+            challenges, votes, confessionals = [], [], []
+            for episode in range(1, 15):
+                alive = ids[:19 - episode]
+                for castaway_id in alive:
+                    challenges.append({
+                        "version": version, "season": season, "episode": episode, "castaway_id": castaway_id,
+                        "challenge_type": random.choice(["Immunity", "Reward", "Immunity and Reward"]),
+                        "result": random.choice(["Won", "Lost"]),
+                    })
+                    confessionals.append({
+                        "version": version, "season": season, "episode": episode, "castaway_id": castaway_id,
+                        "confessional_count": random.randint(0, 6),
+                    })
+                    votes.append({
+                        "version": version, "season": season, "episode": episode, "castaway_id": castaway_id,
+                        "vote_id": random.choice(alive), "voted_out_id": alive[-1],
+                    })
+            seasons.append((version, season, challenges, votes, confessionals))
+    return seasons
+
+
+async def pooled(rules, seasons):
+    return await asyncio.gather(*(run_in(rules, season) for season in seasons))
+
+
+def run_in(rules, season):
+    return process_pool.run_in_process(backtest_season, rules, *season)
+
+
+def main(scale: int) -> None:
+    rules = DEFAULT_RULES[GameType.survivor]
+    seasons = synthetic_seasons(scale)
+    print(f"{len(seasons)} seasons, {sum(len(s[2]) + len(s[3]) + len(s[4]) for s in seasons)} rows")
+
+    start = time.perf_counter()
+    serial = [backtest_season(rules, *season) for season in seasons]
+    combine("bench", (), serial)
+    print(f"serial                      {(time.perf_counter() - start) * 1000:8.1f} ms")
+
+    asyncio.run(pooled(rules, seasons[:settings.PROCESS_POOL_WORKERS]))  # start the workers
+    start = time.perf_counter()
+    combine("bench", (), asyncio.run(pooled(rules, seasons)))
+    print(f"process pool ({settings.PROCESS_POOL_WORKERS} workers)    {(time.perf_counter() - start) * 1000:8.1f} ms")
+    process_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+    main(args.scale)
@@ -0,0 +1,137 @@
+"""Bulk admin operations (services/bulk.py) at hundreds of thousands of rows.
+
+Seeds --users synthetic users in leagues of --per-league members (each league
+owned by its first member, standings synced), then times, in order:
+
+    import    one new membership per user (the first chunk is sent twice,
+              so some rows are skipped as duplicates)
+    admin     granting and revoking the admin flag of every seeded user
+    remove    the imported memberships again
+    delete    every seeded user, which transfers or deletes their leagues
+
+and prints rows per second and the average time per chunk, which should stay
+flat as --users grows. The delete step removes what was seeded.
+
+Needs a migrated database (DATABASE_URL). Run from the backend directory:
+
+    python -m benchmarks.bench_bulk_admin [--users 200000] [--per-league 8] [--chunk 5000]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import List
+
+from sqlalchemy import insert, text
+
+from app.core.config import settings
+from app.core.database import async_session_maker, engine
+from app.models.league import GameType, League, LeagueMembership, MemberRole
+from app.models.user import User
+from app.services.bulk import delete_users, import_memberships, remove_memberships, set_admin_flags
+from app.services.standings import sync_members
+
+BATCH = 10000
+
+
+async def analyze() -> None:
+    """Fresh planner statistics, so the seeded rows don't run against plans for empty tables"""
+    async with engine.connect() as conn:
+        for table in ("users", "leagues", "league_memberships", "league_standings"):
+            await conn.execute(text(f"ANALYZE {table}"))
+
+
+async def seed(users: int, per_league: int) -> dict:
+    tag = uuid.uuid4().hex[:8]
+    async with async_session_maker() as session:
+        user_ids: List[int] = []
+        for start in range(0, users, BATCH):
+            user_ids += (await session.execute(
+                insert(User).returning(User.id),
+                [
+                    {"email": f"bb-{tag}-{i}@example.com", "username": f"bb-{tag}-{i}", "hashed_password": "x"}
+                    for i in range(start, min(start + BATCH, users))
+                ],
+            )).scalars().all()
+        groups = [user_ids[start:start + per_league] for start in range(0, users, per_league)]
+        league_ids: List[int] = []
+        for start in range(0, len(groups), BATCH):
+            league_ids += (await session.execute(
+                insert(League).returning(League.id),
+                [
+                    {"name": f"bb-{tag}-{i}", "game_type": GameType.survivor, "owner_id": groups[i][0], "join_code": f"bb{tag}{i}"}
+                    for i in range(start, min(start + BATCH, len(groups)))
+                ],
+            )).scalars().all()
+        rows = [
+            {"league_id": league_id, "user_id": user_id, "role": MemberRole.owner if k == 0 else MemberRole.member}
+            for league_id, group in zip(league_ids, groups)
+            for k, user_id in enumerate(group)
+        ]
+        for start in range(0, len(rows), BATCH):
+            await session.execute(insert(LeagueMembership), rows[start:start + BATCH])
+        await session.commit()
+    await analyze()
+    async with async_session_maker() as session:
+        for start in range(0, len(league_ids), settings.BULK_CHUNK_SIZE):
+            await sync_members(session, league_ids[start:start + settings.BULK_CHUNK_SIZE])
+            await session.commit()
+    await analyze()
+    return {"tag": tag, "users": user_ids, "leagues": league_ids, "memberships": len(rows)}
+
+
+def report(name: str, rows: int, chunks: int, seconds: float, detail: str = "") -> None:
+    print(
+        f"  {name:8s} {rows:8d} rows  {seconds:7.2f} s  {rows / seconds if seconds else 0:9.0f} rows/s  "
+        f"{chunks:3d} chunks, {seconds / chunks * 1000 if chunks else 0:7.1f} ms/chunk  {detail}"
+    )
+
+
+async def main(users: int, per_league: int) -> None:
+    start = time.perf_counter()
+    seeded = await seed(users, per_league)
+    print(
+        f"Seeded {users} users, {len(seeded['leagues'])} leagues, {seeded['memberships']} memberships "
+        f"in {time.perf_counter() - start:.1f}s (chunks of {settings.BULK_CHUNK_SIZE})"
+    )
+    user_ids, league_ids = seeded["users"], seeded["leagues"]
+    try:
+        async with async_session_maker() as session:
+            # Every user joins the next league over; the first chunk twice
+            rows = [(league_ids[(i // per_league + 1) % len(league_ids)], user_id, MemberRole.member) for i, user_id in enumerate(user_ids)]
+            rows += rows[:settings.BULK_CHUNK_SIZE]
+            start = time.perf_counter()
+            imported = await import_memberships(session, rows)
+            report("import", len(rows), imported.chunks, time.perf_counter() - start, f"{imported.changed} added, {imported.skipped} skipped")
+
+            start = time.perf_counter()
+            granted = await set_admin_flags(session, user_ids, True)
+            revoked = await set_admin_flags(session, user_ids, False)
+            report("admin", 2 * len(user_ids), granted.chunks + revoked.chunks, time.perf_counter() - start, f"{granted.users_updated} granted, {revoked.users_updated} revoked")
+
+            start = time.perf_counter()
+            removed = await remove_memberships(session, [(league_id, user_id) for league_id, user_id, _ in rows])
+            report("remove", len(rows), removed.chunks, time.perf_counter() - start, f"{removed.changed} removed, {removed.skipped} skipped")
+
+            start = time.perf_counter()
+            deleted = await delete_users(session, user_ids)
+            report(
+                "delete", len(user_ids), deleted.chunks, time.perf_counter() - start,
+                f"{deleted.memberships_removed} memberships, {deleted.leagues_transferred} leagues transferred, {deleted.leagues_deleted} deleted",
+            )
+            user_ids = []
+    finally:
+        if user_ids:
+            async with async_session_maker() as session:
+                await delete_users(session, user_ids)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--per-league", type=int, default=8)
+    parser.add_argument("--chunk", type=int, default=settings.BULK_CHUNK_SIZE)
+    args = parser.parse_args()
+    settings.BULK_CHUNK_SIZE = args.chunk
+    asyncio.run(main(args.users, args.per_league))
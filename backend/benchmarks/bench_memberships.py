@@ -0,0 +1,202 @@
+"""Membership lookups at scale, with and without the league_memberships indexes.
+
+Seeds --leagues synthetic leagues with --per-league members each (120k
+memberships by default), then times the statements the league handlers run
+against league_memberships:
+
+    membership check   get_membership(): WHERE league_id = ? AND user_id = ?
+    leagues of user    league ids and roles of one user (users/{id}/leagues)
+    member count       the correlated count select_leagues() adds per league
+    join               add_member() (conflict-free insert; half of the probes
+                       are duplicates), versus the old read-then-insert
+
+Each pass runs in one transaction that is rolled back, so the joins leave no
+rows behind. The "without indexes" pass drops uq_league_memberships_league_user
+and ix_league_memberships_user_league inside its transaction first, which
+locks the table until it rolls back: don't run this against a database in use.
+Seeded rows are removed again.
+
+Needs a migrated database (DATABASE_URL). Run from the backend directory:
+
+    python -m benchmarks.bench_memberships [--leagues 20000] [--per-league 6] [--probes 2000]
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+from sqlalchemy import delete, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.database import async_session_maker, engine
+from app.models.league import GameType, League, LeagueMembership, MemberRole
+from app.models.user import User
+from app.services.leagues import add_member, get_membership
+
+memberships = LeagueMembership.__table__
+
+BATCH = 10000
+
+
+async def seed(leagues: int, per_league: int) -> dict:
+    """Users and leagues in equal numbers; league i has users i, i + stride, i + 2 * stride, ..."""
+    tag = uuid.uuid4().hex[:8]
+    users = leagues
+    stride = users // per_league
+    async with async_session_maker() as session:
+        user_ids: List[int] = []
+        for start in range(0, users, BATCH):
+            user_ids += (await session.execute(
+                insert(User).returning(User.id),
+                [
+                    {"email": f"bm-{tag}-{i}@example.com", "username": f"bm-{tag}-{i}", "hashed_password": "x"}
+                    for i in range(start, min(start + BATCH, users))
+                ],
+            )).scalars().all()
+        league_ids: List[int] = []
+        for start in range(0, leagues, BATCH):
+            league_ids += (await session.execute(
+                insert(League).returning(League.id),
+                [
+                    {"name": f"bm-{tag}-{i}", "game_type": GameType.survivor, "owner_id": user_ids[i], "join_code": f"bm{tag}{i}"}
+                    for i in range(start, min(start + BATCH, leagues))
+                ],
+            )).scalars().all()
+        rows = [
+            {"league_id": league_id, "user_id": user_ids[(i + k * stride) % users], "role": MemberRole.owner if k == 0 else MemberRole.member}
+            for i, league_id in enumerate(league_ids)
+            for k in range(per_league)
+        ]
+        for start in range(0, len(rows), BATCH):
+            await session.execute(insert(LeagueMembership), rows[start:start + BATCH])
+        await session.commit()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE league_memberships"))
+    pairs = [(row["league_id"], row["user_id"]) for row in rows]
+    return {"tag": tag, "users": user_ids, "leagues": league_ids, "pairs": pairs}
+
+
+async def cleanup(seeded: dict) -> None:
+    async with async_session_maker() as session:
+        league_ids = seeded["leagues"]
+        for start in range(0, len(league_ids), BATCH):
+            chunk = league_ids[start:start + BATCH]
+            await session.execute(delete(LeagueMembership).where(LeagueMembership.league_id.in_(chunk)))
+            await session.execute(delete(League).where(League.id.in_(chunk)))
+        await session.execute(delete(User).where(User.username.like(f"bm-{seeded['tag']}-%")))
+        await session.commit()
+
+
+async def old_join(session: AsyncSession, league_id: int, user_id: int) -> None:
+    """join_league before the unique constraint: look, then insert"""
+    existing = await get_membership(session, league_id, user_id)
+    if existing is None:
+        session.add(LeagueMembership(league_id=league_id, user_id=user_id, role=MemberRole.member))
+        await session.flush()
+
+
+async def plan(conn: AsyncConnection, stmt) -> str:
+    """Top node of the statement's query plan, e.g. 'Index Only Scan on ix_...'"""
+    compiled = stmt.compile(conn.sync_connection, compile_kwargs={"literal_binds": True})
+    explained = (await conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"))).scalar()
+    if isinstance(explained, str):
+        explained = json.loads(explained)
+    node = explained[0]["Plan"]
+    while node.get("Node Type") in ("Aggregate", "Limit") and node.get("Plans"):
+        node = node["Plans"][0]
+    index = node.get("Index Name")
+    return f"{node['Node Type']}{f' on {index}' if index else ''}"
+
+
+async def timed(probe: Callable, args: List[Tuple[int, int]]) -> Tuple[float, float, float]:
+    """Mean, p50 and p95 milliseconds per call"""
+    samples = []
+    for league_id, user_id in args:
+        start = time.perf_counter()
+        await probe(league_id, user_id)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.fmean(samples), samples[len(samples) // 2], samples[int(len(samples) * 0.95)]
+
+
+async def run_pass(seeded: dict, probes: int, indexed: bool) -> Dict[str, Tuple[float, float, float, str]]:
+    rng = random.Random(42)
+    hits = rng.sample(seeded["pairs"], probes // 2)
+    misses = [(rng.choice(seeded["leagues"]), rng.choice(seeded["users"])) for _ in range(probes - len(hits))]
+    checks = hits + misses
+    rng.shuffle(checks)
+    users = [(0, user_id) for _, user_id in checks]
+    leagues = [(league_id, 0) for league_id, _ in checks]
+    joins = list(checks)
+
+    results = {}
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            if not indexed:
+                await conn.execute(text("ALTER TABLE league_memberships DROP CONSTRAINT uq_league_memberships_league_user"))
+                await conn.execute(text("DROP INDEX ix_league_memberships_user_league"))
+            session = AsyncSession(bind=conn)
+
+            def check_stmt(league_id, user_id):
+                return select(LeagueMembership).where(LeagueMembership.league_id == league_id, LeagueMembership.user_id == user_id)
+
+            def user_stmt(user_id):
+                return select(memberships.c.league_id, memberships.c.role).where(memberships.c.user_id == user_id)
+
+            def count_stmt(league_id):
+                return select(func.count(memberships.c.id)).where(memberships.c.league_id == league_id)
+
+            async def check(league_id, user_id):
+                await get_membership(session, league_id, user_id)
+                session.expunge_all()
+
+            async def of_user(_, user_id):
+                (await conn.execute(user_stmt(user_id))).all()
+
+            async def count(league_id, _):
+                await conn.scalar(count_stmt(league_id))
+
+            async def join(league_id, user_id):
+                if indexed:
+                    await add_member(session, league_id, user_id)
+                else:
+                    await old_join(session, league_id, user_id)
+                session.expunge_all()
+
+            sample = checks[0]
+            results["membership check"] = (*await timed(check, checks), await plan(conn, check_stmt(*sample)))
+            results["leagues of user"] = (*await timed(of_user, users), await plan(conn, user_stmt(sample[1])))
+            results["member count"] = (*await timed(count, leagues), await plan(conn, count_stmt(sample[0])))
+            results["join"] = (*await timed(join, joins), "add_member()" if indexed else "select, then insert")
+            await session.close()
+        finally:
+            await transaction.rollback()
+    return results
+
+
+async def main(leagues: int, per_league: int, probes: int) -> None:
+    start = time.perf_counter()
+    seeded = await seed(leagues, per_league)
+    print(f"Seeded {len(seeded['pairs'])} memberships ({leagues} leagues x {per_league}) in {time.perf_counter() - start:.1f}s")
+    try:
+        for indexed in (False, True):
+            print(f"\n{'with' if indexed else 'without'} indexes, {probes} probes each (half of them misses)")
+            for name, (mean, p50, p95, how) in (await run_pass(seeded, probes, indexed)).items():
+                print(f"  {name:17s} mean {mean:7.3f} ms  p50 {p50:7.3f} ms  p95 {p95:7.3f} ms  {how}")
+    finally:
+        await cleanup(seeded)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--leagues", type=int, default=20000)
+    parser.add_argument("--per-league", type=int, default=6)
+    parser.add_argument("--probes", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(main(args.leagues, args.per_league, args.probes))
@@ -0,0 +1,58 @@
+"""Time the Monte Carlo season simulation, in-process and across the process pool.
+
+Simulates a season from its first episode (18 castaways, 15 vote-outs) with
+random rates, as GET /survivor/projections does.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_projections [--simulations 20000] [--castaways 18]
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+from app.core import process_pool
+from app.core.config import settings
+from app.services.projections import SeasonState, _run, simulate
+
+
+def random_state(castaways: int) -> SeasonState:
+    rng = np.random.default_rng(0)
+    return SeasonState(
+        episode=0,
+        castaways=[],
+        alive=[f"C{i:02d}" for i in range(castaways)],
+        strength=rng.uniform(0.02, 0.3, castaways),
+        threat=rng.uniform(0.5, 1.5, castaways),
+        confessional_rate=rng.uniform(1, 8, castaways),
+    )
+
+
+async def pooled(state: SeasonState, simulations: int) -> float:
+    await _run(state, simulations, np.random.SeedSequence(1))  # warm up the workers
+    start = time.perf_counter()
+    await _run(state, simulations, np.random.SeedSequence(2))
+    return (time.perf_counter() - start) * 1000
+
+
+def main(simulations: int, castaways: int) -> None:
+    state = random_state(castaways)
+    start = time.perf_counter()
+    totals = simulate(state.strength, state.threat, state.confessional_rate, simulations, np.random.SeedSequence(0))
+    single_ms = (time.perf_counter() - start) * 1000
+    assert totals["wins"].sum() == simulations
+    print(f"{simulations} simulations x {castaways} castaways")
+    print(f"one process                  {single_ms:8.1f} ms")
+    pool_ms = asyncio.run(pooled(state, simulations))
+    process_pool.shutdown()
+    print(f"process pool ({settings.PROCESS_POOL_WORKERS} workers)     {pool_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--simulations", type=int, default=20000)
+    parser.add_argument("--castaways", type=int, default=18)
+    args = parser.parse_args()
+    main(args.simulations, args.castaways)
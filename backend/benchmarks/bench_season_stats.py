@@ -0,0 +1,78 @@
+"""Compare the NumPy SeasonStats engine with the pure-Python castaway_totals().
+
+By default runs on synthetic tables sized like the full survivoR dataset
+(every version and season); pass --from-store to use the cached datasets
+(SURVIVOR_API_BASE_URL / SURVIVOR_CACHE_DIR) instead.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_season_stats [--from-store] [--scale 1]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+from app.core.survivor_data import survivor_store
+from app.services.survivor_stats import SeasonStats, castaway_totals, encode_records
+
+
+def synthetic_tables(scale: int):
+    random.seed(0)
+    castaways, challenges, confessionals = [], [], []
+    for version, n_seasons in [("US", 47 * scale), ("AU", 11 * scale), ("NZ", 3 * scale), ("SA", 10 * scale)]:
+        for season in range(1, n_seasons + 1):
+            ids = [f"{version}{season:03d}{i:02d}" for i in range(18)]
+            for place, castaway_id in enumerate(ids):
+                castaways.append({"version": version, "season": season, "castaway_id": castaway_id, "day": 39 - place * 2})
+            for episode in range(1, 15):
+                for castaway_id in ids[:19 - episode]:
+                    for _ in range(2):
+                        challenges.append({
+                            "version": version, "season": season, "episode": episode, "castaway_id": castaway_id,
+                            "challenge_type": random.choice(["Immunity", "Reward", "Immunity and Reward"]),
+                            "result": random.choice(["Won", "Lost"]),
+                        })
+                    confessionals.append({
+                        "version": version, "season": season, "episode": episode, "castaway_id": castaway_id,
+                        "confessional_count": random.randint(0, 6),
+                    })
+    return castaways, challenges, confessionals
+
+
+async def store_tables():
+    return await survivor_store.get_many("castaways", "challenge_results", "confessionals")
+
+
+def timed(fn, rounds):
+    fn()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main(from_store: bool, scale: int, rounds: int) -> None:
+    castaways, challenges, confessionals = (
+        asyncio.run(store_tables()) if from_store else synthetic_tables(scale)
+    )
+    print(f"rows: castaways={len(castaways)} challenges={len(challenges)} confessionals={len(confessionals)}")
+
+    python_ms, expected = timed(lambda: castaway_totals(castaways, challenges, confessionals), rounds)
+    encode_ms, coded = timed(lambda: encode_records(castaways, challenges, confessionals), rounds)
+    aggregate_ms, stats = timed(lambda: SeasonStats.from_codes((), *coded), rounds)
+    assert stats.castaway_totals() == expected
+
+    print(f"pure Python, career totals only          {python_ms:8.1f} ms")
+    print(f"NumPy engine from records, all groupings {encode_ms + aggregate_ms:8.1f} ms"
+          f"  (encoding {encode_ms:.1f} ms + group-by {aggregate_ms:.1f} ms)")
+    print(f"NumPy engine from coded columns          {aggregate_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from-store", action="store_true")
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.from_store, args.scale, args.rounds)
@@ -0,0 +1,71 @@
+"""Compare a cold start from the JSON cache files with the mmapped snapshot.
+
+Writes synthetic datasets sized like the full survivoR data (see
+bench_season_stats.py) as JSON and as a snapshot in a temporary directory, then
+times what a fresh worker does before it can serve /survivor/season-stats:
+load the three tables and build SeasonStats.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_snapshot [--scale 1]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from app.core.json_stream import iter_json_file
+from app.core.survivor_snapshot import open_snapshot, write_snapshot
+from app.services.survivor_stats import SeasonStats
+from benchmarks.bench_season_stats import synthetic_tables
+
+NAMES = ("castaways", "challenges", "confessionals")
+
+
+def from_json(directory: str) -> SeasonStats:
+    tables = {}
+    for name in NAMES:
+        with open(os.path.join(directory, f"{name}.json"), "rb") as f:
+            tables[name] = list(iter_json_file(f))
+    return SeasonStats.build((), tables)
+
+
+def from_snapshot(path: str) -> SeasonStats:
+    snapshot = open_snapshot(path)
+    return SeasonStats.build((), {name: snapshot.table(name) for name in NAMES})
+
+
+def timed(fn, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        result = fn()
+    return (time.perf_counter() - start) / rounds * 1000, result
+
+
+def main(scale: int, rounds: int) -> None:
+    tables = dict(zip(NAMES, synthetic_tables(scale)))
+    with tempfile.TemporaryDirectory() as directory:
+        for name, records in tables.items():
+            with open(os.path.join(directory, f"{name}.json"), "w") as f:
+                json.dump(records, f)
+        path = os.path.join(directory, "survivor.snapshot")
+        write_ms, _ = timed(lambda: write_snapshot(path, {name: ({}, records) for name, records in tables.items()}), 1)
+        json_bytes = sum(os.path.getsize(os.path.join(directory, f"{name}.json")) for name in NAMES)
+        print(f"rows: {', '.join(f'{name}={len(records)}' for name, records in tables.items())}")
+        print(f"size: JSON {json_bytes / 1e6:.1f} MB, snapshot {os.path.getsize(path) / 1e6:.1f} MB"
+              f" (written in {write_ms:.0f} ms)")
+
+        json_ms, expected = timed(lambda: from_json(directory), rounds)
+        snapshot_ms, stats = timed(lambda: from_snapshot(path), rounds)
+        assert stats.castaway_totals() == expected.castaway_totals()
+        print(f"parse JSON + build SeasonStats     {json_ms:8.1f} ms")
+        print(f"mmap snapshot + build SeasonStats  {snapshot_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.scale, args.rounds)
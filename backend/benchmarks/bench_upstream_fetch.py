@@ -0,0 +1,82 @@
+"""Compare per-request sessions + sequential fetches with the pooled client.
+
+Serves three JSON files from a local aiohttp server that adds a fixed
+latency per request, then times fetching all three the old way (a new
+ClientSession per call, one file after another) and the new way (the shared
+HTTPClient with asyncio.gather).
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_upstream_fetch [--rounds 20] [--latency-ms 50]
+"""
+import argparse
+import asyncio
+import time
+
+import aiohttp
+from aiohttp import web
+
+from app.core.http_client import HTTPClient
+
+FILES = ["vote_history", "challenge_results", "confessionals"]
+
+
+def make_app(latency: float, payload: bytes) -> web.Application:
+    async def handler(request):
+        await asyncio.sleep(latency)
+        return web.Response(body=payload, content_type="application/json")
+
+    app = web.Application()
+    app.router.add_get("/{name}.json", handler)
+    return app
+
+
+async def fetch_sequential_new_sessions(base_url: str) -> None:
+    for name in FILES:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base_url}{name}.json") as resp:
+                await resp.read()
+
+
+async def fetch_concurrent_pooled(client: HTTPClient, base_url: str) -> None:
+    async def fetch(name):
+        async with client.get(f"{base_url}{name}.json") as resp:
+            await resp.read()
+
+    await asyncio.gather(*(fetch(name) for name in FILES))
+
+
+async def main(rounds: int, latency_ms: int, payload_kb: int) -> None:
+    payload = b"[" + b",".join(b'{"castaway_id":"US0001"}' for _ in range(payload_kb * 40)) + b"]"
+    runner = web.AppRunner(make_app(latency_ms / 1000, payload))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}/"
+
+    client = HTTPClient()
+    await client.start()
+    try:
+        for label, run in [
+            ("new session per file, sequential", lambda: fetch_sequential_new_sessions(base_url)),
+            ("pooled client, asyncio.gather", lambda: fetch_concurrent_pooled(client, base_url)),
+        ]:
+            await run()  # warm-up
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await run()
+            elapsed = (time.perf_counter() - start) / rounds
+            print(f"{label:36s} {elapsed * 1000:8.1f} ms per request")
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency-ms", type=int, default=50)
+    parser.add_argument("--payload-kb", type=int, default=1024)
+    args = parser.parse_args()
+    asyncio.run(main(args.rounds, args.latency_ms, args.payload_kb))
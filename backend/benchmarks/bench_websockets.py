@@ -0,0 +1,89 @@
+"""Load test for /ws/leagues/{league_id}: many idle sockets, then broadcasts.
+
+Runs the app under uvicorn in this process (membership auth is stubbed so no
+database is needed), opens --connections aiohttp WebSocket clients on one
+league channel, reports memory per idle connection, then publishes --messages
+broadcasts and times how long the fan-out takes to reach every client.
+
+Run from the backend directory (raise `ulimit -n` for large counts):
+
+    python -m benchmarks.bench_websockets [--connections 5000] [--messages 20]
+"""
+import argparse
+import asyncio
+import resource
+import socket
+import time
+
+import aiohttp
+import uvicorn
+
+from app.api.ws import authorize_league_socket
+from app.core.pubsub import league_channel, pubsub
+from app.main import app
+
+LEAGUE_ID = 1
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def main(connections: int, messages: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    app.dependency_overrides[authorize_league_socket] = lambda: None
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning", lifespan="off", backlog=4096))
+    serve = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    url = f"ws://127.0.0.1:{port}/ws/leagues/{LEAGUE_ID}"
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        before = rss_mb()
+        start = time.perf_counter()
+        sockets = []
+        for batch in range(0, connections, 500):
+            sockets += await asyncio.gather(*(
+                session.ws_connect(url, autoping=True) for _ in range(min(500, connections - batch))
+            ))
+        connect_s = time.perf_counter() - start
+        await asyncio.sleep(1)
+        used = rss_mb() - before
+        print(f"{connections} sockets connected in {connect_s:.1f}s;"
+              f" {used:.0f} MB for server and clients together ({used * 1024 / connections:.1f} KB per connection)")
+
+        latencies = []
+        for i in range(messages):
+            start = time.perf_counter()
+            await pubsub.publish(league_channel(LEAGUE_ID), {"type": "scores", "seq": i, "rows": [{"id": 1, "delta": 5.0}]})
+            await asyncio.gather(*(ws.receive() for ws in sockets))
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        print(f"broadcast to all {connections}: median {latencies[len(latencies) // 2]:.1f} ms,"
+              f" max {latencies[-1]:.1f} ms; pubsub {pubsub.stats()}")
+        await asyncio.gather(*(ws.close() for ws in sockets))
+    await asyncio.sleep(0.5)
+    print(f"after disconnect: {pubsub.stats()}")
+    server.should_exit = True
+    await serve
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--messages", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.connections, args.messages))
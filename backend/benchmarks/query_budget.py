@@ -0,0 +1,143 @@
+"""SQL statement budgets for the league read endpoints and authenticated requests.
+
+Seeds synthetic leagues (each with settings and members) at growing sizes,
+calls every route in ROUTES through the ASGI app and counts the SQL statements
+it runs. A route fails when it goes over its budget at any size, which is how
+an N+1 (a lazy load per serialized league) shows up as data grows. The
+authenticated routes run with a warm principal cache and are budgeted zero
+statements. Exits non-zero on any failure, so it can gate CI. Seeded rows
+are removed again.
+
+Needs a migrated database (DATABASE_URL). Run from the backend directory:
+
+    python -m benchmarks.query_budget [--sizes 10 100 1000] [--members 5]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+from sqlalchemy import delete, event, insert
+
+from app.api.auth import create_access_token
+from app.core.database import async_session_maker, engine
+from app.main import app
+from app.models.league import GameType, League, LeagueMembership, LeagueSettings, MemberRole
+from app.models.user import User
+
+# route name -> (path built from the seeded ids, extra headers, most statements allowed)
+ROUTES: Dict[str, Tuple[Callable[[dict], str], Callable[[dict], dict], int]] = {
+    "list_leagues": (lambda ids: "/api/leagues/", lambda ids: {}, 2),
+    "list_leagues (304)": (lambda ids: "/api/leagues/", lambda ids: {"If-None-Match": ids["list_etag"]}, 1),
+    "list_leagues by game_type": (lambda ids: "/api/leagues/?game_type=survivor", lambda ids: {}, 2),
+    "list_leagues next page": (lambda ids: f"/api/leagues/?limit=5&cursor={ids['next_cursor']}", lambda ids: {}, 2),
+    "list_members": (lambda ids: f"/api/leagues/{ids['league']}/members", lambda ids: {}, 1),
+    "get_league": (lambda ids: f"/api/leagues/{ids['league']}", lambda ids: {}, 1),
+    "get_user_leagues": (lambda ids: f"/api/users/{ids['user']}/leagues", lambda ids: {}, 2),
+    "auth me": (lambda ids: "/auth/me", lambda ids: ids["auth"], 0),
+    "auth own user": (lambda ids: f"/auth/users/{ids['username']}", lambda ids: ids["auth"], 0),
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args) -> None:
+        self.count += 1
+
+    def close(self) -> None:
+        event.remove(engine.sync_engine, "before_cursor_execute", self._count)
+
+
+async def seed(leagues: int, members: int) -> dict:
+    """Create leagues with settings and members; every seeded user joins every league"""
+    tag = uuid.uuid4().hex[:8]
+    async with async_session_maker() as session:
+        user_ids = (await session.execute(
+            insert(User).returning(User.id),
+            [
+                {"email": f"qb-{tag}-{i}@example.com", "username": f"qb-{tag}-{i}", "hashed_password": "x"}
+                for i in range(members)
+            ],
+        )).scalars().all()
+        settings_ids = (await session.execute(
+            insert(LeagueSettings).returning(LeagueSettings.id), [{"max_members": 20} for _ in range(leagues)]
+        )).scalars().all()
+        league_ids = (await session.execute(
+            insert(League).returning(League.id),
+            [
+                {
+                    "name": f"qb-{tag}-{i}", "game_type": GameType.survivor, "owner_id": user_ids[0],
+                    "settings_id": settings_id, "join_code": f"qb{tag}{i}",
+                }
+                for i, settings_id in enumerate(settings_ids)
+            ],
+        )).scalars().all()
+        await session.execute(insert(LeagueMembership), [
+            {"league_id": league_id, "user_id": user_id, "role": MemberRole.owner if i == 0 else MemberRole.member}
+            for league_id in league_ids
+            for i, user_id in enumerate(user_ids)
+        ])
+        await session.commit()
+    return {"tag": tag, "users": user_ids, "leagues": league_ids, "settings": settings_ids, "username": f"qb-{tag}-0"}
+
+
+async def cleanup(seeded: dict) -> None:
+    async with async_session_maker() as session:
+        await session.execute(delete(LeagueMembership).where(LeagueMembership.league_id.in_(seeded["leagues"])))
+        await session.execute(delete(League).where(League.id.in_(seeded["leagues"])))
+        await session.execute(delete(LeagueSettings).where(LeagueSettings.id.in_(seeded["settings"])))
+        await session.execute(delete(User).where(User.id.in_(seeded["users"])))
+        await session.commit()
+
+
+async def measure(sizes: List[int], members: int) -> bool:
+    counter = StatementCounter()
+    ok = True
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            for size in sizes:
+                seeded = await seed(size, members)
+                try:
+                    listing = await client.get("/api/leagues/")
+                    first_page = (await client.get("/api/leagues/?limit=5")).json()
+                    auth = {"Authorization": f"Bearer {create_access_token({'sub': seeded['username']})}"}
+                    await client.get("/auth/me", headers=auth)  # caches the principal
+                    ids = {
+                        "league": seeded["leagues"][-1], "user": seeded["users"][-1],
+                        "list_etag": listing.headers.get("ETag", ""), "next_cursor": first_page.get("next_cursor") or "",
+                        "username": seeded["username"], "auth": auth,
+                    }
+                    print(f"{size} seeded leagues x {members} members")
+                    for name, (path, headers, budget) in ROUTES.items():
+                        before = counter.count
+                        start = time.perf_counter()
+                        response = await client.get(path(ids), headers=headers(ids))
+                        elapsed = (time.perf_counter() - start) * 1000
+                        used = counter.count - before
+                        passed = used <= budget and response.status_code in (200, 304)
+                        ok = ok and passed
+                        print(
+                            f"  {'ok  ' if passed else 'FAIL'} {name:28s} {used:3d} statements (budget {budget})"
+                            f"  HTTP {response.status_code}  {elapsed:7.1f} ms"
+                        )
+                finally:
+                    await cleanup(seeded)
+    finally:
+        counter.close()
+        await engine.dispose()
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--members", type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(measure(args.sizes, args.members)) else 1)
@@ -0,0 +1,21 @@
+import asyncio
+import os
+from app.core.config import settings
+from app.core.http_client import http_client
+from app.core.survivor_data import DATASETS, snapshot_meta, survivor_store
+from app.core.survivor_snapshot import write_snapshot
+
+async def build():
+    """Write every survivoR dataset into the binary snapshot workers mmap at startup"""
+    try:
+        entries = await asyncio.gather(*(survivor_store.entry(name) for name in DATASETS))
+        datasets = {entry.name: (snapshot_meta(entry), survivor_store.records(entry)) for entry in entries}
+        path = settings.SURVIVOR_SNAPSHOT_PATH
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        await asyncio.to_thread(write_snapshot, path, datasets)
+        print(f"✅ Wrote {path} ({os.path.getsize(path)} bytes, {len(entries)} datasets)")
+    finally:
+        await http_client.close()
+
+if __name__ == "__main__":
+    asyncio.run(build())
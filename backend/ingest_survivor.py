@@ -0,0 +1,16 @@
+import asyncio
+from app.core.database import async_session_maker
+from app.core.http_client import http_client
+from app.services.survivor_ingest import ingest_survivor_players
+
+async def ingest():
+    """Load survivoR castaways and derived counts into survivor_players"""
+    try:
+        async with async_session_maker() as session:
+            result = await ingest_survivor_players(session)
+        print(f"✅ Ingested {result['players']} players ({result['written']} inserted or updated)")
+    finally:
+        await http_client.close()
+
+if __name__ == "__main__":
+    asyncio.run(ingest())
@@ -1,18 +1,30 @@
 // src/api/LeagueAPI.ts
 import type { LeagueOut, LeagueMembershipOut } from "../types/league";
+import type { Page } from "../types/pagination";
 import { buildApiUrl } from "../config/api";
+import { MAX_PAGE_SIZE, fetchAllPages, pageQuery } from "./pagination";
 
 const BASE_URL = buildApiUrl("/api/leagues");
 
-export async function getLeagues(token: string): Promise<LeagueOut[]> {
-  const res = await fetch(BASE_URL + "/", {
+export async function getLeaguesPage(
+  token: string,
+  cursor?: string,
+  limit?: number,
+  withTotal?: boolean
+): Promise<Page<LeagueOut>> {
+  const res = await fetch(BASE_URL + "/" + pageQuery(cursor, limit, withTotal), {
     headers: { Authorization: `Bearer ${token}` },
   });
-  if (res.status === 404) return []; // No leagues yet
+  if (res.status === 404) return { items: [] }; // No leagues yet
   if (!res.ok) throw new Error("Failed to fetch leagues");
   return res.json();
 }
 
+// Every league, following the cursor page by page
+export async function getLeagues(token: string): Promise<LeagueOut[]> {
+  return fetchAllPages((cursor) => getLeaguesPage(token, cursor, MAX_PAGE_SIZE));
+}
+
 export async function createLeague(
   league: Partial<LeagueOut>,
   token: string
@@ -41,17 +53,28 @@ export async function joinLeague(
   return res.json();
 }
 
-export async function getLeagueMembers(
+export async function getLeagueMembersPage(
   leagueId: number,
-  token: string
-): Promise<LeagueMembershipOut[]> {
-  const res = await fetch(`${BASE_URL}/${leagueId}/members`, {
+  token: string,
+  cursor?: string,
+  limit?: number,
+  withTotal?: boolean
+): Promise<Page<LeagueMembershipOut>> {
+  const res = await fetch(`${BASE_URL}/${leagueId}/members${pageQuery(cursor, limit, withTotal)}`, {
     headers: { Authorization: `Bearer ${token}` },
   });
   if (!res.ok) throw new Error("Failed to fetch members");
   return res.json();
 }
 
+// Every member of a league, following the cursor page by page
+export async function getLeagueMembers(
+  leagueId: number,
+  token: string
+): Promise<LeagueMembershipOut[]> {
+  return fetchAllPages((cursor) => getLeagueMembersPage(leagueId, token, cursor, MAX_PAGE_SIZE));
+}
+
 export async function deleteLeague(
   leagueId: number,
   token: string
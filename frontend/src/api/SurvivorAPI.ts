@@ -1,4 +1,6 @@
 // src/api/SurvivorAPI.ts
+import { buildApiUrl } from "../config/api";
+
 export interface SurvivorPlayer {
   castaway_id: string;
   season: number;
@@ -20,22 +22,47 @@ export interface SurvivorSeason {
   viewers_premiere: number;
 }
 
+export interface SurvivorPlayerStats {
+  votes: Record<string, unknown>[];
+  challenges: Record<string, unknown>[];
+  confessionals: Record<string, unknown>[];
+}
+
 class SurvivorAPI {
-  private baseURL = 'https://github.com/doehm/survivoR/raw/master/dev/json/';
+  private baseURL = buildApiUrl('/api/survivor');
 
   async getAvailableSeasons(): Promise<SurvivorSeason[]> {
-    const response = await fetch(`${this.baseURL}season_summary.json`);
+    const response = await fetch(`${this.baseURL}/seasons`);
     return response.json();
   }
 
-  async getSeasonPlayers(season: number): Promise<SurvivorPlayer[]> {
-    const response = await fetch(`${this.baseURL}castaways.json`);
-    const allPlayers = await response.json();
-    return allPlayers.filter((p: any) => p.season === season);
+  // The backend serves each season pre-filtered; pass `fields` to trim the columns returned
+  async getSeasonPlayers(
+    season: number,
+    version: string = 'US',
+    fields?: (keyof SurvivorPlayer)[]
+  ): Promise<SurvivorPlayer[]> {
+    const params = new URLSearchParams({ season: String(season), version });
+    if (fields && fields.length > 0) params.set('fields', fields.join(','));
+    const response = await fetch(`${this.baseURL}/players?${params}`);
+    return response.json();
+  }
+
+  // Votes, challenges and confessionals for many castaways in one request, keyed by castaway_id.
+  // Pass castawayIds, or omit them to get the whole cast of `season`.
+  async getPlayerStats(
+    options: { castawayIds?: string[]; season?: number; version?: string }
+  ): Promise<Record<string, SurvivorPlayerStats>> {
+    const params = new URLSearchParams();
+    if (options.castawayIds && options.castawayIds.length > 0) params.set('castaway_ids', options.castawayIds.join(','));
+    if (options.season !== undefined) params.set('season', String(options.season));
+    if (options.version) params.set('version', options.version);
+    const response = await fetch(`${this.baseURL}/player-stats/batch?${params}`);
+    return response.json();
   }
 
-  async getFeaturedPlayer(season: number): Promise<SurvivorPlayer | null> {
-    const players = await this.getSeasonPlayers(season);
+  async getFeaturedPlayer(season: number, version: string = 'US'): Promise<SurvivorPlayer | null> {
+    const players = await this.getSeasonPlayers(season, version);
     if (players.length === 0) return null;
     // Pick a random player who is not the winner
     const nonWinners = players.filter(p => p.result !== 'Sole Survivor');
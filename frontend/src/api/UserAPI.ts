@@ -1,7 +1,8 @@
 // UserAPI.ts - API calls for user-related endpoints
-import type { UserPublicProfile } from "../types/user";
+import type { UserAccount, UserPublicProfile, UsersPage } from "../types/user";
 import type { LeagueOut } from "../types/league";
-import { buildApiUrl } from "../config/api";
+import { buildApiUrl, buildAuthUrl } from "../config/api";
+import { MAX_PAGE_SIZE, fetchAllPages, pageQuery } from "./pagination";
 
 export async function getUserPublicProfile(userId: number, cacheBust?: boolean): Promise<UserPublicProfile> {
   const url = buildApiUrl(`/api/users/${userId}/public`);
@@ -25,4 +26,26 @@ export async function getUserLeagues(userId: number): Promise<LeagueOut[]> {
   return res.json();
 }
 
+// One page of all users, newest first (/auth/users)
+export async function getUsersPage(
+  token: string,
+  cursor?: string,
+  limit?: number,
+  withTotal?: boolean
+): Promise<UsersPage> {
+  const res = await fetch(buildAuthUrl("/auth/users") + pageQuery(cursor, limit, withTotal), {
+    headers: { Authorization: `Bearer ${token}` },
+  });
+  if (!res.ok) throw new Error("Failed to fetch users");
+  return res.json();
+}
+
+// Every user, following the cursor page by page
+export async function getAllUsers(token: string): Promise<UserAccount[]> {
+  return fetchAllPages(async (cursor) => {
+    const page = await getUsersPage(token, cursor, MAX_PAGE_SIZE);
+    return { items: page.users, next_cursor: page.next_cursor };
+  });
+}
+
 // Add more user-related API calls as needed
@@ -0,0 +1,28 @@
+// src/api/pagination.ts
+import type { Page } from "../types/pagination";
+
+// Largest page the API serves (MAX_PAGE_SIZE in backend/app/core/pagination.py)
+export const MAX_PAGE_SIZE = 100;
+
+export function pageQuery(cursor?: string, limit?: number, withTotal?: boolean): string {
+  const params = new URLSearchParams();
+  if (limit) params.set("limit", String(limit));
+  if (cursor) params.set("cursor", cursor);
+  if (withTotal) params.set("with_total", "true");
+  const query = params.toString();
+  return query ? `?${query}` : "";
+}
+
+// Follow next_cursor until the last page and return every item
+export async function fetchAllPages<T>(
+  fetchPage: (cursor?: string) => Promise<Page<T>>
+): Promise<T[]> {
+  const items: T[] = [];
+  let cursor: string | undefined;
+  do {
+    const page = await fetchPage(cursor);
+    items.push(...page.items);
+    cursor = page.next_cursor ?? undefined;
+  } while (cursor);
+  return items;
+}
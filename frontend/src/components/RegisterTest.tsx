@@ -39,8 +39,9 @@ interface LoginResponse {
 }
 
 interface UsersResponse {
-  total_users: number;
   users: User[];
+  next_cursor?: string | null; // pass back as ?cursor= for the next page
+  total_users?: number | null; // only with ?with_total=true
 }
 
 // Create Auth Context
@@ -214,7 +215,8 @@ function AuthTest() {
     
     setUsersLoading(true);
     try {
-      const response = await fetch(`${API_BASE}/users`, {
+      // First page only, with the (estimated) total
+      const response = await fetch(`${API_BASE}/users?limit=100&with_total=true`, {
         headers: {
           'Authorization': `Bearer ${localStorage.getItem('token')}`
         }
@@ -223,7 +225,7 @@ function AuthTest() {
       if (response.ok) {
         const data: UsersResponse = await response.json();
         setUsers(data.users);
-        setUserCount(data.total_users);
+        setUserCount(data.total_users ?? data.users.length);
       } else if (response.status === 401) {
         logout(); // Token expired
       }
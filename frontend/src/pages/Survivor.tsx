@@ -62,7 +62,7 @@ export default function SurvivorPage() {
       setLoading(true);
       try {
         const res = await fetch(
-          `/api/survivor/players?season=${season}&version=${version}`
+          `/api/survivor/players?season=${season}&version=${version}&fields=castaway_id,castaway,original_tribe`
         );
         const data = await res.json();
         setPlayers(data);
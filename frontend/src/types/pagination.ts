@@ -0,0 +1,7 @@
+// src/types/pagination.ts
+// A page of a keyset-paginated listing; pass next_cursor back as ?cursor=
+export interface Page<T> {
+  items: T[];
+  next_cursor?: string | null;
+  total_estimate?: number | null; // only when requested with ?with_total=true
+}
@@ -13,3 +13,22 @@ export interface UserPublicProfile {
   is_verified?: boolean;
   bio?: string; // User bio
 }
+
+// A user as listed by /auth/users
+export interface UserAccount {
+  id: number;
+  email: string;
+  username: string;
+  first_name?: string | null;
+  last_name?: string | null;
+  is_active: boolean;
+  is_admin: boolean;
+  created_at: string;
+}
+
+// A page of /auth/users; pass next_cursor back as ?cursor=
+export interface UsersPage {
+  users: UserAccount[];
+  next_cursor?: string | null;
+  total_users?: number | null; // only when requested with ?with_total=true
+}